@@ -0,0 +1,68 @@
+# NotificationService/app/core/config.py
+from pydantic import BaseSettings
+
+
+class Settings(BaseSettings):
+    # Service settings
+    SERVICE_NAME: str = "notification-service"
+    SERVICE_PORT: int = 8081
+    CONSUL_ENABLED: bool = True
+    CONSUL_WATCH_WAIT: str = "30s"
+    CONSUL_WATCH_RETRY_SECONDS: float = 5.0
+    # Override settings from the keys under this KV prefix, e.g.
+    # config/notification-service/DELIVERY_RETRY_MAX_SECONDS, and follow their changes
+    CONSUL_CONFIG_ENABLED: bool = True
+    CONSUL_CONFIG_PREFIX: str = "config/notification-service/"
+
+    # Durable queue of accepted notifications
+    DATABASE_URL: str = "sqlite:///./notifications.db"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+
+    # Delivery workers
+    DELIVERY_ENABLED: bool = True
+    DELIVERY_WORKERS: int = 4
+    # "log", "file", or "package.module:ClassName" for a custom channel
+    DELIVERY_CHANNEL: str = "log"
+    DELIVERY_FILE_PATH: str = "notifications.log"
+    # Users whose pending notifications one worker claims at a time
+    DELIVERY_CLAIM_USERS: int = 16
+    DELIVERY_POLL_SECONDS: float = 0.5
+    # A claimed notification is reclaimed by another worker after this long,
+    # e.g. when the process holding it died
+    DELIVERY_LEASE_SECONDS: float = 60.0
+    DELIVERY_SHUTDOWN_TIMEOUT_SECONDS: float = 10.0
+
+    # Notifications to one user arriving within this window go out as one digest
+    DIGEST_WINDOW_SECONDS: float = 1.0
+    # Messages listed in a digest; the rest are summarised as a count
+    DIGEST_MAX_MESSAGES: int = 20
+
+    # Failed deliveries are retried with exponential backoff, then dead-lettered
+    DELIVERY_MAX_ATTEMPTS: int = 5
+    DELIVERY_RETRY_BASE_SECONDS: float = 1.0
+    DELIVERY_RETRY_MAX_SECONDS: float = 300.0
+
+    # In-app inbox
+    INBOX_PAGE_SIZE: int = 50
+    INBOX_MAX_PAGE_SIZE: int = 200
+    # Ids accepted by one mark-read request
+    INBOX_MARK_READ_MAX_IDS: int = 1000
+    # Read items older than this are removed by app.workers.inbox_retention
+    INBOX_RETENTION_DAYS: int = 30
+    INBOX_RETENTION_BATCH_SIZE: int = 5000
+    INBOX_RETENTION_INTERVAL_SECONDS: int = 3600
+
+    class Config:
+        env_file = ".env"
+
+
+# Never taken from Consul KV: where the service finds its database and
+# Consul itself
+STATIC_SETTINGS = frozenset((
+    "DATABASE_URL",
+    "CONSUL_ENABLED",
+    "CONSUL_CONFIG_ENABLED",
+    "CONSUL_CONFIG_PREFIX",
+))
+
+settings = Settings()
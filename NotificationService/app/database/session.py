@@ -0,0 +1,31 @@
+# NotificationService/app/database/session.py
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+
+from app.core.config import settings
+from app.database.base import Base
+
+
+def create_db_engine(url: str = None):
+    """Engine for the notification store; SQLite files run in WAL mode"""
+    url = url or settings.DATABASE_URL
+    if make_url(url).get_backend_name() != "sqlite":
+        return create_engine(url, pool_pre_ping=True)
+
+    engine = create_engine(url, connect_args={"check_same_thread": False})
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.close()
+
+    return engine
+
+
+def init_db(engine):
+    """Create any missing tables"""
+    import app.models  # noqa: F401  (registers every table on Base.metadata)
+    Base.metadata.create_all(bind=engine)
@@ -0,0 +1,54 @@
+# NotificationService/app/delivery/channels.py
+"""Delivery channel backends.
+
+A channel is any object with ``async def send(user_id, message)`` that
+raises when delivery fails. DELIVERY_CHANNEL picks one by name, or imports
+a custom one given as "package.module:ClassName".
+"""
+import asyncio
+import importlib
+import json
+import threading
+import time
+
+from app.core.config import settings
+
+
+class LogChannel:
+    """Prints each notification; stands in until a real channel is configured"""
+
+    async def send(self, user_id: int, message: str) -> None:
+        print(f"Sending notification to user {user_id}: {message}")
+
+
+class FileChannel:
+    """Appends each notification to a file as a JSON line, for tests and local runs"""
+
+    def __init__(self, path: str = None):
+        self.path = path or settings.DELIVERY_FILE_PATH
+        self._lock = threading.Lock()
+
+    def _append(self, line: str) -> None:
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+    async def send(self, user_id: int, message: str) -> None:
+        line = json.dumps({"user_id": user_id, "message": message, "sent_at": time.time()})
+        await asyncio.to_thread(self._append, line)
+
+
+CHANNELS = {
+    "log": LogChannel,
+    "file": FileChannel,
+}
+
+
+def get_channel(name: str):
+    """Instantiate the channel configured as ``name``"""
+    if ":" in name:
+        module_name, class_name = name.split(":", 1)
+        return getattr(importlib.import_module(module_name), class_name)()
+    try:
+        return CHANNELS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown delivery channel: {name}")
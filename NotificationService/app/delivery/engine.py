@@ -0,0 +1,113 @@
+# NotificationService/app/delivery/engine.py
+"""Pool of async workers draining the notification queue into a channel.
+
+Each worker claims the ready notifications of a few users, sends one
+message per user (a digest when several piled up) and then removes the
+delivered rows, or reschedules failed ones with exponential backoff until
+they run out of attempts and move to the dead-letter table. Queue access
+runs in threads so the event loop keeps serving requests.
+"""
+import asyncio
+import random
+import time
+from itertools import groupby
+from typing import List
+
+from app.core.config import settings
+from app.delivery.queue import NotificationQueue
+from app.utils.metrics import (
+    NOTIFICATION_DELIVERY_FAILURES,
+    NOTIFICATION_DELIVERY_LAG_SECONDS,
+    NOTIFICATION_SEND_SECONDS,
+    NOTIFICATIONS_DEAD_LETTERED,
+    NOTIFICATIONS_SENT,
+)
+
+
+def digest_message(messages: List[str]) -> str:
+    """One message standing for all of a user's pending notifications"""
+    if len(messages) == 1:
+        return messages[0]
+    listed = messages[:settings.DIGEST_MAX_MESSAGES]
+    lines = [f"{len(messages)} new notifications:"] + [f"- {message}" for message in listed]
+    if len(messages) > len(listed):
+        lines.append(f"...and {len(messages) - len(listed)} more")
+    return "\n".join(lines)
+
+
+def retry_delay(attempts: int, rng=random) -> float:
+    """Backoff before retry number ``attempts``: doubling, capped, with jitter"""
+    delay = min(
+        settings.DELIVERY_RETRY_MAX_SECONDS,
+        settings.DELIVERY_RETRY_BASE_SECONDS * 2 ** (attempts - 1),
+    )
+    return delay / 2 + rng.uniform(0, delay / 2)
+
+
+class DeliveryEngine:
+    def __init__(self, queue: NotificationQueue, channel, workers: int = None, clock=time.time):
+        self.queue = queue
+        self.channel = channel
+        self.workers = workers or settings.DELIVERY_WORKERS
+        self.clock = clock
+        self._tasks = []
+        self._stopping = None
+
+    async def start(self):
+        self._stopping = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(self.workers)]
+        print(f"Started {self.workers} delivery workers")
+
+    async def stop(self, timeout: float = None):
+        """Let workers finish their current claim, then cancel whatever is left"""
+        if not self._tasks:
+            return
+        self._stopping.set()
+        timeout = settings.DELIVERY_SHUTDOWN_TIMEOUT_SECONDS if timeout is None else timeout
+        done, pending = await asyncio.wait(self._tasks, timeout=timeout)
+        for task in pending:
+            # Their leases expire and the rows are claimed again after a restart
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        self._tasks = []
+
+    async def _run(self):
+        while not self._stopping.is_set():
+            try:
+                delivered = await self.deliver_once()
+            except Exception as e:
+                print(f"Delivery worker error: {e}")
+                delivered = 0
+            if not delivered:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), settings.DELIVERY_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def deliver_once(self) -> int:
+        """Claim and deliver one batch of users; returns notifications handled"""
+        token, rows = await asyncio.to_thread(
+            self.queue.claim, self.clock(), settings.DELIVERY_CLAIM_USERS, settings.DELIVERY_LEASE_SECONDS
+        )
+        delivered = []
+        for user_id, group in groupby(rows, key=lambda row: row.user_id):
+            group = list(group)
+            started = time.perf_counter()
+            try:
+                await self.channel.send(user_id, digest_message([row.message for row in group]))
+            except Exception as e:
+                NOTIFICATION_DELIVERY_FAILURES.inc()
+                print(f"Delivery to user {user_id} failed: {e}")
+                delays = [retry_delay(row.attempts + 1) for row in group]
+                dead = await asyncio.to_thread(self.queue.fail, token, group, str(e), self.clock(), delays)
+                NOTIFICATIONS_DEAD_LETTERED.inc(dead)
+                continue
+            NOTIFICATION_SEND_SECONDS.observe(time.perf_counter() - started)
+            delivered.extend(group)
+
+        await asyncio.to_thread(self.queue.complete, token, [row.id for row in delivered])
+        now = self.clock()
+        for row in delivered:
+            NOTIFICATION_DELIVERY_LAG_SECONDS.observe(now - row.created_at)
+        NOTIFICATIONS_SENT.inc(len(delivered))
+        return len(rows)
@@ -0,0 +1,143 @@
+# NotificationService/app/delivery/queue.py
+"""Durable queue of accepted notifications, stored in the service database.
+
+Workers claim every ready notification of a few users at once by stamping
+them with a lease token in a single UPDATE, so concurrent workers (and
+processes) never claim the same row. A claim whose worker dies is picked
+up again once its lease expires, giving at-least-once delivery.
+"""
+import uuid
+from typing import List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, bindparam, delete, func, insert, or_, select, update
+
+from app.core.config import settings
+from app.models.queue import DeadLetter, QueuedNotification
+
+queue_table = QueuedNotification.__table__
+dead_letter_table = DeadLetter.__table__
+
+
+class NotificationQueue:
+    def __init__(self, engine):
+        self.engine = engine
+
+    def add(self, conn, notifications: Sequence[Tuple[int, str]], now: float) -> None:
+        """Queue (user_id, message) pairs in the caller's transaction.
+
+        They become deliverable after the digest window.
+        """
+        available_at = now + settings.DIGEST_WINDOW_SECONDS
+        conn.execute(insert(queue_table), [
+            {
+                "user_id": user_id,
+                "message": message,
+                "created_at": now,
+                "available_at": available_at,
+                "attempts": 0,
+            }
+            for user_id, message in notifications
+        ])
+
+    def enqueue(self, notifications: Sequence[Tuple[int, str]], now: float) -> None:
+        """Queue (user_id, message) pairs in a transaction of their own"""
+        with self.engine.begin() as conn:
+            self.add(conn, notifications, now)
+
+    def claim(self, now: float, max_users: int, lease_seconds: float) -> Tuple[str, list]:
+        """Lease all ready notifications of up to max_users users.
+
+        Returns (lease token, rows ordered by user_id then id); rows is empty
+        when nothing is ready.
+        """
+        token = uuid.uuid4().hex
+        ready = and_(
+            queue_table.c.available_at <= now,
+            or_(queue_table.c.leased_until.is_(None), queue_table.c.leased_until < now),
+        )
+        # Pick users from a bounded scan of the oldest ready rows
+        oldest = (
+            select(queue_table.c.user_id)
+            .where(ready)
+            .order_by(queue_table.c.available_at)
+            .limit(max_users * settings.DIGEST_MAX_MESSAGES)
+            .subquery()
+        )
+        users = select(oldest.c.user_id).distinct().limit(max_users)
+        with self.engine.begin() as conn:
+            conn.execute(
+                update(queue_table)
+                .where(ready, queue_table.c.user_id.in_(users))
+                .values(lease_token=token, leased_until=now + lease_seconds)
+            )
+            rows = conn.execute(
+                select(queue_table)
+                .where(queue_table.c.lease_token == token)
+                .order_by(queue_table.c.user_id, queue_table.c.id)
+            ).all()
+        return token, rows
+
+    def complete(self, token: str, ids: List[int]) -> None:
+        """Remove delivered notifications, unless their lease was lost meanwhile"""
+        if not ids:
+            return
+        with self.engine.begin() as conn:
+            conn.execute(
+                delete(queue_table).where(queue_table.c.id.in_(ids), queue_table.c.lease_token == token)
+            )
+
+    def fail(self, token: str, rows: list, error: str, now: float, delays: List[float]) -> int:
+        """Reschedule rows after delays[i], or dead-letter those out of attempts.
+
+        Returns how many rows were dead-lettered.
+        """
+        retry = [
+            {"b_id": row.id, "b_available_at": now + delay}
+            for row, delay in zip(rows, delays)
+            if row.attempts + 1 < settings.DELIVERY_MAX_ATTEMPTS
+        ]
+        dead = [row for row in rows if row.attempts + 1 >= settings.DELIVERY_MAX_ATTEMPTS]
+        with self.engine.begin() as conn:
+            if retry:
+                conn.execute(
+                    update(queue_table)
+                    .where(queue_table.c.id == bindparam("b_id"), queue_table.c.lease_token == token)
+                    .values(
+                        attempts=queue_table.c.attempts + 1,
+                        available_at=bindparam("b_available_at"),
+                        last_error=error,
+                        lease_token=None,
+                        leased_until=None,
+                    ),
+                    retry,
+                )
+            if dead:
+                conn.execute(insert(dead_letter_table), [
+                    {
+                        "user_id": row.user_id,
+                        "message": row.message,
+                        "created_at": row.created_at,
+                        "failed_at": now,
+                        "attempts": row.attempts + 1,
+                        "last_error": error,
+                    }
+                    for row in dead
+                ])
+                conn.execute(
+                    delete(queue_table).where(
+                        queue_table.c.id.in_([row.id for row in dead]),
+                        queue_table.c.lease_token == token,
+                    )
+                )
+        return len(dead)
+
+    def depth(self) -> int:
+        with self.engine.connect() as conn:
+            return conn.execute(select(func.count()).select_from(queue_table)).scalar()
+
+    def dead_letters(self, user_id: Optional[int] = None) -> list:
+        stmt = select(dead_letter_table).order_by(dead_letter_table.c.id)
+        if user_id is not None:
+            stmt = stmt.where(dead_letter_table.c.user_id == user_id)
+        with self.engine.connect() as conn:
+            return conn.execute(stmt).all()
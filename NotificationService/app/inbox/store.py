@@ -0,0 +1,113 @@
+# NotificationService/app/inbox/store.py
+"""Per-user in-app inbox with a maintained unread counter.
+
+Every write that changes how many unread items a user has (adding items,
+marking them read) adjusts notification_inbox_unread in the same
+transaction, so the unread count is a primary key lookup instead of a
+COUNT(*) over the user's inbox. Only read items are ever trimmed, which
+leaves the counter untouched.
+"""
+from collections import Counter
+from typing import List, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, insert, select, tuple_, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.models.inbox import InboxNotification, InboxUnreadCount
+
+inbox_table = InboxNotification.__table__
+unread_table = InboxUnreadCount.__table__
+
+
+class Inbox:
+    def __init__(self, engine):
+        self.engine = engine
+
+    def add(self, conn, notifications: Sequence[Tuple[int, str]], now: float) -> None:
+        """Store (user_id, message) pairs as unread in the caller's transaction"""
+        conn.execute(insert(inbox_table), [
+            {"user_id": user_id, "message": message, "created_at": now}
+            for user_id, message in notifications
+        ])
+        added = Counter(user_id for user_id, _ in notifications)
+        dialect = postgresql if conn.dialect.name == "postgresql" else sqlite
+        stmt = dialect.insert(unread_table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[unread_table.c.user_id],
+            set_={"unread": unread_table.c.unread + stmt.excluded.unread},
+        )
+        conn.execute(stmt, [{"user_id": user_id, "unread": count} for user_id, count in added.items()])
+
+    def page(
+        self,
+        user_id: int,
+        limit: int,
+        after: Optional[Tuple[float, int]] = None,
+        unread_only: bool = False,
+    ) -> list:
+        """Up to ``limit`` items, newest first, after a (created_at, id) position"""
+        stmt = select(inbox_table).where(inbox_table.c.user_id == user_id)
+        if unread_only:
+            stmt = stmt.where(inbox_table.c.read_at.is_(None))
+        if after is not None:
+            stmt = stmt.where(tuple_(inbox_table.c.created_at, inbox_table.c.id) < tuple_(*after))
+        stmt = stmt.order_by(inbox_table.c.created_at.desc(), inbox_table.c.id.desc()).limit(limit)
+        with self.engine.connect() as conn:
+            return conn.execute(stmt).all()
+
+    def _subtract_unread(self, conn, user_id: int, count: int) -> int:
+        if count:
+            conn.execute(
+                update(unread_table)
+                .where(unread_table.c.user_id == user_id)
+                .values(unread=unread_table.c.unread - count)
+            )
+        return self._unread(conn, user_id)
+
+    def _unread(self, conn, user_id: int) -> int:
+        return conn.execute(
+            select(unread_table.c.unread).where(unread_table.c.user_id == user_id)
+        ).scalar() or 0
+
+    def mark_read(self, user_id: int, ids: List[int], now: float) -> Tuple[int, int]:
+        """Mark the user's items read; returns (items changed, unread left)"""
+        with self.engine.begin() as conn:
+            changed = conn.execute(
+                update(inbox_table)
+                .where(
+                    inbox_table.c.user_id == user_id,
+                    inbox_table.c.id.in_(ids),
+                    inbox_table.c.read_at.is_(None),
+                )
+                .values(read_at=now)
+            ).rowcount
+            return changed, self._subtract_unread(conn, user_id, changed)
+
+    def mark_all_read(self, user_id: int, now: float) -> Tuple[int, int]:
+        """Mark every unread item read; returns (items changed, unread left).
+
+        The counter is decremented by what was changed rather than zeroed,
+        so items added concurrently stay counted.
+        """
+        with self.engine.begin() as conn:
+            changed = conn.execute(
+                update(inbox_table)
+                .where(inbox_table.c.user_id == user_id, inbox_table.c.read_at.is_(None))
+                .values(read_at=now)
+            ).rowcount
+            return changed, self._subtract_unread(conn, user_id, changed)
+
+    def unread_count(self, user_id: int) -> int:
+        with self.engine.connect() as conn:
+            return self._unread(conn, user_id)
+
+    def trim(self, read_before: float, batch_size: int) -> int:
+        """Delete up to batch_size items read before ``read_before``"""
+        oldest = (
+            select(inbox_table.c.id)
+            .where(inbox_table.c.read_at < read_before)
+            .limit(batch_size)
+            .scalar_subquery()
+        )
+        with self.engine.begin() as conn:
+            return conn.execute(delete(inbox_table).where(inbox_table.c.id.in_(oldest))).rowcount
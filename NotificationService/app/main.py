@@ -1,32 +1,93 @@
 # NotificationService/app/main.py
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+from fastapi import FastAPI, HTTPException, Query, Response, status
+from pydantic import BaseModel, conlist
+from typing import List, Optional
 import uvicorn
 import signal
 import sys
+import time
 
+from app.core.config import STATIC_SETTINGS, settings
+from app.database.session import create_db_engine, init_db
+from app.delivery.channels import get_channel
+from app.delivery.engine import DeliveryEngine
+from app.delivery.queue import NotificationQueue
+from app.inbox.store import Inbox
 from app.utils.consul_client import ConsulClient
+from app.utils.metrics import NOTIFICATIONS_ACCEPTED, MetricsMiddleware, metrics
+from app.utils.pagination import InvalidCursor, decode_cursor, encode_cursor
 
 app = FastAPI(title="Notification Service")
+app.add_middleware(MetricsMiddleware)
+app.add_api_route("/metrics", metrics, methods=["GET"], include_in_schema=False)
 consul_client = ConsulClient()
+engine = create_db_engine()
+notification_queue = NotificationQueue(engine)
+inbox = Inbox(engine)
+delivery = DeliveryEngine(notification_queue, get_channel(settings.DELIVERY_CHANNEL))
 
 class Notification(BaseModel):
     user_id: int
     message: str
 
+class NotificationBatch(BaseModel):
+    notifications: List[Notification]
+
+class InboxItem(BaseModel):
+    id: int
+    user_id: int
+    message: str
+    created_at: float
+    read: bool
+
+class MarkRead(BaseModel):
+    user_id: int
+    ids: conlist(int, min_items=1, max_items=settings.INBOX_MARK_READ_MAX_IDS)
+
+class MarkAllRead(BaseModel):
+    user_id: int
+
+class UnreadCount(BaseModel):
+    user_id: int
+    unread: int
+
+def accept(notifications: List[Notification]):
+    """Persist notifications for the delivery workers and the users' inboxes.
+
+    Both are written in one transaction, so they survive restarts together.
+    """
+    if not notifications:
+        return
+    pairs = [(n.user_id, n.message) for n in notifications]
+    now = time.time()
+    with engine.begin() as conn:
+        notification_queue.add(conn, pairs, now)
+        inbox.add(conn, pairs, now)
+    NOTIFICATIONS_ACCEPTED.inc(len(notifications))
+
 @app.on_event("startup")
 async def startup_event():
-    """Register with Consul on startup"""
-    consul_client.register_service(
-        name="notification-service",
-        port=8081,  # Using a different port than ToDoApp
-        tags=["notification", "api"]
-    )
+    """Follow Consul config, create the tables, start delivering and register"""
+    if settings.CONSUL_ENABLED and settings.CONSUL_CONFIG_ENABLED:
+        consul_client.watch_config(settings, settings.CONSUL_CONFIG_PREFIX, STATIC_SETTINGS)
+    init_db(engine)
+    if settings.DELIVERY_ENABLED:
+        await delivery.start()
+    if settings.CONSUL_ENABLED:
+        consul_client.register_service(
+            name=settings.SERVICE_NAME,
+            port=settings.SERVICE_PORT,  # Using a different port than ToDoApp
+            tags=["notification", "api"]
+        )
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    """Deregister from Consul on shutdown"""
-    consul_client.deregister_service()
+    """Deregister from Consul, then let the workers finish what they claimed"""
+    if settings.CONSUL_ENABLED:
+        consul_client.deregister_service()
+    await delivery.stop()
+    engine.dispose()
+    consul_client.close()
 
 @app.get("/")
 def root():
@@ -42,24 +103,72 @@ def health_check():
     """Health check endpoint for Consul"""
     return {"status": "healthy"}
 
-@app.get("/api/notifications")
-def get_notifications():
-    """Get notifications information"""
-    return {
-        "status": "success",
-        "message": "Notification service is running",
-        "endpoints": {
-            "POST /api/notifications": "Send a notification (requires user_id and message)"
+@app.get("/api/notifications", response_model=List[InboxItem])
+def get_notifications(
+    response: Response,
+    user_id: int,
+    limit: int = Query(settings.INBOX_PAGE_SIZE, ge=1, le=settings.INBOX_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    unread_only: bool = False,
+):
+    """A user's inbox, newest first, one page at a time.
+
+    The next page is requested by passing the X-Next-Cursor response header
+    back as ``cursor``.
+    """
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Fetch one extra row to learn whether another page exists
+    rows = inbox.page(user_id, limit + 1, after, unread_only)
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(rows[-1].created_at, rows[-1].id)
+    return [
+        {
+            "id": row.id,
+            "user_id": row.user_id,
+            "message": row.message,
+            "created_at": row.created_at,
+            "read": row.read_at is not None,
         }
-    }
+        for row in rows
+    ]
+
+@app.get("/api/notifications/unread-count", response_model=UnreadCount)
+def get_unread_count(user_id: int):
+    """Unread items in a user's inbox, from the maintained counter"""
+    return {"user_id": user_id, "unread": inbox.unread_count(user_id)}
 
-@app.post("/api/notifications")
+@app.post("/api/notifications/read")
+def mark_read(request: MarkRead):
+    """Mark some of a user's inbox items read"""
+    updated, unread = inbox.mark_read(request.user_id, request.ids, time.time())
+    return {"updated": updated, "unread": unread}
+
+@app.post("/api/notifications/read-all")
+def mark_all_read(request: MarkAllRead):
+    """Mark every item in a user's inbox read"""
+    updated, unread = inbox.mark_all_read(request.user_id, time.time())
+    return {"updated": updated, "unread": unread}
+
+@app.post("/api/notifications", status_code=status.HTTP_202_ACCEPTED)
 def send_notification(notification: Notification):
-    """Send a notification to a user"""
+    """Queue a notification to a user; delivery happens in the background"""
+    try:
+        accept([notification])
+        return {"status": "accepted", "notification": notification.dict()}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/notifications/batch", status_code=status.HTTP_202_ACCEPTED)
+def send_notifications(batch: NotificationBatch):
+    """Queue a batch of notifications in one transaction"""
     try:
-        # In a real implementation, this would send an email, SMS, etc.
-        print(f"Sending notification to user {notification.user_id}: {notification.message}")
-        return {"status": "success", "notification": notification.dict()}
+        accept(batch.notifications)
+        return {"status": "accepted", "count": len(batch.notifications)}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -73,4 +182,4 @@ signal.signal(signal.SIGINT, signal_handler)
 signal.signal(signal.SIGTERM, signal_handler)
 
 if __name__ == "__main__":
-    uvicorn.run("app.main:app", host="0.0.0.0", port=8081, reload=True)
\ No newline at end of file
+    uvicorn.run("app.main:app", host="0.0.0.0", port=settings.SERVICE_PORT, reload=True)
\ No newline at end of file
@@ -0,0 +1,2 @@
+from app.models.inbox import InboxNotification, InboxUnreadCount
+from app.models.queue import DeadLetter, QueuedNotification
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Float, Index, Integer, String
+from app.database.base import Base
+
+class InboxNotification(Base):
+    """A notification as shown in the user's in-app inbox"""
+    __tablename__ = "notification_inbox"
+    __table_args__ = (
+        # Backs keyset pagination of a user's inbox, newest first
+        Index("ix_notification_inbox_user_id_created_at", "user_id", "created_at", "id"),
+        # Backs the retention job: read items older than the cutoff
+        Index("ix_notification_inbox_read_at", "read_at"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, nullable=False)
+    message = Column(String, nullable=False)
+    created_at = Column(Float, nullable=False)
+    read_at = Column(Float, nullable=True)
+
+class InboxUnreadCount(Base):
+    """Unread inbox items per user, kept in step with every inbox write"""
+    __tablename__ = "notification_inbox_unread"
+
+    user_id = Column(Integer, primary_key=True)
+    unread = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,38 @@
+from sqlalchemy import Column, Float, Index, Integer, String
+from app.database.base import Base
+
+# Times are Unix timestamps (seconds), so scheduling is plain arithmetic
+
+class QueuedNotification(Base):
+    """An accepted notification waiting for (another) delivery attempt"""
+    __tablename__ = "notification_queue"
+    __table_args__ = (
+        # Ready rows: WHERE available_at <= now AND lease expired or unset
+        Index("ix_notification_queue_available_at", "available_at"),
+        # A claim takes every ready row of the chosen users
+        Index("ix_notification_queue_user_id", "user_id"),
+        Index("ix_notification_queue_lease_token", "lease_token"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, nullable=False)
+    message = Column(String, nullable=False)
+    created_at = Column(Float, nullable=False)
+    available_at = Column(Float, nullable=False)
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(String, nullable=True)
+    # Set while a worker holds the row
+    lease_token = Column(String, nullable=True)
+    leased_until = Column(Float, nullable=True)
+
+class DeadLetter(Base):
+    """A notification that failed DELIVERY_MAX_ATTEMPTS times"""
+    __tablename__ = "notification_dead_letters"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, nullable=False)
+    message = Column(String, nullable=False)
+    created_at = Column(Float, nullable=False)
+    failed_at = Column(Float, nullable=False)
+    attempts = Column(Integer, nullable=False)
+    last_error = Column(String, nullable=True)
@@ -1,21 +1,25 @@
 # NotificationService/app/utils/consul_client.py
 import consul
-from typing import Any, Dict, Optional, List
+import threading
+from typing import Any, Dict, FrozenSet, Optional, List
 import socket
 import os
 
+from app.core.config import settings
+
 
 class ConsulClient:
-    def __init__(self, host=None, port=None):
+    def __init__(self, host=None, port=None, consul_api=None):
         # Get host and port from environment variables or use defaults
         self.host = host or os.environ.get("CONSUL_HOST", "localhost")
         self.port = port or int(os.environ.get("CONSUL_PORT", "8500"))
 
-        self.consul = consul.Consul(
+        self.consul = consul_api or consul.Consul(
             host=self.host,
             port=self.port
         )
         self.service_id = None
+        self._config_stop: Optional[threading.Event] = None
 
     def register_service(self, name: str, port: int, tags: list = None):
         """Register the service with Consul"""
@@ -47,6 +51,69 @@ class ConsulClient:
             self.consul.agent.service.deregister(self.service_id)
             print(f"Deregistered service {self.service_id} from Consul")
 
+    def watch_config(self, target, prefix: str, static: FrozenSet[str] = frozenset()):
+        """Apply the settings overrides under a KV prefix to target, now and on every change.
+
+        Each key names a field, e.g. <prefix>DELIVERY_RETRY_MAX_SECONDS, and
+        deleting a key reverts the field. Every update is validated as a
+        whole and swapped into target in one assignment, so readers never
+        see half of it. Settings read only at startup (worker counts,
+        request limits) take effect on restart.
+        """
+        if self._config_stop is not None:
+            return
+        self._config_stop = threading.Event()
+        base = target.dict()
+
+        def apply(entries):
+            overrides = {}
+            for entry in entries or []:
+                name = entry["Key"][len(prefix):]
+                if name in target.__fields__ and name not in static:
+                    overrides[name] = (entry["Value"] or b"").decode("utf-8")
+                elif name:
+                    print(f"Ignoring Consul config key {entry['Key']}: not a dynamic setting")
+            try:
+                fresh = type(target)(**{**base, **overrides})
+            except ValueError as e:
+                print(f"Ignoring Consul config update, keeping current settings: {e}")
+                return
+            changed = [name for name in fresh.__fields__ if getattr(fresh, name) != getattr(target, name)]
+            object.__setattr__(target, "__dict__", fresh.__dict__)
+            if changed:
+                print(f"Applied settings from Consul: {', '.join(changed)}")
+
+        def follow(stop: threading.Event, index=None):
+            while not stop.is_set():
+                try:
+                    new_index, entries = self.consul.kv.get(
+                        prefix, recurse=True, index=index, wait=settings.CONSUL_WATCH_WAIT if index else None
+                    )
+                    if new_index != index:
+                        apply(entries)
+                    index = new_index
+                except Exception as e:
+                    print(f"Consul config watch failed, keeping current settings: {e}")
+                    index = None
+                    stop.wait(settings.CONSUL_WATCH_RETRY_SECONDS)
+
+        # Apply what is there before serving, when Consul is up
+        try:
+            index, entries = self.consul.kv.get(prefix, recurse=True)
+            apply(entries)
+        except Exception as e:
+            print(f"Consul config load from {prefix} failed, using local settings: {e}")
+            index = None
+        threading.Thread(
+            target=follow, args=(self._config_stop, index), name="consul-config-watch", daemon=True
+        ).start()
+
+    def close(self):
+        """Stop the config watch"""
+        if self._config_stop is not None:
+            self._config_stop.set()
+            self._config_stop = None
+
     def get_config(self, key: str, default: Any = None) -> Any:
         """Get a configuration value from Consul KV store"""
         index, data = self.consul.kv.get(key)
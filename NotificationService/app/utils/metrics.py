@@ -0,0 +1,99 @@
+# NotificationService/app/utils/metrics.py
+"""Prometheus metrics, the request metrics middleware and the /metrics endpoint."""
+import time
+
+from fastapi import Response
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "notification_http_request_seconds",
+    "Time to handle an HTTP request, by route template and status",
+    ["method", "route", "status"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "notification_http_requests_in_flight",
+    "HTTP requests being handled",
+)
+NOTIFICATIONS_ACCEPTED = Counter(
+    "notification_notifications_accepted_total",
+    "Notifications written to the delivery queue",
+)
+NOTIFICATIONS_SENT = Counter(
+    "notification_notifications_sent_total",
+    "Notifications handed to a delivery channel, counting each one in a digest",
+)
+NOTIFICATION_SEND_SECONDS = Histogram(
+    "notification_send_seconds",
+    "Time for the channel to deliver one message or digest",
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0),
+)
+NOTIFICATION_DELIVERY_LAG_SECONDS = Histogram(
+    "notification_delivery_lag_seconds",
+    "Time from accepting a notification to delivering it",
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0),
+)
+NOTIFICATION_DELIVERY_FAILURES = Counter(
+    "notification_delivery_failures_total",
+    "Failed channel sends; the notifications are retried or dead-lettered",
+)
+NOTIFICATIONS_DEAD_LETTERED = Counter(
+    "notification_notifications_dead_lettered_total",
+    "Notifications moved to the dead-letter table after DELIVERY_MAX_ATTEMPTS",
+)
+
+# Label for requests answered without routing (404s)
+UNMATCHED_ROUTE = "unmatched"
+# Anything else is labelled OTHER, so clients cannot mint new label values
+METHODS = frozenset(("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"))
+
+
+class MetricsMiddleware:
+    """Observe latency per (method, route template, status) and requests in flight"""
+
+    def __init__(self, app):
+        self.app = app
+        self._routes = {}  # endpoint -> route path template
+        self._histograms = {}  # (method, route, status) -> histogram child
+
+    def _route(self, scope) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return UNMATCHED_ROUTE
+        route = self._routes.get(endpoint)
+        if route is None:
+            self._routes = {r.endpoint: r.path for r in scope["app"].routes if hasattr(r, "endpoint")}
+            route = self._routes.setdefault(endpoint, UNMATCHED_ROUTE)
+        return route
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            method = scope["method"] if scope["method"] in METHODS else "OTHER"
+            key = (method, self._route(scope), status_code)
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = HTTP_REQUEST_SECONDS.labels(*key)
+            histogram.observe(elapsed)
+
+
+def metrics():
+    """Prometheus metrics for this process"""
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,65 @@
+# NotificationService/app/workers/inbox_retention.py
+"""Retention worker that trims read inbox items.
+
+Items read more than INBOX_RETENTION_DAYS ago are deleted in batches of
+INBOX_RETENTION_BATCH_SIZE, one short transaction each, so the inbox
+stays writable while a large backlog is trimmed. Unread items are kept.
+
+    python -m app.workers.inbox_retention          # run periodically
+    python -m app.workers.inbox_retention --once   # e.g. from cron
+"""
+import argparse
+import signal
+import threading
+import time
+
+from app.core.config import settings
+from app.database.session import create_db_engine, init_db
+from app.inbox.store import Inbox
+
+
+def trim(inbox: Inbox, now: float = None) -> int:
+    """Delete every read item past the retention window; returns items removed"""
+    cutoff = (now or time.time()) - settings.INBOX_RETENTION_DAYS * 86400
+    removed = 0
+    while True:
+        count = inbox.trim(cutoff, settings.INBOX_RETENTION_BATCH_SIZE)
+        removed += count
+        if count < settings.INBOX_RETENTION_BATCH_SIZE:
+            return removed
+
+
+def run(stop: threading.Event, inbox: Inbox):
+    """Trim every INBOX_RETENTION_INTERVAL_SECONDS until stop is set"""
+    while not stop.is_set():
+        try:
+            removed = trim(inbox)
+            if removed:
+                print(f"Removed {removed} read inbox items")
+        except Exception as e:
+            print(f"Inbox retention failed: {e}")
+        stop.wait(settings.INBOX_RETENTION_INTERVAL_SECONDS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--once", action="store_true", help="trim once and exit")
+    args = parser.parse_args()
+
+    engine = create_db_engine()
+    init_db(engine)
+    inbox = Inbox(engine)
+    if args.once:
+        print(f"Removed {trim(inbox)} read inbox items")
+        return
+
+    stop = threading.Event()
+    signal.signal(signal.SIGINT, lambda sig, frame: stop.set())
+    signal.signal(signal.SIGTERM, lambda sig, frame: stop.set())
+    print("Inbox retention started")
+    run(stop, inbox)
+    print("Inbox retention stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+# NotificationService/benchmarks/bench_delivery.py
+"""Measure delivery throughput and lag through the queue with a slow channel.
+
+An open-loop producer enqueues notifications for random users at a fixed
+rate while the delivery workers drain the queue into a stub channel that
+takes --latency seconds per send. Reports delivered notifications and
+channel sends per second, and accept-to-delivery lag percentiles, for each
+worker count.
+
+Run from the NotificationService directory:
+
+    PYTHONPATH=. python benchmarks/bench_delivery.py --rate 2000 --latency 0.05 --workers 1,4,16
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("CONSUL_ENABLED", "false")
+
+from app.core.config import settings
+from app.database.session import create_db_engine, init_db
+from app.delivery.engine import DeliveryEngine
+from app.delivery.queue import NotificationQueue
+
+PRODUCER_TICK_SECONDS = 0.01
+
+
+class SlowChannel:
+    """Takes a fixed time per send, like a remote email or push API"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.sends = 0
+
+    async def send(self, user_id: int, message: str) -> None:
+        await asyncio.sleep(self.latency)
+        self.sends += 1
+
+
+class LagRecordingQueue(NotificationQueue):
+    """Records when each delivered notification was accepted and removed"""
+
+    def __init__(self, engine):
+        super().__init__(engine)
+        self.lags = []
+        self._claimed = {}
+
+    def claim(self, now, max_users, lease_seconds):
+        token, rows = super().claim(now, max_users, lease_seconds)
+        self._claimed.update((row.id, row.created_at) for row in rows)
+        return token, rows
+
+    def complete(self, token, ids):
+        super().complete(token, ids)
+        now = time.time()
+        self.lags.extend(now - self._claimed.pop(i) for i in ids)
+
+
+def percentile(samples, fraction):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))] if samples else float("nan")
+
+
+async def run(path: str, workers: int, args) -> dict:
+    engine = create_db_engine(f"sqlite:///{path}")
+    init_db(engine)
+    queue = LagRecordingQueue(engine)
+    channel = SlowChannel(args.latency)
+    delivery = DeliveryEngine(queue, channel, workers=workers)
+    rng = random.Random(args.seed)
+
+    await delivery.start()
+    started = time.perf_counter()
+    accepted = 0
+    while time.perf_counter() - started < args.duration:
+        due = int((time.perf_counter() - started) * args.rate) - accepted
+        if due:
+            batch = [(rng.randint(1, args.users), f"Notification {accepted + i}") for i in range(due)]
+            await asyncio.to_thread(queue.enqueue, batch, time.time())
+            accepted += due
+        await asyncio.sleep(PRODUCER_TICK_SECONDS)
+    # Give the workers a bounded time to drain what is left
+    drain_started = time.perf_counter()
+    while len(queue.lags) < accepted and time.perf_counter() - drain_started < args.drain:
+        await asyncio.sleep(0.05)
+    elapsed = time.perf_counter() - started
+    await delivery.stop()
+    backlog = queue.depth()
+    engine.dispose()
+
+    return {
+        "workers": workers,
+        "accepted": accepted,
+        "delivered": len(queue.lags),
+        "backlog": backlog,
+        "delivered_per_second": round(len(queue.lags) / elapsed, 1),
+        "sends_per_second": round(channel.sends / elapsed, 1),
+        "notifications_per_send": round(len(queue.lags) / max(channel.sends, 1), 2),
+        "lag_p50_ms": round(percentile(queue.lags, 0.5) * 1000, 1),
+        "lag_p99_ms": round(percentile(queue.lags, 0.99) * 1000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rate", type=float, default=2000.0, help="notifications accepted per second")
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--drain", type=float, default=30.0, help="seconds allowed to drain the backlog")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per channel send")
+    parser.add_argument("--workers", default="1,4,16", help="comma separated worker counts")
+    parser.add_argument("--window", type=float, default=settings.DIGEST_WINDOW_SECONDS,
+                        help="DIGEST_WINDOW_SECONDS")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    settings.DIGEST_WINDOW_SECONDS = args.window
+    settings.DELIVERY_POLL_SECONDS = min(settings.DELIVERY_POLL_SECONDS, 0.05)
+
+    results = []
+    for workers in (int(w) for w in args.workers.split(",")):
+        with tempfile.TemporaryDirectory() as tmp:
+            result = asyncio.run(run(os.path.join(tmp, "queue.db"), workers, args))
+        results.append(result)
+        print(
+            f"workers {workers:>3}: {result['delivered_per_second']:8.1f} delivered/s  "
+            f"{result['sends_per_second']:7.1f} sends/s  {result['notifications_per_send']:5.2f} per send  "
+            f"lag p50 {result['lag_p50_ms']:8.1f} ms  p99 {result['lag_p99_ms']:8.1f} ms  "
+            f"backlog {result['backlog']}",
+            file=sys.stderr,
+        )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
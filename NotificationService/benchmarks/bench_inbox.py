@@ -0,0 +1,132 @@
+# NotificationService/benchmarks/bench_inbox.py
+"""Measure inbox reads, unread counts and retention at millions of rows.
+
+Seeds a fresh SQLite inbox with --rows items spread over --users users,
+about half of them read long ago, then times:
+
+- the first page and a page --depth pages deep for random users
+- the maintained unread counter against COUNT(*) over the user's items
+- mark-all-read for random users
+- the retention job trimming every old read item
+
+Run from the NotificationService directory:
+
+    PYTHONPATH=. python benchmarks/bench_inbox.py --rows 2000000 --users 10000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("CONSUL_ENABLED", "false")
+
+from sqlalchemy import func, insert, select
+
+from app.core.config import settings
+from app.database.session import create_db_engine, init_db
+from app.inbox.store import Inbox, inbox_table, unread_table
+from app.workers import inbox_retention
+
+SEED_CHUNK_SIZE = 20000
+
+
+def seed(engine, rows: int, users: int, rng: random.Random):
+    now = time.time()
+    old = now - (settings.INBOX_RETENTION_DAYS + 1) * 86400
+    with engine.begin() as conn:
+        chunk = []
+        for i in range(rows):
+            created_at = old + i * 0.001
+            chunk.append({
+                "user_id": rng.randint(1, users),
+                "message": f"Notification {i}",
+                "created_at": created_at,
+                "read_at": created_at if rng.random() < 0.5 else None,
+            })
+            if len(chunk) == SEED_CHUNK_SIZE:
+                conn.execute(insert(inbox_table), chunk)
+                chunk = []
+        if chunk:
+            conn.execute(insert(inbox_table), chunk)
+        conn.execute(insert(unread_table).from_select(
+            ["user_id", "unread"],
+            select(inbox_table.c.user_id, func.count())
+            .where(inbox_table.c.read_at.is_(None))
+            .group_by(inbox_table.c.user_id),
+        ))
+
+
+def timed(fn, samples: int) -> dict:
+    latencies = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    return {
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 3),
+        "p99_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--page-size", type=int, default=settings.INBOX_PAGE_SIZE)
+    parser.add_argument("--depth", type=int, default=5, help="pages to follow for the deep page")
+    parser.add_argument("--samples", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_db_engine(f"sqlite:///{os.path.join(tmp, 'inbox.db')}")
+        init_db(engine)
+        started = time.perf_counter()
+        seed(engine, args.rows, args.users, rng)
+        print(f"seeded {args.rows} inbox items in {time.perf_counter() - started:.1f} s", file=sys.stderr)
+        inbox = Inbox(engine)
+
+        def user():
+            return rng.randint(1, args.users)
+
+        def deep_page():
+            user_id, after = user(), None
+            for _ in range(args.depth):
+                rows = inbox.page(user_id, args.page_size, after)
+                if len(rows) < args.page_size:
+                    return
+                after = (rows[-1].created_at, rows[-1].id)
+
+        def count_star():
+            with engine.connect() as conn:
+                conn.execute(
+                    select(func.count())
+                    .select_from(inbox_table)
+                    .where(inbox_table.c.user_id == user(), inbox_table.c.read_at.is_(None))
+                ).scalar()
+
+        results = {
+            "first_page": timed(lambda: inbox.page(user(), args.page_size), args.samples),
+            f"page_{args.depth}": timed(deep_page, args.samples),
+            "unread_counter": timed(lambda: inbox.unread_count(user()), args.samples),
+            "unread_count_star": timed(count_star, args.samples),
+            "mark_all_read": timed(lambda: inbox.mark_all_read(user(), time.time()), args.samples),
+        }
+        started = time.perf_counter()
+        removed = inbox_retention.trim(inbox)
+        elapsed = time.perf_counter() - started
+        results["retention"] = {"removed": removed, "rows_per_second": round(removed / elapsed)}
+        engine.dispose()
+
+    for name, result in results.items():
+        print(f"{name:>18}: {result}", file=sys.stderr)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,99 @@
+import os
+import tempfile
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/test_notifications.db")
+os.environ.setdefault("CONSUL_ENABLED", "false")
+
+import asyncio
+import json
+import random
+import threading
+import time
+
 from fastapi.testclient import TestClient
 import pytest
-from app.main import app
+from app.core.config import STATIC_SETTINGS, Settings, settings
+from app.database.session import create_db_engine, init_db
+from app.delivery.channels import FileChannel
+from app.delivery.engine import DeliveryEngine, digest_message, retry_delay
+from app.delivery.queue import NotificationQueue
+from app.main import app, engine, inbox
+from app.utils.consul_client import ConsulClient
+from app.workers import inbox_retention
+
+# Deliver as soon as the workers poll, without waiting for a digest window
+settings.DIGEST_WINDOW_SECONDS = 0.0
+settings.DELIVERY_POLL_SECONDS = 0.05
+
+# Create the queue tables; the startup event, which also starts delivery,
+# only runs for the tests that open the client with `with`
+init_db(engine)
 
 # Create test client
 client = TestClient(app)
 
+class FakeChannel:
+    """Records what was sent, failing the first ``failures`` sends"""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.sent = []
+
+    async def send(self, user_id, message):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("channel unavailable")
+        self.sent.append((user_id, message))
+
+class FakeKV:
+    """In-process stand-in for the Consul KV API with blocking queries"""
+
+    def __init__(self):
+        self.kv = self
+        self.index = 1
+        self.values = {}
+        self.changed = threading.Condition()
+        # Index of the latest blocking query, i.e. what the watcher has applied
+        self.watched_index = None
+
+    def put(self, key, value):
+        with self.changed:
+            self.values[key] = value.encode("utf-8")
+            self.index += 1
+            self.changed.notify_all()
+
+    def delete(self, key):
+        with self.changed:
+            self.values.pop(key, None)
+            self.index += 1
+            self.changed.notify_all()
+
+    def get(self, key, index=None, recurse=False, wait=None, **kwargs):
+        with self.changed:
+            if index is not None:
+                self.watched_index = index
+                self.changed.notify_all()
+                self.changed.wait_for(lambda: self.index != index, timeout=0.2)
+            entries = [
+                {"Key": k, "Value": v} for k, v in sorted(self.values.items())
+                if (k.startswith(key) if recurse else k == key)
+            ]
+            return str(self.index), entries or None
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def queue(tmp_path):
+    db_engine = create_db_engine(f"sqlite:///{tmp_path / 'queue.db'}")
+    init_db(db_engine)
+    yield NotificationQueue(db_engine)
+    db_engine.dispose()
+
 def test_health_check():
     response = client.get("/health")
     assert response.status_code == 200
@@ -16,8 +105,181 @@ def test_send_notification():
         "message": "Test notification message"
     }
     response = client.post("/api/notifications", json=notification_data)
-    assert response.status_code == 200
+    assert response.status_code == 202
     data = response.json()
-    assert data["status"] == "success"
+    assert data["status"] == "accepted"
     assert data["notification"]["user_id"] == 1
-    assert data["notification"]["message"] == "Test notification message"
\ No newline at end of file
+    assert data["notification"]["message"] == "Test notification message"
+def test_send_notification_batch():
+    batch_data = {
+        "notifications": [
+            {"user_id": 1, "message": "First"},
+            {"user_id": 2, "message": "Second"}
+        ]
+    }
+    response = client.post("/api/notifications/batch", json=batch_data)
+    assert response.status_code == 202
+    assert response.json() == {"status": "accepted", "count": 2}
+
+def test_metrics_endpoint():
+    client.post("/api/notifications", json={"user_id": 1, "message": "Counted"})
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert 'notification_http_request_seconds_count{method="POST",route="/api/notifications",status="202"}' in response.text
+    assert "notification_notifications_sent_total" in response.text
+
+def test_inbox_pagination_unread_counter_and_retention():
+    user_id = 7001
+    client.post("/api/notifications/batch", json={"notifications": [
+        {"user_id": user_id, "message": f"Inbox {i}"} for i in range(3)
+    ]})
+    client.post("/api/notifications", json={"user_id": user_id + 1, "message": "Someone else's"})
+
+    def unread():
+        response = client.get(f"/api/notifications/unread-count?user_id={user_id}")
+        assert response.status_code == 200
+        return response.json()["unread"]
+
+    assert unread() == 3
+
+    # Newest first, one page at a time
+    response = client.get(f"/api/notifications?user_id={user_id}&limit=2")
+    assert response.status_code == 200
+    page = response.json()
+    assert [n["message"] for n in page] == ["Inbox 2", "Inbox 1"]
+    assert not any(n["read"] for n in page)
+    cursor = response.headers["X-Next-Cursor"]
+    response = client.get(f"/api/notifications?user_id={user_id}&limit=2&cursor={cursor}")
+    assert [n["message"] for n in response.json()] == ["Inbox 0"]
+    assert "X-Next-Cursor" not in response.headers
+    assert client.get(f"/api/notifications?user_id={user_id}&cursor=bad").status_code == 400
+
+    # Only unread items change the counter, and only the owner's
+    ids = [n["id"] for n in page]
+    response = client.post("/api/notifications/read", json={"user_id": user_id, "ids": ids})
+    assert response.json() == {"updated": 2, "unread": 1}
+    response = client.post("/api/notifications/read", json={"user_id": user_id + 1, "ids": ids})
+    assert response.json()["updated"] == 0
+    response = client.post("/api/notifications/read", json={"user_id": user_id, "ids": ids})
+    assert response.json() == {"updated": 0, "unread": 1}
+    response = client.get(f"/api/notifications?user_id={user_id}&unread_only=true")
+    assert [n["message"] for n in response.json()] == ["Inbox 0"]
+    response = client.post("/api/notifications/read-all", json={"user_id": user_id})
+    assert response.json() == {"updated": 1, "unread": 0}
+    assert unread() == 0
+
+    # Retention removes read items past the window; unread ones stay
+    client.post("/api/notifications", json={"user_id": user_id, "message": "Still unread"})
+    later = time.time() + settings.INBOX_RETENTION_DAYS * 86400 + 1
+    assert inbox_retention.trim(inbox, now=later) >= 3
+    response = client.get(f"/api/notifications?user_id={user_id}")
+    assert [n["message"] for n in response.json()] == ["Still unread"]
+    assert unread() == 1
+
+def test_accepted_notifications_are_delivered_by_workers(tmp_path, monkeypatch):
+    channel = FileChannel(str(tmp_path / "sent.jsonl"))
+    monkeypatch.setattr("app.main.delivery.channel", channel)
+
+    def sent_to(user_id):
+        if not os.path.exists(channel.path):
+            return []
+        with open(channel.path) as f:
+            return [n["message"] for n in map(json.loads, f) if n["user_id"] == user_id]
+
+    with TestClient(app) as running:
+        response = running.post("/api/notifications", json={"user_id": 42, "message": "Queued"})
+        assert response.status_code == 202
+        for _ in range(100):
+            if sent_to(42):
+                break
+            time.sleep(0.05)
+    assert sent_to(42) == ["Queued"]
+
+def test_delivery_coalesces_retries_and_dead_letters(queue, monkeypatch):
+    clock = FakeClock()
+    channel = FakeChannel()
+    delivery = DeliveryEngine(queue, channel, workers=1, clock=clock)
+
+    # A burst to one user goes out as a single digest
+    queue.enqueue([(1, "a"), (2, "b"), (1, "c")], clock.now)
+    assert asyncio.run(delivery.deliver_once()) == 3
+    assert channel.sent == [(1, "2 new notifications:\n- a\n- c"), (2, "b")]
+    assert queue.depth() == 0
+
+    # A failed send is retried after a backoff
+    channel.failures = 1
+    queue.enqueue([(3, "retry me")], clock.now)
+    asyncio.run(delivery.deliver_once())
+    assert queue.depth() == 1
+    assert asyncio.run(delivery.deliver_once()) == 0  # not due yet
+    clock.now += settings.DELIVERY_RETRY_BASE_SECONDS
+    asyncio.run(delivery.deliver_once())
+    assert channel.sent[-1] == (3, "retry me")
+    assert queue.depth() == 0
+
+    # Out of attempts, the notification moves to the dead-letter table
+    monkeypatch.setattr(settings, "DELIVERY_MAX_ATTEMPTS", 2)
+    channel.failures = 2
+    queue.enqueue([(4, "undeliverable")], clock.now)
+    for _ in range(2):
+        asyncio.run(delivery.deliver_once())
+        clock.now += settings.DELIVERY_RETRY_MAX_SECONDS
+    assert queue.depth() == 0
+    [dead] = queue.dead_letters(user_id=4)
+    assert (dead.message, dead.attempts, dead.last_error) == ("undeliverable", 2, "channel unavailable")
+
+def test_claims_are_exclusive_until_the_lease_expires(queue):
+    queue.enqueue([(1, "a"), (2, "b")], 1000.0)
+    token, rows = queue.claim(1000.0, max_users=1, lease_seconds=30)
+    assert [row.user_id for row in rows] == [1]
+    _, rows = queue.claim(1000.0, max_users=10, lease_seconds=30)
+    assert [row.user_id for row in rows] == [2]
+    assert queue.claim(1010.0, max_users=10, lease_seconds=30)[1] == []
+    # The first worker died; its rows are claimed again after the lease
+    _, rows = queue.claim(1031.0, max_users=10, lease_seconds=30)
+    assert {row.user_id for row in rows} == {1, 2}
+    # A worker that lost its lease cannot remove the rows
+    queue.complete(token, [row.id for row in rows])
+    assert queue.depth() == 2
+
+def test_digest_and_backoff_are_bounded(monkeypatch):
+    monkeypatch.setattr(settings, "DIGEST_MAX_MESSAGES", 2)
+    assert digest_message(["a", "b", "c"]) == "3 new notifications:\n- a\n- b\n...and 1 more"
+    rng = random.Random(0)
+    delays = [retry_delay(attempts, rng) for attempts in range(1, 30)]
+    assert settings.DELIVERY_RETRY_BASE_SECONDS / 2 <= delays[0] <= settings.DELIVERY_RETRY_BASE_SECONDS
+    assert max(delays) <= settings.DELIVERY_RETRY_MAX_SECONDS
+
+def test_consul_kv_config_hot_reload():
+    fake = FakeKV()
+    prefix = "config/notification-service/"
+    fake.put(prefix + "DELIVERY_RETRY_MAX_SECONDS", "600")
+    fake.put(prefix + "DATABASE_URL", "sqlite:///elsewhere.db")
+    target = Settings()
+    consul_client = ConsulClient(consul_api=fake)
+
+    def wait_for_watch():
+        # The watcher blocks on the current index only after applying it
+        with fake.changed:
+            assert fake.changed.wait_for(lambda: fake.watched_index == str(fake.index), timeout=2)
+
+    try:
+        consul_client.watch_config(target, prefix, STATIC_SETTINGS)
+        assert target.DELIVERY_RETRY_MAX_SECONDS == 600.0
+        assert target.DATABASE_URL == settings.DATABASE_URL
+
+        fake.put(prefix + "DIGEST_MAX_MESSAGES", "5")
+        wait_for_watch()
+        assert target.DIGEST_MAX_MESSAGES == 5
+
+        # An invalid value rejects the whole update; deleting a key reverts it
+        fake.put(prefix + "DELIVERY_MAX_ATTEMPTS", "often")
+        fake.put(prefix + "DIGEST_MAX_MESSAGES", "7")
+        wait_for_watch()
+        assert target.DIGEST_MAX_MESSAGES == 5
+        fake.delete(prefix + "DELIVERY_MAX_ATTEMPTS")
+        fake.delete(prefix + "DELIVERY_RETRY_MAX_SECONDS")
+        wait_for_watch()
+        assert (target.DIGEST_MAX_MESSAGES, target.DELIVERY_RETRY_MAX_SECONDS) == (7, 300.0)
+    finally:
+        consul_client.close()
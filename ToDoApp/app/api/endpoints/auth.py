@@ -1,11 +1,11 @@
 # ToDoApp/app/api/endpoints/auth.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.dependencies import get_db
-from app.utils.security import verify_password, create_access_token
-from app.crud import crud_user
+from app.dependencies import get_async_db
+from app.utils.security import create_access_token, password_needs_rehash, verify_password_async
+from app.crud import crud_user_async
 from app.schemas.user import UserCreate, UserOut
 
 router = APIRouter(prefix="/auth", tags=["auth"])
@@ -22,27 +22,31 @@ def get_auth_info():
     }
 
 @router.post("/signup", response_model=UserOut)
-def signup(user_in: UserCreate, db: Session = Depends(get_db)):
-    existing_user = crud_user.get_user_by_email(db, user_in.email)
+async def signup(user_in: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    existing_user = await crud_user_async.get_user_by_email(db, user_in.email)
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered",
         )
-    user = crud_user.create_user(db, user_in)
+    user = await crud_user_async.create_user(db, user_in)
     return user
 
 @router.post("/login")
-def login(
+async def login(
+    background_tasks: BackgroundTasks,
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    user = crud_user.get_user_by_email(db, form_data.username)
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    user = await crud_user_async.get_user_by_email(db, form_data.username)
+    if not user or not await verify_password_async(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    access_token = create_access_token(data={"sub": user.id})
+    if password_needs_rehash(user.hashed_password):
+        # Upgrade hashes made with an older cost once the response is out
+        background_tasks.add_task(crud_user_async.rehash_password, db, user, form_data.password)
+    access_token = create_access_token(data={"sub": str(user.id)})
     return {"access_token": access_token, "token_type": "bearer"}
\ No newline at end of file
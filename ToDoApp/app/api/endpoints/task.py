@@ -1,90 +1,360 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.exc import StaleDataError
+from datetime import date
+from typing import List, Optional
+import orjson
 
-from app.dependencies import get_db, get_current_user
-from app.schemas.task import TaskCreate, TaskOut, TaskUpdate
-from app.crud import crud_task
-from app.models.user import User
+from app.core.config import settings
+from app.core.auth_cache import Principal
+from app.dependencies import get_async_db, get_current_principal, get_read_principal
+from app.schemas.task import (
+    TaskBulkComplete,
+    TaskBulkCreate,
+    TaskBulkIds,
+    TaskBulkResult,
+    TaskBulkUpdate,
+    TaskChanges,
+    TaskCreate,
+    TaskOut,
+    TaskStats,
+    TaskUpdate,
+)
+from app.crud import crud_task, crud_task_async, crud_task_cached, crud_task_stats
+from app.database.search import search_terms
+from app.utils.conditional import (
+    collection_etag,
+    is_conditional,
+    is_not_modified,
+    is_precondition_failed,
+    task_etag,
+    validator_headers,
+)
+from app.utils.pagination import (
+    InvalidCursor,
+    decode_change_cursor,
+    decode_cursor,
+    decode_search_cursor,
+    encode_change_cursor,
+    encode_cursor,
+    encode_search_cursor,
+)
 
-from app.utils.notification_client import NotificationClient
-from app.core.consul_client import ConsulClient
-import os
-
-# Initialize clients
-consul_client = ConsulClient()
-notification_client = NotificationClient(consul_client)
+from app.core.clients import get_notification_dispatcher
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
 
 @router.post("/", response_model=TaskOut)
-def create_task(
+async def create_task(
         task_in: TaskCreate,
-        db: Session = Depends(get_db),
-        current_user: User = Depends(get_current_user)
+        db: AsyncSession = Depends(get_async_db),
+        current_user: Principal = Depends(get_current_principal)
 ):
-    task = crud_task.create_task(db, task_in, current_user.id)
+    task = await crud_task_async.create_task(db, task_in, current_user.id)
+
+    if not settings.NOTIFICATION_OUTBOX_ENABLED:
+        # Queue the notification; delivery happens off the request path
+        get_notification_dispatcher().enqueue(current_user.id, crud_task.task_created_message(task))
+
+    return task
+
+@router.get("/", response_model=List[TaskOut], response_class=ORJSONResponse)
+async def get_my_tasks(
+    request: Request,
+    limit: int = Query(settings.TASKS_PAGE_SIZE, ge=1, le=settings.TASKS_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    day_from: Optional[date] = None,
+    day_to: Optional[date] = None,
+    is_completed: Optional[bool] = None,
+    stream: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_read_principal)
+):
+    """List tasks ordered by (day, id), one page at a time.
+
+    The next page is requested by passing the X-Next-Cursor response header
+    back as ``cursor``. With ``stream=true`` every matching task after the
+    cursor is sent as NDJSON instead, ignoring ``limit``.
 
-    # Send notification about the new task
+    Responses carry an ETag built from the user's task collection version;
+    a matching If-None-Match is answered 304 after only that version lookup.
+
+    Rows are selected as column tuples and encoded with orjson directly;
+    they are not validated through TaskOut on the way out.
+    """
     try:
-        notification_client.send_notification(
-            current_user.id,
-            f"New task created: {task.title} due on {task.day}"
+        after = decode_cursor(cursor) if cursor else None
+    except InvalidCursor as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
         )
-    except Exception as e:
-        # Don't fail if notification service is unavailable
-        print(f"Failed to send notification: {e}")
 
-    return task
+    headers = {}
+    version = await crud_task_async.get_tasks_version(db, current_user.id)
+    if version is not None:
+        etag = collection_etag(version.tasks_version, request)
+        headers = validator_headers(etag, version.tasks_updated_at)
+        if is_not_modified(request, etag, version.tasks_updated_at):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    filters = dict(day_from=day_from, day_to=day_to, is_completed=is_completed, after=after)
 
-@router.get("/", response_model=List[TaskOut])
-def get_my_tasks(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    if stream:
+        rows = crud_task_async.iter_task_rows_by_owner(db, current_user.id, **filters)
+        return StreamingResponse(
+            (orjson.dumps(row) + b"\n" async for row in rows),
+            media_type="application/x-ndjson",
+            headers=headers,
+        )
+
+    # Fetch one extra row to learn whether another page exists
+    if version is not None:
+        rows = await crud_task_cached.get_task_rows_by_owner(
+            db, current_user.id, version.tasks_version, limit=limit + 1, **filters
+        )
+    else:
+        rows = await crud_task_async.get_task_rows_by_owner(db, current_user.id, limit=limit + 1, **filters)
+    if len(rows) > limit:
+        rows = rows[:limit]
+        headers["X-Next-Cursor"] = encode_cursor(date.fromisoformat(rows[-1]["day"]), rows[-1]["id"])
+    return ORJSONResponse(rows, headers=headers)
+
+@router.get("/changes", response_model=TaskChanges)
+async def get_task_changes(
+    since: Optional[str] = None,
+    limit: int = Query(settings.TASKS_PAGE_SIZE, ge=1, le=settings.TASKS_MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_read_principal)
 ):
-    return crud_task.get_tasks_by_owner(db, current_user.id)
+    """Tasks created, updated or deleted after ``since``, in change order.
+
+    Omit ``since`` on the first sync, then pass back ``cursor`` and repeat
+    while ``has_more``. A 410 means the cursor is older than the retained
+    tombstones and the client has to resync from scratch.
+    """
+    try:
+        after = decode_change_cursor(since) if since else (0, 0)
+    except InvalidCursor as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+
+    if since:
+        purged_seq = await crud_task_async.get_tombstones_purged_seq(db, current_user.id)
+        if after[0] < purged_seq:
+            raise HTTPException(
+                status_code=status.HTTP_410_GONE,
+                detail="Change cursor expired, resync without since",
+            )
+
+    page, has_more = await crud_task_async.get_changes(db, current_user.id, after, limit)
+    return {
+        "changes": [task for _, _, task in page if task is not None],
+        "deleted": [task_id for _, task_id, task in page if task is None],
+        "cursor": encode_change_cursor(*page[-1][:2]) if page else encode_change_cursor(*after),
+        "has_more": has_more,
+    }
+
+@router.get("/stats", response_model=TaskStats)
+async def get_task_stats(
+    day_from: Optional[date] = None,
+    day_to: Optional[date] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_read_principal)
+):
+    """Per-day and overall task counts, completion rate and overdue tasks.
+
+    Read from the per-day summary table, so the cost grows with the number
+    of days in the range, not the number of tasks.
+    """
+    rows = await crud_task_async.get_day_stats(db, current_user.id, day_from, day_to)
+    return crud_task_stats.summarize(rows, date.today())
+
+@router.get("/search", response_model=List[TaskOut], response_class=ORJSONResponse)
+async def search_tasks(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(settings.TASKS_PAGE_SIZE, ge=1, le=settings.TASKS_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    day_from: Optional[date] = None,
+    day_to: Optional[date] = None,
+    is_completed: Optional[bool] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_read_principal)
+):
+    """Tasks whose title contains every word of ``q`` as a word prefix, best match first.
+
+    Served from the full-text index; pass the X-Next-Cursor response header
+    back as ``cursor`` (with the same ``q``) for the next page. Later pages
+    leave out tasks created after the first one, but ranks shift as tasks
+    change, so pages are approximate: a task whose rank moved meanwhile can
+    be repeated or skipped.
+    """
+    terms = search_terms(q)
+    if not terms:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Search query has no words",
+        )
+    try:
+        max_id, offset = decode_search_cursor(cursor) if cursor else (None, 0)
+    except InvalidCursor as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    if max_id is None:
+        max_id = await crud_task_async.get_max_task_id(db)
+
+    rows = await crud_task_async.search_task_rows(
+        db, current_user.id, terms, day_from, day_to, is_completed, max_id, offset, limit + 1
+    )
+    headers = {}
+    if len(rows) > limit:
+        rows = rows[:limit]
+        headers["X-Next-Cursor"] = encode_search_cursor(max_id, offset + limit)
+    return ORJSONResponse(rows, headers=headers)
+
+def _precondition_failed() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_412_PRECONDITION_FAILED,
+        detail="Task was modified by another request",
+    )
+
+async def _ensure_owned(db: AsyncSession, owner_id: int, task_ids: List[int]):
+    missing = set(task_ids) - await crud_task_async.get_owned_task_ids(db, owner_id, task_ids)
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Tasks not found: {sorted(missing)}",
+        )
+
+@router.post("/bulk", response_model=List[TaskOut])
+async def create_tasks_bulk(
+    bulk_in: TaskBulkCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Create many tasks in one transaction, with a single notification"""
+    tasks = await crud_task_async.create_tasks_bulk(db, bulk_in.tasks, current_user.id)
+
+    if not settings.NOTIFICATION_OUTBOX_ENABLED:
+        get_notification_dispatcher().enqueue(current_user.id, crud_task.tasks_created_message(tasks))
+
+    return tasks
+
+@router.patch("/bulk", response_model=List[TaskOut])
+async def update_tasks_bulk(
+    bulk_update: TaskBulkUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Apply partial updates to many tasks in one transaction"""
+    await _ensure_owned(db, current_user.id, [item.id for item in bulk_update.tasks])
+    return await crud_task_async.update_tasks_bulk(db, current_user.id, bulk_update.tasks)
+
+@router.post("/bulk/complete", response_model=TaskBulkResult)
+async def complete_tasks_bulk(
+    bulk_complete: TaskBulkComplete,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Mark many tasks completed (or not) with a single UPDATE"""
+    await _ensure_owned(db, current_user.id, bulk_complete.ids)
+    count = await crud_task_async.complete_tasks_bulk(
+        db, current_user.id, bulk_complete.ids, bulk_complete.is_completed
+    )
+    return {"count": count}
+
+@router.delete("/bulk", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_tasks_bulk(
+    bulk_delete: TaskBulkIds,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Delete many tasks in one transaction"""
+    await _ensure_owned(db, current_user.id, bulk_delete.ids)
+    await crud_task_async.delete_tasks_bulk(db, current_user.id, bulk_delete.ids)
+    return
 
 @router.get("/{task_id}", response_model=TaskOut)
-def get_task_by_id(
+async def get_task_by_id(
     task_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_read_principal)
 ):
-    task = crud_task.get_task_by_id(db, task_id)
-    if not task or task.owner_id != current_user.id:
+    if is_conditional(request):
+        # Revalidation only needs the version, not the row
+        row = await crud_task_async.get_task_version(db, task_id)
+        if row is not None and row.owner_id == current_user.id:
+            etag = task_etag(row.version)
+            if is_not_modified(request, etag, row.updated_at):
+                return Response(
+                    status_code=status.HTTP_304_NOT_MODIFIED,
+                    headers=validator_headers(etag, row.updated_at),
+                )
+
+    version = await crud_task_async.get_tasks_version(db, current_user.id)
+    task = None
+    if version is not None:
+        task = await crud_task_cached.get_task_by_id(db, current_user.id, version.tasks_version, task_id)
+    if not task:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Task not found",
         )
+    response.headers.update(validator_headers(task_etag(task.version), task.updated_at))
     return task
 
 @router.patch("/{task_id}", response_model=TaskOut)
-def update_task(
+async def update_task(
     task_id: int,
     task_update: TaskUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal)
 ):
-    task = crud_task.get_task_by_id(db, task_id)
+    """Partial update; send the task's ETag as If-Match to avoid lost updates"""
+    task = await crud_task_async.get_task_by_id(db, task_id)
     if not task or task.owner_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Task not found",
         )
-    return crud_task.update_task(db, task, task_update)
+    if is_precondition_failed(request, task_etag(task.version)):
+        raise _precondition_failed()
+    try:
+        task = await crud_task_async.update_task(db, task, task_update)
+    except StaleDataError:
+        await db.rollback()
+        raise _precondition_failed()
+    response.headers.update(validator_headers(task_etag(task.version), task.updated_at))
+    return task
 
 @router.delete("/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_task(
+async def delete_task(
     task_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal)
 ):
-    task = crud_task.get_task_by_id(db, task_id)
+    task = await crud_task_async.get_task_by_id(db, task_id)
     if not task or task.owner_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Task not found",
         )
-    crud_task.delete_task(db, task)
+    if is_precondition_failed(request, task_etag(task.version)):
+        raise _precondition_failed()
+    try:
+        await crud_task_async.delete_task(db, task)
+    except StaleDataError:
+        await db.rollback()
+        raise _precondition_failed()
     return
\ No newline at end of file
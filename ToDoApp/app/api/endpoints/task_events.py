@@ -0,0 +1,116 @@
+import asyncio
+import contextlib
+
+from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+
+from app.core.auth_cache import Principal
+from app.core.config import settings
+from app.core.events import OVERFLOW, event_hub
+from app.core.metrics import EVENT_CONNECTIONS
+from app.dependencies import decode_token_user_id, get_async_db, get_read_principal
+
+router = APIRouter(prefix="/tasks", tags=["tasks"])
+
+
+async def _sse_events(user_id: int):
+    subscription = event_hub.subscribe(user_id, settings.EVENTS_BUFFER_SIZE)
+    EVENT_CONNECTIONS.labels("sse").inc()
+    try:
+        yield ": connected\n\n"
+        while True:
+            event = await subscription.get(settings.EVENTS_HEARTBEAT_SECONDS)
+            if event is None:
+                # Keeps proxies from timing the stream out and detects dead peers
+                yield ": ping\n\n"
+                continue
+            yield event.sse()
+            if event is OVERFLOW:
+                return
+    finally:
+        event_hub.unsubscribe(subscription)
+        EVENT_CONNECTIONS.labels("sse").dec()
+
+
+async def _send_events(websocket: WebSocket, subscription):
+    while True:
+        event = await subscription.get(settings.EVENTS_HEARTBEAT_SECONDS)
+        if event is None:
+            await websocket.send_text('{"type": "ping"}')
+            continue
+        await websocket.send_text(event.message())
+        if event is OVERFLOW:
+            await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+            return
+
+
+async def _wait_for_disconnect(websocket: WebSocket):
+    # Messages from the client are not used; reading them notices a close
+    while (await websocket.receive())["type"] != "websocket.disconnect":
+        pass
+
+
+@router.get("/stream")
+async def stream_task_events(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_read_principal)
+):
+    """Server-Sent Events for the caller's task changes.
+
+    Event ids are GET /tasks/changes cursors. After a disconnect, a ``bulk``
+    event or an ``overflow`` event (the client fell behind and was dropped),
+    catch up from the last id received.
+    """
+    # Authentication is done; don't hold a pooled connection for the stream
+    await db.close()
+    return StreamingResponse(
+        _sse_events(current_user.id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/stream")
+async def task_events_websocket(
+    websocket: WebSocket,
+    token: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """The same events as GET /tasks/stream, as JSON WebSocket messages.
+
+    Browsers can't set headers on a WebSocket, so the token may also be
+    passed as the ``token`` query parameter.
+    """
+    authorization = websocket.headers.get("authorization", "")
+    if authorization.lower().startswith("bearer "):
+        token = authorization[7:]
+    try:
+        if not token:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+        current_user = await get_read_principal(decode_token_user_id(token), db)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    await db.close()
+
+    subscription = event_hub.subscribe(current_user.id, settings.EVENTS_BUFFER_SIZE)
+    EVENT_CONNECTIONS.labels("websocket").inc()
+    try:
+        await websocket.accept()
+        # Stop on whichever comes first: the client leaving or the stream ending
+        tasks = [
+            asyncio.ensure_future(_send_events(websocket, subscription)),
+            asyncio.ensure_future(_wait_for_disconnect(websocket)),
+        ]
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+        for task in done:
+            # Surface unexpected errors; a client leaving mid-send is normal
+            with contextlib.suppress(WebSocketDisconnect):
+                task.result()
+    finally:
+        event_hub.unsubscribe(subscription)
+        EVENT_CONNECTIONS.labels("websocket").dec()
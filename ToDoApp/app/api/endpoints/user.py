@@ -1,9 +1,10 @@
 # ToDoApp/app/api/endpoints/user.py
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from app.dependencies import get_db, get_current_user
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.auth_cache import Principal
+from app.dependencies import get_async_db, get_current_principal, get_current_user
 from app.schemas.user import UserOut, UserUpdate
-from app.crud import crud_user
+from app.crud import crud_user_async
 from app.models.user import User
 
 router = APIRouter(prefix="/users", tags=["users"])
@@ -20,17 +21,16 @@ def get_users_info():
     }
 
 @router.get("/me", response_model=UserOut)
-def get_my_user_profile(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+async def get_my_user_profile(
+    current_user: Principal = Depends(get_current_principal)
 ):
     return current_user
 
 @router.patch("/me", response_model=UserOut)
-def update_my_user_profile(
+async def update_my_user_profile(
     user_update: UserUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    updated_user = crud_user.update_user(db, current_user, user_update)
+    updated_user = await crud_user_async.update_user(db, current_user, user_update)
     return updated_user
\ No newline at end of file
@@ -0,0 +1,47 @@
+# ToDoApp/app/core/auth_cache.py
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+from app.core.cache import MemoryCache
+from app.core.config import settings
+from app.core.metrics import AUTH_CACHE_REQUESTS
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated caller, without a database-bound User object"""
+    id: int
+    email: Optional[str] = None
+
+
+class PrincipalCache:
+    """Principals by user id, kept in a cache backend from app.core.cache"""
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    @staticmethod
+    def _key(user_id: int) -> str:
+        return f"principal:{user_id}"
+
+    def get(self, user_id: int) -> Optional[Principal]:
+        data = self.backend.get(self._key(user_id))
+        AUTH_CACHE_REQUESTS.labels("miss" if data is None else "hit").inc()
+        return None if data is None else Principal(**data)
+
+    def set(self, principal: Principal):
+        self.backend.set(self._key(principal.id), asdict(principal))
+
+    def invalidate(self, user_id: int):
+        self.backend.delete(self._key(user_id))
+
+    def clear(self):
+        self.backend.clear()
+
+
+# Per process: it saves a query on every authenticated request, which a
+# network round trip to a shared backend would not. Other workers therefore
+# see a profile change only after AUTH_CACHE_TTL_SECONDS
+principal_cache = PrincipalCache(
+    MemoryCache(max_size=settings.AUTH_CACHE_MAX_SIZE, ttl_seconds=settings.AUTH_CACHE_TTL_SECONDS)
+)
@@ -0,0 +1,187 @@
+# ToDoApp/app/core/cache.py
+"""Read-through cache with pluggable backends and single-flight loading.
+
+Backends store JSON-compatible values:
+
+    MemoryCache  per-process LRU with a TTL per entry
+    RedisCache   shared by every worker; needs the optional ``redis`` package
+    NullCache    caching disabled
+
+Keys embed a version that writers bump in the database (see
+crud_task_cached), so stale entries are never read again and the TTL only
+bounds how long they take up memory.
+"""
+import asyncio
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Optional
+
+from app.core.metrics import CACHE_LOAD_SECONDS, CACHE_REQUESTS, CACHE_SAVED_SECONDS
+
+
+class NullCache:
+    def get(self, key: str) -> Optional[Any]:
+        return None
+
+    def set(self, key: str, value: Any):
+        pass
+
+    def delete(self, *keys: str):
+        pass
+
+    def clear(self):
+        pass
+
+
+class MemoryCache:
+    """Thread-safe LRU cache with a TTL per entry"""
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: Any):
+        if self.max_size <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, *keys: str):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisCache:
+    """Cache shared across processes, with values stored as JSON"""
+
+    # Network round trips; ReadThroughCache keeps them off the event loop
+    blocking = True
+
+    def __init__(self, url: str, ttl_seconds: float, prefix: str = "todoapp:cache:", client=None):
+        if client is None:
+            import redis
+            client = redis.Redis.from_url(url, socket_timeout=0.1, socket_connect_timeout=0.1)
+        self.client = client
+        self.ttl_ms = int(ttl_seconds * 1000)
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[Any]:
+        try:
+            raw = self.client.get(self.prefix + key)
+        except Exception as e:
+            # An unavailable cache degrades to a miss, not an error
+            print(f"Cache get failed: {e}")
+            return None
+        return None if raw is None else json.loads(raw)
+
+    def set(self, key: str, value: Any):
+        try:
+            self.client.set(self.prefix + key, json.dumps(value), px=self.ttl_ms)
+        except Exception as e:
+            print(f"Cache set failed: {e}")
+
+    def delete(self, *keys: str):
+        # Called after the write committed, so a failure must not fail the request
+        if not keys:
+            return
+        try:
+            self.client.delete(*(self.prefix + key for key in keys))
+        except Exception as e:
+            print(f"Cache delete failed: {e}")
+
+    def clear(self):
+        try:
+            for key in self.client.scan_iter(match=self.prefix + "*"):
+                self.client.delete(key)
+        except Exception as e:
+            print(f"Cache clear failed: {e}")
+
+
+class SingleFlight:
+    """Collapse concurrent loads of one key into a single call"""
+
+    def __init__(self):
+        self._inflight = {}
+
+    async def do(self, key: str, load: Callable[[], Awaitable[Any]]) -> Any:
+        # Futures belong to one event loop; callers on other loops load alone
+        flight = (id(asyncio.get_running_loop()), key)
+        future = self._inflight.get(flight)
+        if future is not None:
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[flight] = future
+        try:
+            value = await load()
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            # Retrieve it so an unawaited future does not log a warning
+            future.exception()
+            raise
+        finally:
+            del self._inflight[flight]
+
+
+class ReadThroughCache:
+    """A named cache that loads misses once, however many requests want them"""
+
+    def __init__(self, name: str, backend):
+        self.name = name
+        self.backend = backend
+        self._flight = SingleFlight()
+        self._load_seconds = 0.0
+
+    async def _call(self, method: Callable, *args) -> Any:
+        if getattr(self.backend, "blocking", False):
+            return await asyncio.to_thread(method, *args)
+        return method(*args)
+
+    async def get_or_load(self, key: str, load: Callable[[], Awaitable[Any]]) -> Any:
+        value = await self._call(self.backend.get, key)
+        if value is not None:
+            CACHE_REQUESTS.labels(self.name, "hit").inc()
+            # Estimated from the latest load time for this cache
+            CACHE_SAVED_SECONDS.labels(self.name).inc(self._load_seconds)
+            return value
+        CACHE_REQUESTS.labels(self.name, "miss").inc()
+        return await self._flight.do(key, lambda: self._load(key, load))
+
+    async def _load(self, key: str, load: Callable[[], Awaitable[Any]]) -> Any:
+        started = time.perf_counter()
+        value = await load()
+        self._load_seconds = time.perf_counter() - started
+        CACHE_LOAD_SECONDS.labels(self.name).observe(self._load_seconds)
+        if value is not None:
+            await self._call(self.backend.set, key, value)
+        return value
+
+    def invalidate(self, *keys: str):
+        self.backend.delete(*keys)
@@ -0,0 +1,85 @@
+# ToDoApp/app/core/clients.py
+"""Lazily created, process-wide clients.
+
+Nothing here connects at import time; each client is built on first use,
+so importing the app for a worker, a test or a CLI stays side-effect free.
+"""
+from functools import lru_cache
+
+from app.core.auth_cache import principal_cache
+from app.core.cache import MemoryCache, NullCache, ReadThroughCache, RedisCache
+from app.core.config import settings
+from app.core.consul_client import ConsulClient
+from app.core.events import LocalBroker, RedisBroker, event_hub
+from app.core.load_shedding import LoadShedder
+from app.core.rate_limit import MemoryRateLimiter, RedisRateLimiter
+from app.utils.notification_client import NotificationClient
+from app.utils.notification_dispatcher import NotificationDispatcher
+
+
+@lru_cache()
+def get_consul_client() -> ConsulClient:
+    return ConsulClient()
+
+
+@lru_cache()
+def get_notification_client() -> NotificationClient:
+    return NotificationClient(get_consul_client())
+
+
+@lru_cache()
+def get_notification_dispatcher() -> NotificationDispatcher:
+    return NotificationDispatcher(get_notification_client())
+
+
+@lru_cache()
+def get_event_broker():
+    if settings.EVENTS_BROKER == "redis":
+        return RedisBroker(event_hub, settings.EVENTS_REDIS_URL, settings.EVENTS_REDIS_CHANNEL)
+    return LocalBroker(event_hub)
+
+
+@lru_cache()
+def get_task_cache() -> ReadThroughCache:
+    if settings.TASK_CACHE_BACKEND == "redis":
+        backend = RedisCache(settings.TASK_CACHE_REDIS_URL, settings.TASK_CACHE_TTL_SECONDS)
+    elif settings.TASK_CACHE_BACKEND == "memory":
+        backend = MemoryCache(settings.TASK_CACHE_MAX_SIZE, settings.TASK_CACHE_TTL_SECONDS)
+    else:
+        backend = NullCache()
+    return ReadThroughCache("tasks", backend)
+
+
+@lru_cache()
+def get_rate_limiter():
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        return RedisRateLimiter(settings.RATE_LIMIT_REDIS_URL)
+    return MemoryRateLimiter(settings.RATE_LIMIT_MAX_KEYS)
+
+
+@lru_cache()
+def get_load_shedder() -> LoadShedder:
+    return LoadShedder(settings.LOAD_SHED_MAX_IN_FLIGHT, settings.LOAD_SHED_MAX_POOL_WAIT_SECONDS)
+
+
+def close_clients():
+    """Stop and close whichever clients were created, and empty the caches"""
+    if get_event_broker.cache_info().currsize:
+        get_event_broker().close()
+    if get_notification_dispatcher.cache_info().currsize:
+        get_notification_dispatcher().stop()
+    if get_notification_client.cache_info().currsize:
+        get_notification_client().close()
+    if get_consul_client.cache_info().currsize:
+        get_consul_client().close()
+    for factory in (
+        get_rate_limiter,
+        get_load_shedder,
+        get_task_cache,
+        get_event_broker,
+        get_notification_dispatcher,
+        get_notification_client,
+        get_consul_client,
+    ):
+        factory.cache_clear()
+    principal_cache.clear()
@@ -1,5 +1,6 @@
 # ToDoApp/app/core/config.py
 import os
+from typing import Dict, List, Optional, Tuple
 from pydantic import BaseSettings, SecretStr
 
 
@@ -13,20 +14,159 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 
+    # Password hashing settings
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 0  # 0 means one per CPU core
+    PASSWORD_HASH_MAX_QUEUE: int = 256
+
+    # Authenticated principal cache settings. The cache is per process: a
+    # profile change is seen at once by the worker that made it, and by the
+    # others once their entry expires, up to AUTH_CACHE_TTL_SECONDS later
+    AUTH_CACHE_MAX_SIZE: int = 10000  # 0 disables the cache
+    AUTH_CACHE_TTL_SECONDS: float = 60.0
+    # Let read-only routes trust the signed token without a user lookup
+    AUTH_TRUST_TOKEN_CLAIMS: bool = False
+
     # Database settings
     DATABASE_URL: str
+    # Derived from DATABASE_URL (e.g. sqlite -> sqlite+aiosqlite) when unset
+    ASYNC_DATABASE_URL: Optional[str] = None
+    # Connection pool (server databases and SQLite files)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # Pragmas applied to every SQLite connection
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_MMAP_SIZE: int = 268435456  # 256 MiB
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+
+    # Pagination settings
+    TASKS_PAGE_SIZE: int = 100
+    TASKS_MAX_PAGE_SIZE: int = 1000
+    TASKS_BULK_MAX_ITEMS: int = 10000
+
+    # Delta sync settings
+    TOMBSTONE_RETENTION_DAYS: int = 30
+    TOMBSTONE_COMPACTION_INTERVAL_SECONDS: float = 3600.0
 
     # Consul settings
     CONSUL_HOST: str = "localhost"
     CONSUL_PORT: int = 8500
     CONSUL_ENABLED: bool = False
+    # Register from the app's startup; gunicorn.conf.py turns this off and
+    # registers the whole instance from the master instead
+    CONSUL_REGISTER_ON_STARTUP: bool = True
+    CONSUL_WATCH_WAIT: str = "30s"
+    CONSUL_WATCH_RETRY_SECONDS: float = 5.0
+    # Override settings from the keys under this KV prefix, e.g.
+    # config/todoapp/ACCESS_TOKEN_EXPIRE_MINUTES, and follow their changes
+    CONSUL_CONFIG_ENABLED: bool = True
+    CONSUL_CONFIG_PREFIX: str = "config/todoapp/"
+
+    # Notification delivery settings
+    NOTIFICATION_QUEUE_SIZE: int = 10000
+    NOTIFICATION_BATCH_SIZE: int = 100
+    NOTIFICATION_BATCH_LINGER_SECONDS: float = 0.05
+    NOTIFICATION_MAX_RETRIES: int = 5
+    NOTIFICATION_RETRY_BACKOFF_SECONDS: float = 0.5
+    NOTIFICATION_TIMEOUT_SECONDS: float = 5.0
+    NOTIFICATION_HTTP_POOL_SIZE: int = 10
+    # Write notifications to the outbox table for the relay worker to deliver;
+    # when disabled they go through the in-process dispatcher instead
+    NOTIFICATION_OUTBOX_ENABLED: bool = True
+    OUTBOX_BATCH_SIZE: int = 500
+    OUTBOX_POLL_INTERVAL_SECONDS: float = 1.0
+    OUTBOX_RETENTION_HOURS: int = 24
+    # Rows the notification service rejects (4xx) this many times are
+    # dead-lettered (failed_at set) and left in the table for inspection
+    # instead of being retried; outages never count against a row
+    OUTBOX_MAX_ATTEMPTS: int = 10
+
+    # Task read cache: "memory" (per process), "redis" (shared) or "none"
+    TASK_CACHE_BACKEND: str = "memory"
+    TASK_CACHE_MAX_SIZE: int = 10000
+    TASK_CACHE_TTL_SECONDS: float = 30.0
+    TASK_CACHE_REDIS_URL: str = "redis://localhost:6379/0"
+
+    # Task event streaming (GET/WebSocket /tasks/stream)
+    # "local" fans out within this process; "redis" fans out across workers
+    EVENTS_BROKER: str = "local"
+    EVENTS_REDIS_URL: str = "redis://localhost:6379/0"
+    EVENTS_REDIS_CHANNEL: str = "todoapp:task-events"
+    # Events buffered per connection before a slow consumer is disconnected
+    EVENTS_BUFFER_SIZE: int = 256
+    EVENTS_HEARTBEAT_SECONDS: float = 15.0
+
+    # In-app rate limiting and load shedding, applied before routing
+    RATE_LIMIT_ENABLED: bool = True
+    # "memory" (per process) or "redis" (shared by every worker)
+    RATE_LIMIT_BACKEND: str = "memory"
+    RATE_LIMIT_REDIS_URL: str = "redis://localhost:6379/0"
+    RATE_LIMIT_MAX_KEYS: int = 100000
+    # Per user, or per client address for unauthenticated requests
+    RATE_LIMIT_USER_RATE: float = 20.0  # requests per second
+    RATE_LIMIT_USER_BURST: int = 40
+    # Extra per-user buckets for expensive routes: "METHOD /path": (rate, burst)
+    RATE_LIMIT_ROUTES: Dict[str, Tuple[float, int]] = {
+        "POST /auth/login": (1.0, 10),
+        "POST /auth/signup": (0.1, 5),
+        "POST /tasks/bulk": (2.0, 10),
+        "PATCH /tasks/bulk": (2.0, 10),
+    }
+    RATE_LIMIT_EXEMPT_PATHS: List[str] = ["/health", "/metrics", "/tasks/stream"]
+    # Addresses or CIDRs of proxies (Kong, envoy) whose X-Forwarded-For is
+    # believed; unauthenticated requests are keyed by the first address in
+    # it, read from the right, that is not one of these
+    RATE_LIMIT_TRUSTED_PROXIES: List[str] = []
+    # Answer 503 past either threshold; 0 disables a check. Independent of
+    # RATE_LIMIT_ENABLED; long-lived and probe paths are exempt
+    LOAD_SHED_ENABLED: bool = True
+    LOAD_SHED_EXEMPT_PATHS: List[str] = ["/health", "/metrics", "/tasks/stream"]
+    LOAD_SHED_MAX_IN_FLIGHT: int = 256
+    LOAD_SHED_MAX_POOL_WAIT_SECONDS: float = 1.0
+    LOAD_SHED_HALF_LIFE_SECONDS: float = 2.0
+
+    # Per-request SQL query budget: "off", "log" or "raise" (tests)
+    QUERY_BUDGET_MODE: str = "log"
+    QUERY_BUDGET_DEFAULT: int = 8
+    # Per route, "METHOD /path": queries; 0 skips the checks for that route.
+    # Bulk routes work in fixed-size IN chunks, so they scale with the batch
+    QUERY_BUDGETS: Dict[str, int] = {
+        "POST /tasks/bulk": 0,
+        "PATCH /tasks/bulk": 0,
+        "POST /tasks/bulk/complete": 0,
+        "DELETE /tasks/bulk": 0,
+    }
+    # Report the same statement run this many times in one request as N+1
+    QUERY_REPEAT_THRESHOLD: int = 3
 
     # Service settings
     SERVICE_HOST: str = "0.0.0.0"
     SERVICE_PORT: int = 8080
+    # Worker processes under gunicorn.conf.py; 0 means one per CPU core
+    SERVICE_WORKERS: int = 1
+    SERVICE_GRACEFUL_TIMEOUT_SECONDS: int = 30
+    # Development only, for `python -m app.main`
+    SERVICE_RELOAD: bool = False
 
     class Config:
         env_file = ".env"
 
 
+# Never taken from Consul KV: secrets, and where the app finds its
+# database and Consul itself
+STATIC_SETTINGS = frozenset((
+    "SECRET_KEY",
+    "DATABASE_URL",
+    "ASYNC_DATABASE_URL",
+    "CONSUL_HOST",
+    "CONSUL_PORT",
+    "CONSUL_ENABLED",
+    "CONSUL_CONFIG_ENABLED",
+    "CONSUL_CONFIG_PREFIX",
+))
+
 settings = Settings()
\ No newline at end of file
@@ -1,24 +1,212 @@
 # ToDoApp/app/core/consul_client.py
 import consul
-from typing import Any, Dict, Optional, List
+import itertools
+import json
+import threading
+import time
+import uuid
+from typing import Any, Dict, FrozenSet, Optional, List
 from app.core.config import settings
+from app.core.metrics import CONSUL_LOOKUP_SECONDS
 import socket
 
 
+class ServiceWatch:
+    """Local cache of one service's healthy instances.
+
+    A daemon thread keeps the cache fresh with Consul blocking queries
+    (``index``/``wait``), so lookups never wait on the network. If Consul
+    becomes unreachable the last known instances keep being served.
+    """
+
+    def __init__(self, consul_api, service_name: str, wait: str, retry_seconds: float):
+        self.consul = consul_api
+        self.service_name = service_name
+        self.wait = wait
+        self.retry_seconds = retry_seconds
+        self.index = None
+        self.addresses: List[str] = []
+        self._next = itertools.count()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run,
+            name=f"consul-watch-{service_name}",
+            daemon=True,
+        )
+
+    def start(self):
+        # Prime the cache so the first lookup has an answer when Consul is up
+        try:
+            self.refresh()
+        except Exception as e:
+            print(f"Consul lookup for {self.service_name} failed: {e}")
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+
+    def refresh(self, wait: Optional[str] = None):
+        """Fetch healthy instances; blocks up to ``wait`` if an index is known"""
+        index, entries = self.consul.health.service(
+            self.service_name,
+            index=self.index if wait else None,
+            wait=wait,
+            passing=True,
+        )
+        # Consul may reset its index; start over rather than block forever
+        if self.index is not None and index is not None and int(index) < int(self.index):
+            index = None
+        self.index = index
+        # Swap the whole list so readers never see a partial update
+        self.addresses = [
+            f"{entry['Service']['Address'] or entry['Node']['Address']}:{entry['Service']['Port']}"
+            for entry in entries
+        ]
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                self.refresh(wait=self.wait)
+            except Exception as e:
+                print(f"Consul watch for {self.service_name} failed, serving cached instances: {e}")
+                self._stopped.wait(self.retry_seconds)
+
+    def next_address(self) -> Optional[str]:
+        """Round-robin over the cached healthy instances"""
+        addresses = self.addresses
+        if not addresses:
+            return None
+        return addresses[next(self._next) % len(addresses)]
+
+
+class ConfigWatch:
+    """Settings overrides from a Consul KV prefix, kept current without restarts.
+
+    Each key under the prefix names a settings field, e.g.
+    config/todoapp/ACCESS_TOKEN_EXPIRE_MINUTES = "45". The prefix is read
+    once on start; a daemon thread then follows it with blocking queries.
+    Every change builds and validates a complete new snapshot (startup
+    values plus the current overrides, so a deleted key reverts) and swaps
+    it into the settings object in one assignment: readers keep doing plain
+    attribute lookups and never see half an update, and an invalid value
+    rejects the whole update. Settings read only at import or startup (pool
+    sizes, worker counts, request validation limits) change on restart.
+    """
+
+    def __init__(
+        self,
+        consul_api,
+        target,
+        prefix: str,
+        wait: str,
+        retry_seconds: float,
+        static: FrozenSet[str] = frozenset(),
+    ):
+        self.consul = consul_api
+        self.settings = target
+        self.prefix = prefix
+        self.wait = wait
+        self.retry_seconds = retry_seconds
+        self.static = static
+        self.base = target.dict()
+        self.index = None
+        self.values: Dict[str, str] = {}  # raw KV snapshot, full key -> value
+        self.overrides: Dict[str, Any] = {}
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="consul-config-watch", daemon=True)
+
+    def start(self):
+        # Apply what is there before serving, when Consul is up
+        try:
+            self.refresh()
+        except Exception as e:
+            print(f"Consul config load from {self.prefix} failed, using local settings: {e}")
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+
+    def refresh(self, wait: Optional[str] = None):
+        """Fetch the prefix; blocks up to ``wait`` for a change if an index is known"""
+        index, entries = self.consul.kv.get(
+            self.prefix,
+            recurse=True,
+            index=self.index if wait else None,
+            wait=wait,
+        )
+        # Consul may reset its index; start over rather than block forever
+        if self.index is not None and index is not None and int(index) < int(self.index):
+            index = None
+        self.index = index
+        values = {
+            entry["Key"]: entry["Value"].decode("utf-8") if entry["Value"] else ""
+            for entry in entries or []
+        }
+        if values != self.values:
+            self.values = values
+            self.apply(values)
+
+    def _overrides(self, values: Dict[str, str]) -> Dict[str, Any]:
+        fields = type(self.settings).__fields__
+        overrides = {}
+        for key, raw in values.items():
+            name = key[len(self.prefix):]
+            if not name or name.endswith("/"):
+                continue  # the prefix's folder entries
+            field = fields.get(name)
+            if field is None or name in self.static:
+                print(f"Ignoring Consul config key {key}: not a dynamic setting")
+                continue
+            # Lists and dicts are stored as JSON, like in environment variables
+            overrides[name] = json.loads(raw) if field.is_complex() else raw
+        return overrides
+
+    def apply(self, values: Dict[str, str]) -> List[str]:
+        """Swap in the settings for a KV snapshot; returns the names that changed"""
+        try:
+            overrides = self._overrides(values)
+            fresh = type(self.settings)(**{**self.base, **overrides})
+        except ValueError as e:
+            print(f"Ignoring Consul config update, keeping current settings: {e}")
+            return []
+        changed = [
+            name for name in fresh.__fields__
+            if getattr(fresh, name) != getattr(self.settings, name)
+        ]
+        object.__setattr__(self.settings, "__dict__", fresh.__dict__)
+        self.overrides = overrides
+        if changed:
+            print(f"Applied settings from Consul: {', '.join(changed)}")
+        return changed
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                self.refresh(wait=self.wait)
+            except Exception as e:
+                print(f"Consul config watch failed, keeping current settings: {e}")
+                self._stopped.wait(self.retry_seconds)
+
+
 class ConsulClient:
-    def __init__(self):
-        self.consul = consul.Consul(
+    def __init__(self, consul_api=None):
+        self.consul = consul_api or consul.Consul(
             host=settings.CONSUL_HOST,
             port=settings.CONSUL_PORT
         )
         self.service_id = None
+        self._watches: Dict[str, ServiceWatch] = {}
+        self._watches_lock = threading.Lock()
+        self._config_watch: Optional[ConfigWatch] = None
 
     def register_service(self, name: str, port: int, tags: list = None):
         """Register the service with Consul"""
         hostname = socket.gethostname()
         ip_address = socket.gethostbyname(hostname)
 
-        self.service_id = f"{name}-{hostname}-{port}"
+        # Unique per registration, so replicas sharing a hostname and port
+        # (host networking, restarts) never overwrite or remove each other
+        self.service_id = f"{name}-{hostname}-{port}-{uuid.uuid4().hex[:8]}"
 
         # Register service with Consul using HTTP check instead of TCP
         self.consul.agent.service.register(
@@ -43,8 +231,29 @@ class ConsulClient:
             self.consul.agent.service.deregister(self.service_id)
             print(f"Deregistered service {self.service_id} from Consul")
 
+    def watch_config(self, target, prefix: str, static: FrozenSet[str] = frozenset()) -> ConfigWatch:
+        """Apply the settings overrides under a KV prefix to target, now and on every change"""
+        with self._watches_lock:
+            if self._config_watch is None:
+                self._config_watch = ConfigWatch(
+                    self.consul,
+                    target,
+                    prefix,
+                    wait=settings.CONSUL_WATCH_WAIT,
+                    retry_seconds=settings.CONSUL_WATCH_RETRY_SECONDS,
+                    static=static,
+                )
+                self._config_watch.start()
+            return self._config_watch
+
     def get_config(self, key: str, default: Any = None) -> Any:
-        """Get a configuration value from Consul KV store"""
+        """Get a configuration value from Consul KV store
+
+        Keys under the watched config prefix are answered from its snapshot.
+        """
+        watch = self._config_watch
+        if watch is not None and key.startswith(watch.prefix):
+            return watch.values.get(key) or default
         index, data = self.consul.kv.get(key)
         if data and data['Value']:
             return data['Value'].decode('utf-8')
@@ -62,11 +271,39 @@ class ConsulClient:
         return None
 
     def get_service_address(self, service_name: str) -> Optional[str]:
-        """Get the address of a service in the format 'host:port'"""
-        service = self.get_service(service_name)
-        if service:
-            return f"{service['ServiceAddress']}:{service['ServicePort']}"
-        return None
+        """Get the address of a healthy service instance in the format 'host:port'
+
+        Served from a locally cached, watched copy of the service's instances,
+        rotating across them on each call.
+        """
+        started = time.perf_counter()
+        address = self._get_watch(service_name).next_address()
+        CONSUL_LOOKUP_SECONDS.observe(time.perf_counter() - started)
+        return address
+
+    def _get_watch(self, service_name: str) -> ServiceWatch:
+        with self._watches_lock:
+            watch = self._watches.get(service_name)
+            if watch is None:
+                watch = ServiceWatch(
+                    self.consul,
+                    service_name,
+                    wait=settings.CONSUL_WATCH_WAIT,
+                    retry_seconds=settings.CONSUL_WATCH_RETRY_SECONDS,
+                )
+                watch.start()
+                self._watches[service_name] = watch
+            return watch
+
+    def close(self):
+        """Stop all service and config watches"""
+        with self._watches_lock:
+            for watch in self._watches.values():
+                watch.stop()
+            self._watches.clear()
+            if self._config_watch is not None:
+                self._config_watch.stop()
+                self._config_watch = None
 
     def get_all_services(self) -> List[Dict]:
         """Get all registered services"""
@@ -0,0 +1,204 @@
+# ToDoApp/app/core/events.py
+"""Pub/sub of task change events to connected /tasks/stream clients.
+
+crud_task publishes through a broker after each commit. The broker fans the
+event out to the EventHub of every API process: LocalBroker within this
+process, RedisBroker across workers and hosts via Redis pub/sub. The hub
+hands each event to the subscriptions of its user, each with a bounded
+buffer; a subscriber that falls behind is disconnected and is expected to
+catch up through GET /tasks/changes.
+"""
+import asyncio
+import json
+import queue
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Optional
+
+from app.core.metrics import EVENTS_DROPPED, EVENTS_PUBLISHED
+
+
+@dataclass(frozen=True)
+class Event:
+    """A task change; data is JSON, serialized once for every subscriber"""
+    type: str
+    id: str
+    data: str
+
+    def sse(self) -> str:
+        # Events without an id (bulk changes) leave the client's Last-Event-ID alone
+        prefix = f"id: {self.id}\n" if self.id else ""
+        return f"{prefix}event: {self.type}\ndata: {self.data}\n\n"
+
+    def message(self) -> str:
+        return f'{{"type": "{self.type}", "id": "{self.id}", "data": {self.data}}}'
+
+
+# Queued in place of the event that did not fit; tells the consumer to close
+OVERFLOW = Event("overflow", "", "null")
+
+
+class Subscription:
+    """One connection's bounded buffer, bound to the event loop serving it"""
+
+    def __init__(self, user_id: int, max_buffer: int):
+        self.user_id = user_id
+        self.loop = asyncio.get_running_loop()
+        self.max_buffer = max_buffer
+        self.queue = asyncio.Queue()
+        self.overflowed = False
+
+    def offer(self, event: Event):
+        """Buffer an event without blocking; must run on self.loop"""
+        if self.overflowed:
+            return
+        if self.queue.qsize() >= self.max_buffer:
+            # Keep what is buffered so the last id the client sees is a
+            # resumable cursor, then tell it to close
+            self.overflowed = True
+            EVENTS_DROPPED.inc()
+            self.queue.put_nowait(OVERFLOW)
+            return
+        self.queue.put_nowait(event)
+
+    async def get(self, timeout: float) -> Optional[Event]:
+        """Next event, or None if nothing arrived within timeout"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class EventHub:
+    """Subscriptions of this process, by user id"""
+
+    def __init__(self):
+        self._subscriptions = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id: int, max_buffer: int) -> Subscription:
+        subscription = Subscription(user_id, max_buffer)
+        with self._lock:
+            self._subscriptions[user_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.user_id]
+
+    def dispatch(self, user_id: int, event: Event):
+        """Hand an event to the user's subscriptions; safe from any thread"""
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(user_id, ()))
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.offer, event)
+            except RuntimeError:
+                # The connection's loop is closed; it will unsubscribe itself
+                pass
+
+    def connection_count(self) -> int:
+        with self._lock:
+            return sum(len(s) for s in self._subscriptions.values())
+
+
+class LocalBroker:
+    """Delivers published events to this process's hub only"""
+
+    def __init__(self, hub: EventHub):
+        self.hub = hub
+
+    def start(self):
+        pass
+
+    def publish(self, user_id: int, event: Event):
+        EVENTS_PUBLISHED.inc()
+        self.hub.dispatch(user_id, event)
+
+    def close(self):
+        pass
+
+
+class RedisBroker:
+    """Fans events out to every process subscribed to a Redis channel.
+
+    publish() only queues the event: crud_task calls it on the event loop's
+    thread (through run_sync), so a background thread does the network
+    round trip. Needs the optional ``redis`` package unless a client is
+    passed in.
+    """
+
+    def __init__(self, hub: EventHub, url: str, channel: str, client=None, max_pending: int = 10000):
+        subscriber = client
+        if client is None:
+            import redis
+            client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+            # listen() waits indefinitely for messages, so only bound connecting
+            subscriber = redis.Redis.from_url(url, socket_connect_timeout=0.5)
+        self.hub = hub
+        self.channel = channel
+        self.client = client
+        self.subscriber = subscriber
+        self._pending = queue.Queue(maxsize=max_pending)
+        self._pubsub = None
+        self._thread = None
+        self._publisher = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._publisher = threading.Thread(target=self._publish_pending, name="event-publisher", daemon=True)
+        self._publisher.start()
+        self._pubsub = self.subscriber.pubsub(ignore_subscribe_messages=True)
+        self._pubsub.subscribe(self.channel)
+        self._thread = threading.Thread(target=self._listen, name="event-broker", daemon=True)
+        self._thread.start()
+
+    def _listen(self):
+        try:
+            for message in self._pubsub.listen():
+                if message is None or message.get("type") != "message":
+                    continue
+                user_id, event_type, event_id, data = json.loads(message["data"])
+                self.hub.dispatch(user_id, Event(event_type, event_id, data))
+        except Exception as e:
+            if self._thread is not None:
+                print(f"Event broker listener stopped: {e}")
+
+    def _publish_pending(self):
+        while True:
+            message = self._pending.get()
+            if message is None:
+                return
+            try:
+                self.client.publish(self.channel, message)
+            except Exception as e:
+                # Streams are best effort; clients catch up through /tasks/changes
+                print(f"Failed to publish task event: {e}")
+
+    def publish(self, user_id: int, event: Event):
+        EVENTS_PUBLISHED.inc()
+        try:
+            self._pending.put_nowait(json.dumps([user_id, event.type, event.id, event.data]))
+        except queue.Full:
+            print("Failed to publish task event: publish queue is full")
+
+    def close(self):
+        thread, self._thread = self._thread, None
+        publisher, self._publisher = self._publisher, None
+        if publisher is not None:
+            # Lets the publisher flush what is queued, then stop
+            self._pending.put(None)
+            publisher.join(timeout=5)
+        if self._pubsub is not None:
+            self._pubsub.close()
+        if thread is not None:
+            thread.join(timeout=5)
+
+
+event_hub = EventHub()
@@ -0,0 +1,120 @@
+# ToDoApp/app/core/load_shedding.py
+"""Adaptive load shedding.
+
+Requests are refused with 503 up front, while the process is already past
+its in-flight limit or requests have recently been waiting too long for a
+database connection, instead of queueing behind work that is already late.
+"""
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable
+
+from fastapi import status
+from fastapi.responses import JSONResponse
+
+from app.core.config import settings
+from app.core.metrics import REQUESTS_REJECTED
+
+
+class DecayingAverage:
+    """Exponentially weighted average that also decays towards zero over time.
+
+    A plain EWMA only moves when new samples arrive; once shedding stops the
+    traffic that produces samples it would stay high forever.
+    """
+
+    def __init__(self, half_life_seconds: float, clock: Callable[[], float] = time.monotonic):
+        self.decay = math.log(2) / half_life_seconds
+        self.clock = clock
+        self._value = 0.0
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _decayed(self, now: float) -> float:
+        return self._value * math.exp(-self.decay * (now - self._updated))
+
+    def observe(self, sample: float, weight: float = 0.2):
+        with self._lock:
+            now = self.clock()
+            value = self._decayed(now)
+            self._value = value + weight * (sample - value)
+            self._updated = now
+
+    @property
+    def value(self) -> float:
+        with self._lock:
+            return self._decayed(self.clock())
+
+
+# Fed by every connection checkout, see app.database.session
+pool_wait = DecayingAverage(settings.LOAD_SHED_HALF_LIFE_SECONDS)
+
+
+class LoadShedder:
+    def __init__(
+        self,
+        max_in_flight: int,
+        max_pool_wait_seconds: float,
+        pool_wait: DecayingAverage = pool_wait,
+    ):
+        self.max_in_flight = max_in_flight
+        self.max_pool_wait_seconds = max_pool_wait_seconds
+        self.pool_wait = pool_wait
+        self.in_flight = 0
+
+    def check(self) -> float:
+        """Seconds the client should wait before retrying, 0 to admit the request"""
+        if self.max_in_flight and self.in_flight >= self.max_in_flight:
+            return 1.0
+        if self.max_pool_wait_seconds:
+            waited = self.pool_wait.value
+            if waited > self.max_pool_wait_seconds:
+                return max(1.0, waited)
+        return 0.0
+
+    @contextmanager
+    def track(self):
+        """Count a request as in flight; only ever entered on the event loop"""
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+
+
+class LoadSheddingMiddleware:
+    """Answer 503 while overloaded and count the requests in flight.
+
+    Separate from RateLimitMiddleware, so turning per-client limits off
+    leaves overload protection in place.
+    """
+
+    def __init__(self, app, get_shedder: Callable[[], LoadShedder]):
+        self.app = app
+        self.get_shedder = get_shedder
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or not settings.LOAD_SHED_ENABLED
+            or scope["path"] in settings.LOAD_SHED_EXEMPT_PATHS
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        shedder = self.get_shedder()
+        retry_after = shedder.check()
+        if retry_after:
+            REQUESTS_REJECTED.labels("overloaded").inc()
+            response = JSONResponse(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                content={"detail": "Server is busy, please retry"},
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+            await response(scope, receive, send)
+            return
+
+        with shedder.track():
+            await self.app(scope, receive, send)
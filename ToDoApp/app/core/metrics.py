@@ -0,0 +1,132 @@
+# ToDoApp/app/core/metrics.py
+"""Prometheus metrics shared across the application.
+
+Gauges are summed over live workers when gunicorn runs several of them
+(prometheus_client multiprocess mode, see gunicorn.conf.py).
+"""
+from prometheus_client import Counter, Gauge, Histogram
+
+PASSWORD_HASH_QUEUE_DEPTH = Gauge(
+    "todoapp_password_hash_queue_depth",
+    "Password hash/verify jobs queued or running in the process pool",
+    multiprocess_mode="livesum",
+)
+PASSWORD_HASH_SECONDS = Histogram(
+    "todoapp_password_hash_seconds",
+    "Time from submitting a password hash/verify job to getting its result",
+    ["operation"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+
+AUTH_CACHE_REQUESTS = Counter(
+    "todoapp_auth_cache_requests_total",
+    "Authenticated principal cache lookups",
+    ["result"],
+)
+
+NOTIFICATION_QUEUE_DEPTH = Gauge(
+    "todoapp_notification_queue_depth",
+    "Notifications waiting in the in-process dispatch queue",
+    multiprocess_mode="livesum",
+)
+NOTIFICATIONS_DROPPED = Counter(
+    "todoapp_notifications_dropped_total",
+    "Notifications dropped before delivery",
+    ["reason"],
+)
+NOTIFICATION_DELIVERY_LAG = Histogram(
+    "todoapp_notification_delivery_lag_seconds",
+    "Time from enqueueing a notification to its batch being accepted",
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+)
+
+DB_POOL_CHECKED_OUT = Gauge(
+    "todoapp_db_pool_checked_out",
+    "Database connections currently checked out of the pool",
+    ["engine"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_CHECKOUTS = Counter(
+    "todoapp_db_pool_checkouts_total",
+    "Database connection checkouts",
+    ["engine"],
+)
+DB_POOL_WAIT_SECONDS = Histogram(
+    "todoapp_db_pool_wait_seconds",
+    "Time a request waited for its database connection",
+    ["engine"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0),
+)
+
+DB_QUERIES = Counter(
+    "todoapp_db_queries_total",
+    "SQL statements executed",
+    ["engine", "operation"],
+)
+DB_QUERY_SECONDS = Histogram(
+    "todoapp_db_query_seconds",
+    "Time to execute one SQL statement",
+    ["engine"],
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0),
+)
+
+CONSUL_LOOKUP_SECONDS = Histogram(
+    "todoapp_consul_lookup_seconds",
+    "Time to resolve a service address, usually from the watched local copy",
+    buckets=(0.00001, 0.0001, 0.001, 0.01, 0.1, 0.5, 1.0, 5.0),
+)
+NOTIFICATION_SEND_SECONDS = Histogram(
+    "todoapp_notification_send_seconds",
+    "Time for one request to the notification service",
+    ["operation", "result"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+
+EVENT_CONNECTIONS = Gauge(
+    "todoapp_event_connections",
+    "Open task event stream connections",
+    ["transport"],
+    multiprocess_mode="livesum",
+)
+EVENTS_PUBLISHED = Counter(
+    "todoapp_events_published_total",
+    "Task events published to the broker",
+)
+EVENTS_DROPPED = Counter(
+    "todoapp_events_dropped_total",
+    "Task event stream connections closed because their buffer overflowed",
+)
+
+CACHE_REQUESTS = Counter(
+    "todoapp_cache_requests_total",
+    "Read-through cache lookups",
+    ["cache", "result"],
+)
+CACHE_LOAD_SECONDS = Histogram(
+    "todoapp_cache_load_seconds",
+    "Time to load a value on a cache miss",
+    ["cache"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+CACHE_SAVED_SECONDS = Counter(
+    "todoapp_cache_saved_seconds_total",
+    "Estimated load time avoided by cache hits",
+    ["cache"],
+)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "todoapp_http_request_seconds",
+    "Time to handle an HTTP request, by route template and status",
+    ["method", "route", "status"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "todoapp_http_requests_in_flight",
+    "HTTP requests being handled",
+    multiprocess_mode="livesum",
+)
+REQUESTS_REJECTED = Counter(
+    "todoapp_requests_rejected_total",
+    "HTTP requests refused before routing",
+    ["reason"],
+)
@@ -0,0 +1,111 @@
+# ToDoApp/app/core/query_budget.py
+"""Per-request SQL query budgets and N+1 detection.
+
+Every statement executed on any engine while a request is being handled
+is recorded against that request. When the request finishes, its count is
+compared with the route's budget, and statements repeated with the same
+shape (the same SQL text, parameters aside) are reported as a likely N+1.
+Depending on QUERY_BUDGET_MODE, violations are logged or raised.
+"""
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class QueryRecorder:
+    """The statements executed on behalf of one request"""
+
+    def __init__(self):
+        self.count = 0
+        self.shapes = Counter()
+
+    def record(self, statement: str):
+        self.count += 1
+        self.shapes[statement] += 1
+
+    def repeated(self, threshold: int) -> List[str]:
+        """Statement shapes executed at least ``threshold`` times"""
+        return [shape for shape, count in self.shapes.items() if count >= threshold]
+
+
+_recorder: ContextVar[Optional[QueryRecorder]] = ContextVar("query_recorder", default=None)
+# Called with (route, recorder) as each request finishes, see capture_requests
+_listeners: List[Callable] = []
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_statement(conn, cursor, statement, parameters, context, executemany):
+    recorder = _recorder.get()
+    if recorder is not None:
+        recorder.record(statement)
+
+
+def check_budget(route: str, recorder: QueryRecorder):
+    """Log or raise if the request went over budget or repeated a statement"""
+    budget = settings.QUERY_BUDGETS.get(route, settings.QUERY_BUDGET_DEFAULT)
+    if not budget:
+        return
+    problems = []
+    if recorder.count > budget:
+        problems.append(f"{recorder.count} queries, budget {budget}")
+    for shape in recorder.repeated(settings.QUERY_REPEAT_THRESHOLD):
+        problems.append(f"possible N+1, {recorder.shapes[shape]}x: {shape}")
+    if not problems:
+        return
+    message = f"{route}: " + "; ".join(problems)
+    if settings.QUERY_BUDGET_MODE == "raise":
+        raise QueryBudgetExceeded(message)
+    print(f"Query budget exceeded: {message}")
+
+
+@contextmanager
+def capture_requests():
+    """Collect (route, QueryRecorder) for every request finished in the block"""
+    captured = []
+    _listeners.append(captured.append)
+    try:
+        yield captured
+    finally:
+        _listeners.remove(captured.append)
+
+
+class QueryBudgetMiddleware:
+    """Record each request's statements and check them against its route's budget"""
+
+    def __init__(self, app):
+        self.app = app
+        self._routes = {}  # endpoint -> "METHOD /path/template" without the method
+
+    def _route(self, scope) -> str:
+        endpoint = scope.get("endpoint")
+        path = self._routes.get(endpoint)
+        if path is None and endpoint is not None:
+            self._routes = {r.endpoint: r.path for r in scope["app"].routes if hasattr(r, "endpoint")}
+            path = self._routes.get(endpoint)
+        return f"{scope['method']} {path or scope['path']}"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or settings.QUERY_BUDGET_MODE == "off":
+            await self.app(scope, receive, send)
+            return
+
+        recorder = QueryRecorder()
+        token = _recorder.set(recorder)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _recorder.reset(token)
+        route = self._route(scope)
+        for listener in _listeners:
+            listener((route, recorder))
+        check_budget(route, recorder)
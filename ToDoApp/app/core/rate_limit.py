@@ -0,0 +1,197 @@
+# ToDoApp/app/core/rate_limit.py
+"""Per-user and per-route rate limiting, enforced in front of every route.
+
+Kong limits traffic at the edge; these limits keep one account from filling
+this process's threadpool and database pool. Backends:
+
+    MemoryRateLimiter  token buckets local to the process
+    RedisRateLimiter   shared by every worker; needs the optional ``redis`` package
+"""
+import ipaddress
+import math
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Callable, Optional
+
+from fastapi import HTTPException, status
+from fastapi.responses import JSONResponse
+from starlette.routing import Match
+
+from app.core.config import settings
+from app.core.metrics import REQUESTS_REJECTED
+from app.dependencies import decode_token_user_id
+
+
+class MemoryRateLimiter:
+    """Token buckets keyed by client, least recently used evicted first"""
+
+    def __init__(self, max_keys: int, clock: Callable[[], float] = time.monotonic):
+        self.max_keys = max_keys
+        self.clock = clock
+        self._buckets = OrderedDict()  # key -> (tokens, updated)
+        self._lock = threading.Lock()
+
+    async def acquire(self, key: str, rate: float, burst: int) -> float:
+        """Take a token; returns 0, or the seconds until one is available"""
+        with self._lock:
+            now = self.clock()
+            tokens, updated = self._buckets.pop(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated) * rate)
+            if tokens >= 1:
+                tokens -= 1
+                retry_after = 0.0
+            else:
+                retry_after = (1 - tokens) / rate
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return retry_after
+
+    async def close(self):
+        pass
+
+
+# GCRA: the token bucket stored as the time it next becomes full ("theoretical
+# arrival time"), so each key is a single value updated in one round trip.
+# Uses the server clock so workers never disagree about the time.
+GCRA_SCRIPT = """
+local now = redis.call('TIME')
+now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+local interval = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then tat = now end
+local wait = tat - now - (burst - 1) * interval
+if wait > 0 then return tostring(wait) end
+tat = tat + interval
+redis.call('SET', KEYS[1], tostring(tat), 'PX', math.ceil((tat - now) * 1000))
+return '0'
+"""
+
+
+class RedisRateLimiter:
+    """The same limits shared by every worker; fails open when Redis is down"""
+
+    def __init__(self, url: str, prefix: str = "todoapp:ratelimit:", client=None):
+        if client is None:
+            import redis.asyncio
+            client = redis.asyncio.Redis.from_url(url, socket_timeout=0.1, socket_connect_timeout=0.1)
+        self.client = client
+        self.prefix = prefix
+        self.script = client.register_script(GCRA_SCRIPT)
+
+    async def acquire(self, key: str, rate: float, burst: int) -> float:
+        try:
+            retry_after = await self.script(keys=[self.prefix + key], args=[1 / rate, burst])
+        except Exception as e:
+            # Better to admit the request than to fail every request
+            print(f"Rate limit check failed: {e}")
+            return 0.0
+        return float(retry_after)
+
+    async def close(self):
+        await self.client.close()
+
+
+@lru_cache(maxsize=4)
+def _trusted_networks(proxies: tuple) -> tuple:
+    return tuple(ipaddress.ip_network(proxy, strict=False) for proxy in proxies)
+
+
+def _is_trusted(address: str, networks: tuple) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in networks)
+
+
+def client_address(scope) -> str:
+    """The peer address, or the real client's when the peer is a trusted proxy.
+
+    Proxies append to X-Forwarded-For, so it is read from the right and the
+    first untrusted hop wins; anything further left is client-supplied.
+    """
+    client = scope.get("client")
+    address = client[0] if client else "unknown"
+    networks = _trusted_networks(tuple(settings.RATE_LIMIT_TRUSTED_PROXIES))
+    if not networks or not _is_trusted(address, networks):
+        return address
+    forwarded = [
+        value.decode("latin-1") for name, value in scope["headers"] if name == b"x-forwarded-for"
+    ]
+    hops = [hop.strip() for hop in ",".join(forwarded).split(",") if hop.strip()]
+    for hop in reversed(hops):
+        address = hop
+        if not _is_trusted(hop, networks):
+            break
+    return address
+
+
+def client_key(scope) -> str:
+    """The user id from a valid bearer token, else the client address"""
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() == "bearer" and token:
+                try:
+                    return f"user:{decode_token_user_id(token)}"
+                except HTTPException:
+                    pass
+            break
+    return f"ip:{client_address(scope)}"
+
+
+def route_key(scope) -> Optional[str]:
+    """The "METHOD /path/template" of the route the request will hit"""
+    for route in scope["app"].router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return f"{scope['method']} {route.path}"
+    return None
+
+
+async def _reject(scope, receive, send, status_code: int, detail: str, retry_after: float):
+    response = JSONResponse(
+        status_code=status_code,
+        content={"detail": detail},
+        headers={"Retry-After": str(math.ceil(retry_after))},
+    )
+    await response(scope, receive, send)
+
+
+class RateLimitMiddleware:
+    """Apply the user and route limits before any routing"""
+
+    def __init__(self, app, get_limiter: Callable):
+        self.app = app
+        self.get_limiter = get_limiter
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or not settings.RATE_LIMIT_ENABLED
+            or scope["path"] in settings.RATE_LIMIT_EXEMPT_PATHS
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        limiter = self.get_limiter()
+        key = client_key(scope)
+        retry_after = await limiter.acquire(key, settings.RATE_LIMIT_USER_RATE, settings.RATE_LIMIT_USER_BURST)
+        if not retry_after and settings.RATE_LIMIT_ROUTES:
+            route = route_key(scope)
+            if route in settings.RATE_LIMIT_ROUTES:
+                rate, burst = settings.RATE_LIMIT_ROUTES[route]
+                retry_after = await limiter.acquire(f"{key}:{route}", rate, burst)
+        if retry_after:
+            REQUESTS_REJECTED.labels("rate_limited").inc()
+            await _reject(
+                scope, receive, send,
+                status.HTTP_429_TOO_MANY_REQUESTS, "Too many requests", retry_after,
+            )
+            return
+
+        await self.app(scope, receive, send)
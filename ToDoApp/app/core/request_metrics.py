@@ -0,0 +1,75 @@
+# ToDoApp/app/core/request_metrics.py
+"""HTTP request metrics and the /metrics endpoint.
+
+The middleware runs on every request, so it keeps to a perf_counter pair,
+one dict lookup for the route template and cached metric children; labelled
+metric lookups in prometheus_client take a lock and build a tuple each time.
+"""
+import os
+import time
+
+from fastapi import Response
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, generate_latest, multiprocess
+
+from app.core.metrics import HTTP_REQUEST_SECONDS, HTTP_REQUESTS_IN_FLIGHT
+
+# Label for requests answered before or without routing (404s, rejections)
+UNMATCHED_ROUTE = "unmatched"
+# Anything else is labelled OTHER, so clients cannot mint new label values
+METHODS = frozenset(("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"))
+
+
+class MetricsMiddleware:
+    """Observe latency per (method, route template, status) and requests in flight"""
+
+    def __init__(self, app):
+        self.app = app
+        self._routes = {}  # endpoint -> route path template
+        self._histograms = {}  # (method, route, status) -> histogram child
+
+    def _route(self, scope) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return UNMATCHED_ROUTE
+        route = self._routes.get(endpoint)
+        if route is None:
+            # Rebuilt on a miss, so routes added after the first request are found
+            self._routes = {r.endpoint: r.path for r in scope["app"].routes if hasattr(r, "endpoint")}
+            route = self._routes.setdefault(endpoint, UNMATCHED_ROUTE)
+        return route
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            method = scope["method"] if scope["method"] in METHODS else "OTHER"
+            key = (method, self._route(scope), status_code)
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = HTTP_REQUEST_SECONDS.labels(*key)
+            histogram.observe(elapsed)
+
+
+def metrics():
+    """Prometheus metrics for this process, or for every worker under gunicorn"""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
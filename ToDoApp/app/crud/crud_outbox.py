@@ -0,0 +1,57 @@
+from datetime import datetime
+
+from sqlalchemy import case, delete, select, update
+from sqlalchemy.orm import Session
+from app.models.outbox import NotificationOutbox
+
+def add_notification(db: Session, user_id: int, message: str) -> NotificationOutbox:
+    """Stage a notification in the caller's transaction; does not commit"""
+    db_notification = NotificationOutbox(user_id=user_id, message=message)
+    db.add(db_notification)
+    return db_notification
+
+def get_pending(db: Session, limit: int) -> list[NotificationOutbox]:
+    """Oldest undelivered, live rows; on Postgres concurrent relays skip each other's rows"""
+    stmt = (
+        select(NotificationOutbox)
+        .where(
+            NotificationOutbox.delivered_at.is_(None),
+            NotificationOutbox.failed_at.is_(None),
+        )
+        .order_by(NotificationOutbox.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    return db.execute(stmt).scalars().all()
+
+def mark_delivered(db: Session, ids: list[int]) -> None:
+    db.execute(
+        update(NotificationOutbox)
+        .where(NotificationOutbox.id.in_(ids))
+        .values(delivered_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+def mark_failed(db: Session, ids: list[int], max_attempts: int) -> None:
+    """Count a failed delivery; rows reaching max_attempts are dead-lettered"""
+    attempts = NotificationOutbox.attempts + 1
+    db.execute(
+        update(NotificationOutbox)
+        .where(NotificationOutbox.id.in_(ids))
+        .values(
+            attempts=attempts,
+            failed_at=case((attempts >= max_attempts, datetime.utcnow()), else_=None),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+def purge_delivered(db: Session, before: datetime) -> int:
+    result = db.execute(
+        delete(NotificationOutbox)
+        .where(NotificationOutbox.delivered_at < before)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount
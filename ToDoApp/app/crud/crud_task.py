@@ -1,26 +1,217 @@
+import json
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Iterable, Iterator, Optional, Tuple
+
+from sqlalchemy import bindparam, case, delete, func, insert, select, tuple_, update
 from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+from app.core.clients import get_event_broker
+from app.core.config import settings
+from app.core.events import Event
+from app.crud import crud_outbox
+from app.crud.crud_task_stats import StatsDeltas
+from app.database import search
 from app.models.task import Task
-from app.schemas.task import TaskCreate, TaskUpdate
+from app.models.tombstone import TaskTombstone
+from app.models.user import User
+from app.schemas.task import TaskBulkUpdateItem, TaskCreate, TaskOut, TaskUpdate
+from app.utils.pagination import encode_change_cursor
+
+# Columns a TaskOut is built from, in its field order
+TASK_OUT_COLUMNS = (Task.title, Task.day, Task.id, Task.is_completed)
+
+# Rows per multi-row INSERT ... VALUES statement (4 bound parameters per row)
+BULK_INSERT_CHUNK_SIZE = 1000
+# Ids per IN (...) list; SQLite >= 3.32 allows 32766 bound parameters
+BULK_IN_CHUNK_SIZE = 10000
+
+def task_created_message(task: Task) -> str:
+    return f"New task created: {task.title} due on {task.day}"
+
+def tasks_created_message(tasks: list[Task]) -> str:
+    """One notification for a whole batch of new tasks"""
+    if len(tasks) == 1:
+        return task_created_message(tasks[0])
+    return f"{len(tasks)} new tasks created"
+
+def task_out_row(row) -> dict:
+    """A TaskOut-shaped, JSON-ready dict from a TASK_OUT_COLUMNS row, without pydantic"""
+    title, day, task_id, is_completed = row
+    return {"title": title, "day": day.isoformat(), "id": task_id, "is_completed": bool(is_completed)}
+
+def _chunks(items: list, size: int) -> Iterator[list]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def task_cache_key(owner_id: int, tasks_version: int, task_id: int) -> str:
+    """Single task key; like listing keys it carries the collection version"""
+    return f"task:{owner_id}:v{tasks_version}:{task_id}"
+
+def tasks_cache_key(owner_id: int, tasks_version: int, *query) -> str:
+    """Listing key; the collection version in it retires entries on any write"""
+    return f"task-rows:{owner_id}:v{tasks_version}:" + ":".join(map(str, query))
+
+def _publish(owner_id: int, event_type: str, event_id: str, data: str) -> None:
+    """Push a committed change to the owner's /tasks/stream connections"""
+    get_event_broker().publish(owner_id, Event(event_type, event_id, data))
+
+def _publish_task(event_type: str, task: Task) -> None:
+    _publish(
+        task.owner_id,
+        event_type,
+        encode_change_cursor(task.change_seq, task.id),
+        TaskOut.from_orm(task).json(),
+    )
+
+def _publish_bulk(owner_id: int, count: int) -> None:
+    # One event for the whole batch; clients fetch the rows from /tasks/changes
+    _publish(owner_id, "bulk", "", json.dumps({"count": count}))
+
+def touch_tasks_version(db: Session, owner_id: int) -> int:
+    """Bump the owner's task collection version in the caller's transaction.
+
+    The new version doubles as the change sequence stamped on the rows being
+    written. The UPDATE holds the owner's row lock until commit, so writers
+    for one owner commit their sequences in order.
+    """
+    users = User.__table__
+    db.execute(
+        update(users)
+        .where(users.c.id == owner_id)
+        .values(tasks_version=users.c.tasks_version + 1, tasks_updated_at=datetime.utcnow())
+    )
+    return db.execute(select(users.c.tasks_version).where(users.c.id == owner_id)).scalar() or 0
+
+def get_tasks_version(db: Session, owner_id: int):
+    """(tasks_version, tasks_updated_at) of an owner, or None for an unknown user"""
+    return db.execute(
+        select(User.tasks_version, User.tasks_updated_at).where(User.id == owner_id)
+    ).first()
+
+def get_task_version(db: Session, task_id: int):
+    """(owner_id, version, updated_at) of a task without loading it, or None"""
+    return db.execute(
+        select(Task.owner_id, Task.version, Task.updated_at).where(Task.id == task_id)
+    ).first()
 
 def create_task(db: Session, task_in: TaskCreate, owner_id: int) -> Task:
     db_task = Task(
         title=task_in.title,
         day=task_in.day,
         is_completed=False,
-        owner_id=owner_id
+        owner_id=owner_id,
+        change_seq=touch_tasks_version(db, owner_id),
     )
     db.add(db_task)
+    deltas = StatsDeltas()
+    deltas.add_task(owner_id, db_task.day, False)
+    deltas.apply(db)
+    if settings.NOTIFICATION_OUTBOX_ENABLED:
+        # Same transaction as the task, so the notification can't be lost
+        crud_outbox.add_notification(db, owner_id, task_created_message(db_task))
     db.commit()
     db.refresh(db_task)
+    _publish_task("created", db_task)
     return db_task
 
-def get_tasks_by_owner(db: Session, owner_id: int) -> list[Task]:
-    return db.query(Task).filter(Task.owner_id == owner_id).all()
+def tasks_by_owner_statement(
+    owner_id: int,
+    day_from: Optional[date] = None,
+    day_to: Optional[date] = None,
+    is_completed: Optional[bool] = None,
+    after: Optional[Tuple[date, int]] = None,
+    columns: Optional[tuple] = None,
+) -> Select:
+    """Build the filtered (day, id)-ordered select shared by the sync and async paths.
+
+    Selects Task entities, or just ``columns`` as plain tuples when given.
+    """
+    stmt = select(*columns) if columns else select(Task)
+    stmt = _filter_tasks(stmt.where(Task.owner_id == owner_id), day_from, day_to, is_completed)
+    if after is not None:
+        # Keyset condition, served by the (owner_id, day, id) index
+        stmt = stmt.where(tuple_(Task.day, Task.id) > tuple_(*after))
+    return stmt.order_by(Task.day, Task.id)
+
+def _filter_tasks(
+    stmt: Select,
+    day_from: Optional[date] = None,
+    day_to: Optional[date] = None,
+    is_completed: Optional[bool] = None,
+) -> Select:
+    if day_from is not None:
+        stmt = stmt.where(Task.day >= day_from)
+    if day_to is not None:
+        stmt = stmt.where(Task.day <= day_to)
+    if is_completed is not None:
+        stmt = stmt.where(Task.is_completed == is_completed)
+    return stmt
+
+def search_statement(
+    dialect_name: str,
+    owner_id: int,
+    terms: list[str],
+    day_from: Optional[date] = None,
+    day_to: Optional[date] = None,
+    is_completed: Optional[bool] = None,
+    max_id: Optional[int] = None,
+) -> Select:
+    """TASK_OUT_COLUMNS plus rank for tasks whose title has every term as a prefix.
+
+    Ordered best match first. Ranks move with every write to the index, so
+    they cannot serve as a keyset; callers page with an offset, and pass
+    ``max_id`` to leave out tasks created after the first page.
+    """
+    from_clause, condition, rank = search.match(dialect_name, Task.__table__, owner_id, terms)
+    stmt = (
+        select(*TASK_OUT_COLUMNS, rank.label("rank"))
+        .select_from(from_clause)
+        .where(condition, Task.owner_id == owner_id)
+    )
+    stmt = _filter_tasks(stmt, day_from, day_to, is_completed)
+    if max_id is not None:
+        stmt = stmt.where(Task.id <= max_id)
+    return stmt.order_by(rank, Task.id)
+
+def max_task_id_statement() -> Select:
+    """Highest task id so far; ids are never reused, so it marks a point in time"""
+    return select(func.coalesce(func.max(Task.id), 0))
+
+def get_tasks_by_owner(
+    db: Session,
+    owner_id: int,
+    day_from: Optional[date] = None,
+    day_to: Optional[date] = None,
+    is_completed: Optional[bool] = None,
+    after: Optional[Tuple[date, int]] = None,
+    limit: Optional[int] = None,
+) -> list[Task]:
+    stmt = tasks_by_owner_statement(owner_id, day_from, day_to, is_completed, after)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return db.execute(stmt).scalars().all()
+
+def iter_tasks_by_owner(
+    db: Session,
+    owner_id: int,
+    day_from: Optional[date] = None,
+    day_to: Optional[date] = None,
+    is_completed: Optional[bool] = None,
+    after: Optional[Tuple[date, int]] = None,
+    batch_size: int = 500,
+) -> Iterator[Task]:
+    """Yield tasks from a server-side cursor without loading the full list"""
+    stmt = tasks_by_owner_statement(owner_id, day_from, day_to, is_completed, after)
+    stmt = stmt.execution_options(stream_results=True, yield_per=batch_size)
+    yield from db.execute(stmt).scalars()
 
 def get_task_by_id(db: Session, task_id: int) -> Task | None:
     return db.query(Task).filter(Task.id == task_id).first()
 
 def update_task(db: Session, db_task: Task, task_update: TaskUpdate) -> Task:
+    """Raises StaleDataError if the task changed since it was loaded"""
+    old_day, old_completed = db_task.day, bool(db_task.is_completed)
     if task_update.title is not None:
         db_task.title = task_update.title
     if task_update.day is not None:
@@ -28,11 +219,275 @@ def update_task(db: Session, db_task: Task, task_update: TaskUpdate) -> Task:
     if task_update.is_completed is not None:
         db_task.is_completed = task_update.is_completed
 
+    db_task.change_seq = touch_tasks_version(db, db_task.owner_id)
     db.add(db_task)
+    if (db_task.day, bool(db_task.is_completed)) != (old_day, old_completed):
+        deltas = StatsDeltas()
+        deltas.add_task(db_task.owner_id, old_day, old_completed, -1)
+        deltas.add_task(db_task.owner_id, db_task.day, db_task.is_completed)
+        deltas.apply(db)
     db.commit()
     db.refresh(db_task)
+    _publish_task("updated", db_task)
     return db_task
 
+def _add_tombstones(db: Session, owner_id: int, task_ids: list[int], change_seq: int) -> None:
+    if task_ids:
+        now = datetime.utcnow()
+        db.execute(insert(TaskTombstone.__table__), [
+            {"owner_id": owner_id, "task_id": task_id, "change_seq": change_seq, "deleted_at": now}
+            for task_id in task_ids
+        ])
+
 def delete_task(db: Session, db_task: Task) -> None:
+    """Raises StaleDataError if the task changed since it was loaded"""
+    owner_id, task_id = db_task.owner_id, db_task.id
+    change_seq = touch_tasks_version(db, owner_id)
+    deltas = StatsDeltas()
+    deltas.add_task(owner_id, db_task.day, db_task.is_completed, -1)
+    deltas.apply(db)
     db.delete(db_task)
-    db.commit()
\ No newline at end of file
+    _add_tombstones(db, owner_id, [task_id], change_seq)
+    db.commit()
+    _publish(owner_id, "deleted", encode_change_cursor(change_seq, task_id), json.dumps({"id": task_id}))
+
+def get_owned_task_ids(db: Session, owner_id: int, task_ids: Iterable[int]) -> set[int]:
+    """Which of task_ids belong to owner_id, in one WHERE owner_id AND id IN query"""
+    owned = set()
+    for chunk in _chunks(list(set(task_ids)), BULK_IN_CHUNK_SIZE):
+        owned.update(db.execute(
+            select(Task.id).where(Task.owner_id == owner_id, Task.id.in_(chunk))
+        ).scalars())
+    return owned
+
+def create_tasks_bulk(db: Session, tasks_in: list[TaskCreate], owner_id: int) -> list[Task]:
+    """Insert many tasks and one aggregated notification in a single transaction"""
+    now = datetime.utcnow()
+    change_seq = touch_tasks_version(db, owner_id)
+    rows = [
+        {
+            "title": task_in.title,
+            "day": task_in.day,
+            "is_completed": False,
+            "owner_id": owner_id,
+            "version": 1,
+            "updated_at": now,
+            "change_seq": change_seq,
+        }
+        for task_in in tasks_in
+    ]
+    if db.get_bind().dialect.name == "sqlite":
+        # SQLAlchemy 1.4 has no RETURNING for SQLite: executemany, then read the
+        # ids back. The insert holds SQLite's database-wide write lock until
+        # commit, so this owner's newest ids are exactly the rows just added.
+        db.execute(insert(Task.__table__), rows)
+        task_ids = db.execute(
+            select(Task.id)
+            .where(Task.owner_id == owner_id)
+            .order_by(Task.id.desc())
+            .limit(len(rows))
+        ).scalars().all()
+        task_ids.reverse()
+    else:
+        task_ids = []
+        for chunk in _chunks(rows, BULK_INSERT_CHUNK_SIZE):
+            task_ids.extend(db.execute(
+                insert(Task.__table__).values(chunk).returning(Task.__table__.c.id)
+            ).scalars())
+
+    # Build the results from what was inserted instead of selecting them again
+    tasks = [Task(id=task_id, **row) for task_id, row in zip(task_ids, rows)]
+    deltas = StatsDeltas()
+    for row in rows:
+        deltas.add_task(owner_id, row["day"], False)
+    deltas.apply(db)
+    if settings.NOTIFICATION_OUTBOX_ENABLED:
+        crud_outbox.add_notification(db, owner_id, tasks_created_message(tasks))
+    db.commit()
+    _publish_bulk(owner_id, len(tasks))
+    return tasks
+
+def update_tasks_bulk(db: Session, owner_id: int, items: list[TaskBulkUpdateItem]) -> list[Task]:
+    """Apply per-task partial updates with one executemany per set of changed fields.
+
+    Callers check ownership first (get_owned_task_ids); the owner filter in
+    the UPDATE is a second line of defence.
+    """
+    groups = defaultdict(list)
+    for item in items:
+        values = item.dict(exclude={"id"}, exclude_none=True)
+        if values:
+            groups[tuple(sorted(values))].append(
+                {"b_id": item.id, **{f"b_{field}": value for field, value in values.items()}}
+            )
+
+    table = Task.__table__
+    change_seq = touch_tasks_version(db, owner_id) if groups else None
+    _stage_bulk_update_stats(db, owner_id, items)
+    for fields, params in groups.items():
+        stmt = (
+            update(table)
+            .where(table.c.id == bindparam("b_id"), table.c.owner_id == owner_id)
+            .values({field: bindparam(f"b_{field}") for field in fields})
+            .values(version=table.c.version + 1, change_seq=change_seq)
+        )
+        db.execute(stmt, params)
+    db.commit()
+    if groups:
+        _publish_bulk(owner_id, sum(len(params) for params in groups.values()))
+
+    tasks = []
+    for chunk in _chunks(list({item.id for item in items}), BULK_IN_CHUNK_SIZE):
+        tasks.extend(db.execute(
+            select(Task)
+            .where(Task.owner_id == owner_id, Task.id.in_(chunk))
+            .execution_options(populate_existing=True)
+        ).scalars())
+    return sorted(tasks, key=lambda task: task.id)
+
+def _stage_bulk_update_stats(db: Session, owner_id: int, items: list[TaskBulkUpdateItem]) -> None:
+    """Move the day counts of tasks whose day or completion the items change"""
+    moved = {item.id for item in items if item.day is not None or item.is_completed is not None}
+    before = {}
+    for chunk in _chunks(list(moved), BULK_IN_CHUNK_SIZE):
+        for task_id, day, is_completed in db.execute(
+            select(Task.id, Task.day, Task.is_completed).where(Task.owner_id == owner_id, Task.id.in_(chunk))
+        ):
+            before[task_id] = (day, bool(is_completed))
+    after = dict(before)
+    for item in items:
+        if item.id in after:
+            day, is_completed = after[item.id]
+            after[item.id] = (
+                item.day if item.day is not None else day,
+                item.is_completed if item.is_completed is not None else is_completed,
+            )
+    deltas = StatsDeltas()
+    for task_id, (day, is_completed) in before.items():
+        deltas.add_task(owner_id, day, is_completed, -1)
+        deltas.add_task(owner_id, *after[task_id])
+    deltas.apply(db)
+
+def complete_tasks_bulk(db: Session, owner_id: int, task_ids: list[int], is_completed: bool = True) -> int:
+    count = 0
+    change_seq = touch_tasks_version(db, owner_id)
+    deltas = StatsDeltas()
+    for chunk in _chunks(list(set(task_ids)), BULK_IN_CHUNK_SIZE):
+        # Only tasks whose completion actually flips move the completed count
+        for day, flipped in db.execute(
+            select(Task.day, func.count())
+            .where(
+                Task.owner_id == owner_id,
+                Task.id.in_(chunk),
+                func.coalesce(Task.is_completed, False) != is_completed,
+            )
+            .group_by(Task.day)
+        ):
+            deltas.add(owner_id, day, 0, flipped if is_completed else -flipped)
+        count += db.execute(
+            update(Task.__table__)
+            .where(Task.owner_id == owner_id, Task.id.in_(chunk))
+            .values(
+                is_completed=is_completed,
+                version=Task.__table__.c.version + 1,
+                change_seq=change_seq,
+            )
+        ).rowcount
+    if not count:
+        # Nothing matched; don't advance the collection version
+        db.rollback()
+        return 0
+    deltas.apply(db)
+    db.commit()
+    _publish_bulk(owner_id, count)
+    return count
+
+def delete_tasks_bulk(db: Session, owner_id: int, task_ids: list[int]) -> int:
+    owned = sorted(get_owned_task_ids(db, owner_id, task_ids))
+    if not owned:
+        return 0
+    change_seq = touch_tasks_version(db, owner_id)
+    deltas = StatsDeltas()
+    for chunk in _chunks(owned, BULK_IN_CHUNK_SIZE):
+        for day, total, completed in db.execute(
+            select(Task.day, func.count(), func.sum(case((Task.is_completed == True, 1), else_=0)))  # noqa: E712
+            .where(Task.owner_id == owner_id, Task.id.in_(chunk))
+            .group_by(Task.day)
+        ):
+            deltas.add(owner_id, day, -total, -completed)
+        db.execute(delete(Task.__table__).where(Task.owner_id == owner_id, Task.id.in_(chunk)))
+    _add_tombstones(db, owner_id, owned, change_seq)
+    deltas.apply(db)
+    db.commit()
+    _publish_bulk(owner_id, len(owned))
+    return len(owned)
+
+def changes_statements(owner_id: int, after: Tuple[int, int], limit: int) -> Tuple[Select, Select]:
+    """Live tasks and tombstones past a (change_seq, task id) position, in that order"""
+    seq, task_id = after
+    tasks = (
+        select(Task)
+        .where(Task.owner_id == owner_id, tuple_(Task.change_seq, Task.id) > tuple_(seq, task_id))
+        .order_by(Task.change_seq, Task.id)
+        .limit(limit)
+    )
+    tombstones = (
+        select(TaskTombstone.change_seq, TaskTombstone.task_id)
+        .where(
+            TaskTombstone.owner_id == owner_id,
+            tuple_(TaskTombstone.change_seq, TaskTombstone.task_id) > tuple_(seq, task_id),
+        )
+        .order_by(TaskTombstone.change_seq, TaskTombstone.task_id)
+        .limit(limit)
+    )
+    return tasks, tombstones
+
+def merge_changes(tasks: list[Task], tombstones: list, limit: int) -> Tuple[list, bool]:
+    """Merge both (change_seq, id)-ordered lists into one page of up to limit entries.
+
+    Entries are (change_seq, task_id, task-or-None); None marks a deletion.
+    Task ids are never reused (AUTOINCREMENT on SQLite, a sequence on
+    Postgres), so an id is either live or deleted and the key is unique
+    across both lists.
+    """
+    merged = sorted(
+        [(task.change_seq, task.id, task) for task in tasks]
+        + [(row.change_seq, row.task_id, None) for row in tombstones],
+        key=lambda entry: entry[:2],
+    )
+    return merged[:limit], len(merged) > limit
+
+def get_changes(db: Session, owner_id: int, after: Tuple[int, int], limit: int) -> Tuple[list, bool]:
+    """One page of changes after a position; work is bounded by limit, not list size"""
+    tasks_stmt, tombstones_stmt = changes_statements(owner_id, after, limit + 1)
+    tasks = db.execute(tasks_stmt).scalars().all()
+    tombstones = db.execute(tombstones_stmt).all()
+    return merge_changes(tasks, tombstones, limit)
+
+def get_tombstones_purged_seq(db: Session, owner_id: int) -> int:
+    return db.execute(
+        select(User.tombstones_purged_seq).where(User.id == owner_id)
+    ).scalar() or 0
+
+def purge_tombstones(db: Session, older_than: datetime) -> int:
+    """Delete old tombstones and record, per owner, the highest sequence removed"""
+    purged = db.execute(
+        select(TaskTombstone.owner_id, func.max(TaskTombstone.change_seq))
+        .where(TaskTombstone.deleted_at < older_than)
+        .group_by(TaskTombstone.owner_id)
+    ).all()
+    if not purged:
+        db.rollback()
+        return 0
+    users = User.__table__
+    db.execute(
+        update(users)
+        .where(users.c.id == bindparam("b_owner_id"), users.c.tombstones_purged_seq < bindparam("b_seq"))
+        .values(tombstones_purged_seq=bindparam("b_seq")),
+        [{"b_owner_id": owner_id, "b_seq": seq} for owner_id, seq in purged],
+    )
+    count = db.execute(
+        delete(TaskTombstone.__table__).where(TaskTombstone.deleted_at < older_than)
+    ).rowcount
+    db.commit()
+    return count
@@ -0,0 +1,157 @@
+# ToDoApp/app/crud/crud_task_async.py
+"""Async counterparts of crud_task.
+
+Writes and point lookups run the sync functions through
+AsyncSession.run_sync, so both paths share a single implementation.
+"""
+from datetime import date
+from typing import AsyncIterator, Iterable, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud import crud_task, crud_task_stats
+from app.models.task import Task
+from app.schemas.task import TaskBulkUpdateItem, TaskCreate, TaskUpdate
+
+async def create_task(db: AsyncSession, task_in: TaskCreate, owner_id: int) -> Task:
+    return await db.run_sync(crud_task.create_task, task_in, owner_id)
+
+async def get_tasks_by_owner(
+    db: AsyncSession,
+    owner_id: int,
+    day_from: Optional[date] = None,
+    day_to: Optional[date] = None,
+    is_completed: Optional[bool] = None,
+    after: Optional[Tuple[date, int]] = None,
+    limit: Optional[int] = None,
+) -> list[Task]:
+    stmt = crud_task.tasks_by_owner_statement(owner_id, day_from, day_to, is_completed, after)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    result = await db.execute(stmt)
+    return result.scalars().all()
+
+async def get_task_rows_by_owner(
+    db: AsyncSession,
+    owner_id: int,
+    day_from: Optional[date] = None,
+    day_to: Optional[date] = None,
+    is_completed: Optional[bool] = None,
+    after: Optional[Tuple[date, int]] = None,
+    limit: Optional[int] = None,
+) -> list[dict]:
+    """Like get_tasks_by_owner, as TaskOut-shaped dicts built from column tuples"""
+    stmt = crud_task.tasks_by_owner_statement(
+        owner_id, day_from, day_to, is_completed, after, columns=crud_task.TASK_OUT_COLUMNS
+    )
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    result = await db.execute(stmt)
+    return [crud_task.task_out_row(row) for row in result]
+
+async def search_task_rows(
+    db: AsyncSession,
+    owner_id: int,
+    terms: list[str],
+    day_from: Optional[date] = None,
+    day_to: Optional[date] = None,
+    is_completed: Optional[bool] = None,
+    max_id: Optional[int] = None,
+    offset: int = 0,
+    limit: Optional[int] = None,
+) -> list[dict]:
+    """TaskOut-shaped dicts for each match, best first"""
+    stmt = crud_task.search_statement(
+        db.bind.dialect.name, owner_id, terms, day_from, day_to, is_completed, max_id
+    )
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    result = await db.execute(stmt.offset(offset))
+    return [crud_task.task_out_row(row[:4]) for row in result]
+
+async def get_max_task_id(db: AsyncSession) -> int:
+    return (await db.execute(crud_task.max_task_id_statement())).scalar()
+
+async def iter_task_rows_by_owner(
+    db: AsyncSession,
+    owner_id: int,
+    day_from: Optional[date] = None,
+    day_to: Optional[date] = None,
+    is_completed: Optional[bool] = None,
+    after: Optional[Tuple[date, int]] = None,
+    batch_size: int = 500,
+) -> AsyncIterator[dict]:
+    """Like iter_tasks_by_owner, as TaskOut-shaped dicts built from column tuples"""
+    stmt = crud_task.tasks_by_owner_statement(
+        owner_id, day_from, day_to, is_completed, after, columns=crud_task.TASK_OUT_COLUMNS
+    )
+    result = await db.stream(stmt.execution_options(yield_per=batch_size))
+    async for row in result:
+        yield crud_task.task_out_row(row)
+
+async def iter_tasks_by_owner(
+    db: AsyncSession,
+    owner_id: int,
+    day_from: Optional[date] = None,
+    day_to: Optional[date] = None,
+    is_completed: Optional[bool] = None,
+    after: Optional[Tuple[date, int]] = None,
+    batch_size: int = 500,
+) -> AsyncIterator[Task]:
+    """Yield tasks from a server-side cursor without loading the full list"""
+    stmt = crud_task.tasks_by_owner_statement(owner_id, day_from, day_to, is_completed, after)
+    result = await db.stream_scalars(stmt.execution_options(yield_per=batch_size))
+    async for task in result:
+        yield task
+
+async def get_day_stats(
+    db: AsyncSession,
+    owner_id: int,
+    day_from: Optional[date] = None,
+    day_to: Optional[date] = None,
+) -> list:
+    """(day, total, completed) rows from the summary table; no task rows are read"""
+    result = await db.execute(crud_task_stats.day_stats_statement(owner_id, day_from, day_to))
+    return result.all()
+
+async def get_tasks_version(db: AsyncSession, owner_id: int):
+    return await db.run_sync(crud_task.get_tasks_version, owner_id)
+
+async def get_task_version(db: AsyncSession, task_id: int):
+    return await db.run_sync(crud_task.get_task_version, task_id)
+
+async def get_changes(db: AsyncSession, owner_id: int, after: Tuple[int, int], limit: int):
+    tasks_stmt, tombstones_stmt = crud_task.changes_statements(owner_id, after, limit + 1)
+    tasks = (await db.execute(tasks_stmt)).scalars().all()
+    tombstones = (await db.execute(tombstones_stmt)).all()
+    return crud_task.merge_changes(tasks, tombstones, limit)
+
+async def get_tombstones_purged_seq(db: AsyncSession, owner_id: int) -> int:
+    return await db.run_sync(crud_task.get_tombstones_purged_seq, owner_id)
+
+async def get_task_by_id(db: AsyncSession, task_id: int) -> Task | None:
+    return await db.run_sync(crud_task.get_task_by_id, task_id)
+
+async def update_task(db: AsyncSession, db_task: Task, task_update: TaskUpdate) -> Task:
+    return await db.run_sync(crud_task.update_task, db_task, task_update)
+
+async def delete_task(db: AsyncSession, db_task: Task) -> None:
+    await db.run_sync(crud_task.delete_task, db_task)
+
+
+async def get_owned_task_ids(db: AsyncSession, owner_id: int, task_ids: Iterable[int]) -> set[int]:
+    return await db.run_sync(crud_task.get_owned_task_ids, owner_id, task_ids)
+
+async def create_tasks_bulk(db: AsyncSession, tasks_in: list[TaskCreate], owner_id: int) -> list[Task]:
+    return await db.run_sync(crud_task.create_tasks_bulk, tasks_in, owner_id)
+
+async def update_tasks_bulk(db: AsyncSession, owner_id: int, items: list[TaskBulkUpdateItem]) -> list[Task]:
+    return await db.run_sync(crud_task.update_tasks_bulk, owner_id, items)
+
+async def complete_tasks_bulk(
+    db: AsyncSession, owner_id: int, task_ids: list[int], is_completed: bool = True
+) -> int:
+    return await db.run_sync(crud_task.complete_tasks_bulk, owner_id, task_ids, is_completed)
+
+async def delete_tasks_bulk(db: AsyncSession, owner_id: int, task_ids: list[int]) -> int:
+    return await db.run_sync(crud_task.delete_tasks_bulk, owner_id, task_ids)
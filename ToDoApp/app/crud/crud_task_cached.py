@@ -0,0 +1,94 @@
+# ToDoApp/app/crud/crud_task_cached.py
+"""Cached task reads for the GET endpoints.
+
+Results are TaskRecord snapshots (single tasks) or TaskOut-shaped dicts
+(listings) rather than session-bound Task objects, so they can be shared
+between requests and stored out of process. Every key carries the owner's
+tasks_version, which each write through crud_task bumps in the same
+transaction, so a write retires the entries of every worker at once rather
+than relying on each process's cache to be invalidated.
+"""
+from dataclasses import asdict, dataclass
+from datetime import date, datetime
+from typing import Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.clients import get_task_cache
+from app.crud import crud_task, crud_task_async
+from app.models.task import Task
+
+
+@dataclass(frozen=True)
+class TaskRecord:
+    id: int
+    title: str
+    day: date
+    is_completed: bool
+    owner_id: int
+    version: int
+    updated_at: datetime
+    change_seq: int
+
+    @classmethod
+    def from_task(cls, task: Task) -> "TaskRecord":
+        return cls(
+            id=task.id,
+            title=task.title,
+            day=task.day,
+            is_completed=bool(task.is_completed),
+            owner_id=task.owner_id,
+            version=task.version,
+            updated_at=task.updated_at,
+            change_seq=task.change_seq,
+        )
+
+    def to_dict(self) -> dict:
+        """JSON-compatible form stored in the cache"""
+        data = asdict(self)
+        data["day"] = self.day.isoformat()
+        data["updated_at"] = self.updated_at.isoformat()
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "TaskRecord":
+        return cls(**{
+            **data,
+            "day": date.fromisoformat(data["day"]),
+            "updated_at": datetime.fromisoformat(data["updated_at"]),
+        })
+
+
+async def get_task_by_id(
+    db: AsyncSession, owner_id: int, tasks_version: int, task_id: int
+) -> Optional[TaskRecord]:
+    """The task if owner_id owns it, else None"""
+    async def load():
+        task = await crud_task_async.get_task_by_id(db, task_id)
+        if task is None or task.owner_id != owner_id:
+            return None
+        return TaskRecord.from_task(task).to_dict()
+
+    key = crud_task.task_cache_key(owner_id, tasks_version, task_id)
+    data = await get_task_cache().get_or_load(key, load)
+    return TaskRecord.from_dict(data) if data else None
+
+
+async def get_task_rows_by_owner(
+    db: AsyncSession,
+    owner_id: int,
+    tasks_version: int,
+    day_from: Optional[date] = None,
+    day_to: Optional[date] = None,
+    is_completed: Optional[bool] = None,
+    after: Optional[Tuple[date, int]] = None,
+    limit: Optional[int] = None,
+) -> list[dict]:
+    """A page of TaskOut-shaped dicts, cached as-is since they are JSON-ready"""
+    async def load():
+        return await crud_task_async.get_task_rows_by_owner(
+            db, owner_id, day_from, day_to, is_completed, after, limit
+        )
+
+    key = crud_task.tasks_cache_key(owner_id, tasks_version, day_from, day_to, is_completed, after, limit)
+    return await get_task_cache().get_or_load(key, load)
@@ -0,0 +1,95 @@
+from collections import defaultdict
+from datetime import date
+from typing import Optional
+
+from sqlalchemy import case, delete, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+from app.models.task import Task
+from app.models.task_stats import TaskDayStats
+
+class StatsDeltas:
+    """Changes to (total, completed) per (owner_id, day), applied as one upsert"""
+
+    def __init__(self):
+        self._counts = defaultdict(lambda: [0, 0])
+
+    def add(self, owner_id: int, day: date, total: int, completed: int) -> None:
+        counts = self._counts[(owner_id, day)]
+        counts[0] += total
+        counts[1] += completed
+
+    def add_task(self, owner_id: int, day: date, is_completed, sign: int = 1) -> None:
+        """Count one task in (sign=1) or out of (sign=-1) its day"""
+        self.add(owner_id, day, sign, sign * int(bool(is_completed)))
+
+    def apply(self, db: Session) -> None:
+        """Stage the upsert in the caller's transaction; does not commit"""
+        rows = [
+            {"owner_id": owner_id, "day": day, "total": total, "completed": completed}
+            for (owner_id, day), (total, completed) in self._counts.items()
+            if total or completed
+        ]
+        if not rows:
+            return
+        dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+        table = TaskDayStats.__table__
+        stmt = dialect.insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.owner_id, table.c.day],
+            set_={
+                "total": table.c.total + stmt.excluded.total,
+                "completed": table.c.completed + stmt.excluded.completed,
+            },
+        )
+        db.execute(stmt, rows)
+
+def day_stats_statement(owner_id: int, day_from: Optional[date] = None, day_to: Optional[date] = None) -> Select:
+    """(day, total, completed) for each of the owner's days with tasks, in day order"""
+    stmt = select(TaskDayStats.day, TaskDayStats.total, TaskDayStats.completed).where(
+        TaskDayStats.owner_id == owner_id, TaskDayStats.total > 0
+    )
+    if day_from is not None:
+        stmt = stmt.where(TaskDayStats.day >= day_from)
+    if day_to is not None:
+        stmt = stmt.where(TaskDayStats.day <= day_to)
+    return stmt.order_by(TaskDayStats.day)
+
+def summarize(rows, today: date) -> dict:
+    """TaskStats-shaped totals over (day, total, completed) rows"""
+    days = [{"day": day, "total": total, "completed": completed} for day, total, completed in rows]
+    total = sum(row["total"] for row in days)
+    completed = sum(row["completed"] for row in days)
+    return {
+        "total": total,
+        "completed": completed,
+        "overdue": sum(row["total"] - row["completed"] for row in days if row["day"] < today),
+        "completion_rate": completed / total if total else 0.0,
+        "days": days,
+    }
+
+def rebuild(db: Session, owner_id: Optional[int] = None) -> int:
+    """Recompute the counts from tasks, for one owner or everyone; returns rows written"""
+    tasks = Task.__table__
+    stats = TaskDayStats.__table__
+    counts = (
+        select(
+            tasks.c.owner_id,
+            tasks.c.day,
+            func.count(),
+            func.sum(case((tasks.c.is_completed == True, 1), else_=0)),  # noqa: E712
+        )
+        .where(tasks.c.owner_id.isnot(None))
+        .group_by(tasks.c.owner_id, tasks.c.day)
+    )
+    clear = delete(stats)
+    if owner_id is not None:
+        counts = counts.where(tasks.c.owner_id == owner_id)
+        clear = clear.where(stats.c.owner_id == owner_id)
+    db.execute(clear)
+    written = db.execute(
+        insert(stats).from_select(["owner_id", "day", "total", "completed"], counts)
+    ).rowcount
+    db.commit()
+    return written
@@ -1,13 +1,16 @@
+from typing import Optional
+
 from sqlalchemy.orm import Session
 
+from app.core.auth_cache import principal_cache
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
 from app.utils.security import get_password_hash
 
-def create_user(db: Session, user_in: UserCreate) -> User:
+def create_user(db: Session, user_in: UserCreate, hashed_password: Optional[str] = None) -> User:
     db_user = User(
         email=user_in.email,
-        hashed_password=get_password_hash(user_in.password),
+        hashed_password=hashed_password or get_password_hash(user_in.password),
     )
     db.add(db_user)
     db.commit()
@@ -20,15 +23,27 @@ def get_user_by_email(db: Session, email: str) -> User | None:
 def get_user(db: Session, user_id: int) -> User | None:
     return db.query(User).filter(User.id == user_id).first()
 
-def update_user(db: Session, db_user: User, user_update: UserUpdate) -> User:
+def update_user(
+    db: Session,
+    db_user: User,
+    user_update: UserUpdate,
+    hashed_password: Optional[str] = None,
+) -> User:
     # If an email was provided, update it
     if user_update.email is not None:
         db_user.email = user_update.email
-    # If a password was provided, hash it and update
+    # If a password was provided, hash it (unless already hashed) and update
     if user_update.password is not None:
-        db_user.hashed_password = get_password_hash(user_update.password)
+        db_user.hashed_password = hashed_password or get_password_hash(user_update.password)
 
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
-    return db_user
\ No newline at end of file
+    principal_cache.invalidate(db_user.id)
+    return db_user
+
+def update_password_hash(db: Session, db_user: User, hashed_password: str) -> User:
+    db_user.hashed_password = hashed_password
+    db.add(db_user)
+    db.commit()
+    return db_user
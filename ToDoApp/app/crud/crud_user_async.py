@@ -0,0 +1,33 @@
+# ToDoApp/app/crud/crud_user_async.py
+"""Async counterparts of crud_user, sharing its implementation via run_sync.
+
+Passwords are hashed in the process pool before entering run_sync, so
+bcrypt never runs on the event loop.
+"""
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud import crud_user
+from app.models.user import User
+from app.schemas.user import UserCreate, UserUpdate
+from app.utils.security import get_password_hash_async
+
+async def create_user(db: AsyncSession, user_in: UserCreate) -> User:
+    hashed_password = await get_password_hash_async(user_in.password)
+    return await db.run_sync(crud_user.create_user, user_in, hashed_password)
+
+async def get_user_by_email(db: AsyncSession, email: str) -> User | None:
+    return await db.run_sync(crud_user.get_user_by_email, email)
+
+async def get_user(db: AsyncSession, user_id: int) -> User | None:
+    return await db.run_sync(crud_user.get_user, user_id)
+
+async def update_user(db: AsyncSession, db_user: User, user_update: UserUpdate) -> User:
+    hashed_password = None
+    if user_update.password is not None:
+        hashed_password = await get_password_hash_async(user_update.password)
+    return await db.run_sync(crud_user.update_user, db_user, user_update, hashed_password)
+
+async def rehash_password(db: AsyncSession, db_user: User, password: str) -> User:
+    """Re-hash a verified password with the current cost settings"""
+    hashed_password = await get_password_hash_async(password)
+    return await db.run_sync(crud_user.update_password_hash, db_user, hashed_password)
@@ -0,0 +1,97 @@
+# ToDoApp/app/database/search.py
+"""Full-text index over task titles.
+
+SQLite uses an FTS5 table, tasks_fts, kept in sync by triggers on tasks, so
+every write path (ORM, Core bulk statements, raw SQL) updates it. Each row
+also carries its owner as a token, so a search intersects the owner's
+postings instead of filtering every match afterwards. Postgres uses a
+generated tsvector column, tasks.title_tsv, with a GIN index.
+
+Neither is part of the ORM metadata: the DDL is attached to the tasks table
+for create_all, migration 0005 creates it for existing databases, and
+include_object keeps autogenerate from dropping it.
+"""
+import re
+from typing import List, Tuple
+
+from sqlalchemy import DDL, Integer, column, event, func, literal, literal_column, table
+from sqlalchemy.sql import ColumnElement, FromClause
+
+# Search terms beyond this many are ignored
+MAX_TERMS = 8
+
+SQLITE_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5("
+    "title, owner_tag, tokenize = 'unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN "
+    "INSERT INTO tasks_fts (rowid, title, owner_tag) VALUES (new.id, new.title, 'u' || new.owner_id); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN "
+    "DELETE FROM tasks_fts WHERE rowid = old.id; "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF title, owner_id ON tasks BEGIN "
+    "UPDATE tasks_fts SET title = new.title, owner_tag = 'u' || new.owner_id WHERE rowid = new.id; "
+    "END",
+)
+SQLITE_DROP = ("DROP TABLE IF EXISTS tasks_fts",)
+
+POSTGRES_DDL = (
+    "ALTER TABLE tasks ADD COLUMN IF NOT EXISTS title_tsv tsvector "
+    "GENERATED ALWAYS AS (to_tsvector('simple', title)) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_tasks_title_tsv ON tasks USING gin (title_tsv)",
+)
+
+# The FTS5 table and the shadow tables SQLite keeps for it
+SEARCH_TABLES = frozenset(
+    ["tasks_fts"] + [f"tasks_fts_{suffix}" for suffix in ("data", "idx", "content", "docsize", "config")]
+)
+
+tasks_fts = table("tasks_fts", column("rowid", Integer))
+
+
+def install(tasks_table):
+    """Create and drop the index along with the tasks table"""
+    for statement in SQLITE_DDL:
+        event.listen(tasks_table, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+    for statement in POSTGRES_DDL:
+        event.listen(tasks_table, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+    for statement in SQLITE_DROP:
+        event.listen(tasks_table, "before_drop", DDL(statement).execute_if(dialect="sqlite"))
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    """Alembic autogenerate filter hiding the search index.
+
+    Also hides sqlite_sequence, which SQLite creates for AUTOINCREMENT tables.
+    """
+    if type_ == "table" and (name in SEARCH_TABLES or name == "sqlite_sequence"):
+        return False
+    if type_ == "column" and name == "title_tsv":
+        return False
+    if type_ == "index" and name == "ix_tasks_title_tsv":
+        return False
+    return True
+
+
+def search_terms(q: str) -> List[str]:
+    """The words of a query, lowercased; each is matched as a prefix"""
+    return re.findall(r"\w+", q.lower())[:MAX_TERMS]
+
+
+def match(dialect_name: str, tasks_table, owner_id: int, terms: List[str]) -> Tuple[FromClause, ColumnElement, ColumnElement]:
+    """(FROM clause, match condition, rank) for tasks matching every term.
+
+    Lower ranks are better matches on both backends.
+    """
+    if dialect_name == "postgresql":
+        tsv = literal_column("tasks.title_tsv")
+        tsquery = func.to_tsquery("simple", " & ".join(f"{term}:*" for term in terms))
+        return tasks_table, tsv.op("@@")(tsquery), -func.ts_rank(tsv, tsquery)
+
+    prefixes = " ".join(f'"{term}"*' for term in terms)
+    condition = literal_column("tasks_fts").op("MATCH")(
+        literal(f"owner_tag:u{owner_id} AND title:({prefixes})")
+    )
+    # Weight only the title column; the owner token matches every row
+    rank = func.bm25(literal_column("tasks_fts"), 1.0, 0.0)
+    return tasks_fts.join(tasks_table, tasks_table.c.id == tasks_fts.c.rowid), condition, rank
@@ -1,11 +1,141 @@
-from sqlalchemy import create_engine
+import time
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from app.core.config import settings
+from app.core.load_shedding import pool_wait
+from app.core.metrics import (
+    DB_POOL_CHECKED_OUT,
+    DB_POOL_CHECKOUTS,
+    DB_POOL_WAIT_SECONDS,
+    DB_QUERIES,
+    DB_QUERY_SECONDS,
+)
+
+# Async driver to use for each sync driver accepted in DATABASE_URL
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+}
+
+
+def get_async_database_url(url: str) -> str:
+    """Map a sync database URL onto the matching async driver"""
+    parsed = make_url(url)
+    drivername = ASYNC_DRIVERS.get(parsed.drivername, parsed.drivername)
+    return str(parsed.set(drivername=drivername))
+
+
+def _is_sqlite_file(url) -> bool:
+    return url.get_backend_name() == "sqlite" and url.database not in (None, "", ":memory:")
+
+
+def get_engine_options(url: str, is_async: bool = False) -> dict:
+    """Engine keyword arguments for DATABASE_URL's backend"""
+    parsed = make_url(url)
+    if parsed.get_backend_name() != "sqlite":
+        return {
+            "pool_size": settings.DB_POOL_SIZE,
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+            "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+            "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        }
+
+    options = {"connect_args": {"check_same_thread": False}}
+    if _is_sqlite_file(parsed):
+        # SQLAlchemy 1.4 defaults file databases to NullPool, reopening the file
+        # and re-running the pragmas for every session; keep connections instead
+        options.update(
+            poolclass=AsyncAdaptedQueuePool if is_async else QueuePool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        )
+    return options
+
+
+# Statement verbs labelled individually, all six letters long
+SQL_OPERATIONS = frozenset(("SELECT", "INSERT", "UPDATE", "DELETE"))
+
+
+def statement_operation(statement: str) -> str:
+    """SELECT, INSERT, UPDATE, ... for metric labels"""
+    operation = statement.lstrip()[:6].upper()
+    return operation if operation in SQL_OPERATIONS else "OTHER"
+
+
+def configure_engine(engine: Engine, name: str):
+    """Attach SQLite pragmas, pool and query metrics to a (sync) engine"""
+    if engine.dialect.name == "sqlite":
+        @event.listens_for(engine, "connect")
+        def apply_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            if _is_sqlite_file(engine.url):
+                # WAL lets readers run alongside the single writer
+                cursor.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+                cursor.execute(f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE}")
+            cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+            cursor.execute(f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}")
+            cursor.close()
+
+    checked_out = DB_POOL_CHECKED_OUT.labels(name)
+    checkouts = DB_POOL_CHECKOUTS.labels(name)
+
+    @event.listens_for(engine, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        checkouts.inc()
+        checked_out.inc()
+
+    @event.listens_for(engine, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        checked_out.dec()
+
+    queries = {operation: DB_QUERIES.labels(name, operation) for operation in (*SQL_OPERATIONS, "OTHER")}
+    query_seconds = DB_QUERY_SECONDS.labels(name)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info["query_started"] = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        query_seconds.observe(time.perf_counter() - conn.info.pop("query_started"))
+        queries[statement_operation(statement)].inc()
+
+
+def observe_pool_wait(name: str, started: float):
+    waited = time.perf_counter() - started
+    DB_POOL_WAIT_SECONDS.labels(name).observe(waited)
+    pool_wait.observe(waited)
+
 
 engine = create_engine(
     settings.DATABASE_URL,
-    connect_args={"check_same_thread": False},  # Only needed for SQLite
-    echo=False
+    echo=False,
+    **get_engine_options(settings.DATABASE_URL)
 )
+configure_engine(engine, "sync")
+
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
\ No newline at end of file
+ASYNC_DATABASE_URL = settings.ASYNC_DATABASE_URL or get_async_database_url(settings.DATABASE_URL)
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    echo=False,
+    **get_engine_options(ASYNC_DATABASE_URL, is_async=True)
+)
+configure_engine(async_engine.sync_engine, "async")
+
+# expire_on_commit=False keeps attributes loaded after commit, so response
+# serialization never triggers lazy IO outside of an awaited call
+AsyncSessionLocal = sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
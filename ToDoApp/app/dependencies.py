@@ -1,45 +1,93 @@
+import time
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database.session import SessionLocal
+from app.database.session import AsyncSessionLocal, SessionLocal, observe_pool_wait
+from app.core.auth_cache import Principal, principal_cache
 from app.core.config import settings
-from app.crud.crud_user import get_user
+from app.crud import crud_user_async
 from app.models.user import User
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 def get_db():
+    """Sync session, for scripts, workers and tests"""
     db = SessionLocal()
     try:
+        started = time.perf_counter()
+        db.connection()
+        observe_pool_wait("sync", started)
         yield db
     finally:
         db.close()
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> User:
-    credentials_exception = HTTPException(
+async def get_async_db():
+    """Async session used by the API route handlers"""
+    async with AsyncSessionLocal() as db:
+        # Check the connection out up front so pool wait time is measured
+        started = time.perf_counter()
+        await db.connection()
+        observe_pool_wait("async", started)
+        yield db
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+def decode_token_user_id(token: str) -> int:
+    """Validate the JWT and return the user id from its subject claim"""
     try:
         payload = jwt.decode(
             token,
             settings.SECRET_KEY,
             algorithms=[settings.ALGORITHM]
         )
-        user_id: int = payload.get("sub")
+        user_id = payload.get("sub")
         if user_id is None:
-            raise credentials_exception
+            raise _credentials_exception()
+        return int(user_id)
     except (JWTError, ValueError):
-        raise credentials_exception
+        raise _credentials_exception()
 
-    user = get_user(db, user_id)
+def get_token_user_id(token: str = Depends(oauth2_scheme)) -> int:
+    return decode_token_user_id(token)
+
+async def get_current_user(
+    user_id: int = Depends(get_token_user_id),
+    db: AsyncSession = Depends(get_async_db)
+) -> User:
+    """The full User row, for routes that modify the user itself"""
+    user = await crud_user_async.get_user(db, user_id)
     if not user:
-        raise credentials_exception
+        raise _credentials_exception()
+
+    return user
+
+async def get_current_principal(
+    user_id: int = Depends(get_token_user_id),
+    db: AsyncSession = Depends(get_async_db)
+) -> Principal:
+    """The caller's identity, served from the principal cache when possible"""
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        user = await crud_user_async.get_user(db, user_id)
+        if not user:
+            raise _credentials_exception()
+        principal = Principal(id=user.id, email=user.email)
+        principal_cache.set(principal)
+    return principal
 
-    return user
\ No newline at end of file
+async def get_read_principal(
+    user_id: int = Depends(get_token_user_id),
+    db: AsyncSession = Depends(get_async_db)
+) -> Principal:
+    """Principal for read-only routes; trusts the signed claims if enabled"""
+    if settings.AUTH_TRUST_TOKEN_CLAIMS:
+        return Principal(id=user_id)
+    return await get_current_principal(user_id, db)
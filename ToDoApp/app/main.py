@@ -1,42 +1,65 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from app.database.session import engine
-from app.database.base import Base
+from fastapi.responses import JSONResponse
 import uvicorn
-import signal
-import sys
 
 from app.api.endpoints.auth import router as auth_router
 from app.api.endpoints.user import router as user_router
 from app.api.endpoints.task import router as task_router
-from app.core.config import settings
-from app.core.consul_client import ConsulClient
+from app.api.endpoints.task_events import router as task_events_router
+from app.core.clients import (
+    close_clients,
+    get_consul_client,
+    get_event_broker,
+    get_load_shedder,
+    get_notification_dispatcher,
+    get_rate_limiter,
+)
+from app.core.config import STATIC_SETTINGS, settings
+from app.core.query_budget import QueryBudgetMiddleware
+from app.core.load_shedding import LoadSheddingMiddleware
+from app.core.rate_limit import RateLimitMiddleware
+from app.core.request_metrics import MetricsMiddleware, metrics
+from app.utils.security import PasswordHasherBusy, shutdown_hash_pool
 
-# Create DB tables if not existing
-Base.metadata.create_all(bind=engine)
+# The schema is managed by migrations (`alembic upgrade head`), not at import
 
-app = FastAPI(title=settings.APP_NAME, version=settings.APP_VERSION)
 
-# Allow CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Follow Consul config and register on startup, release clients and pools on shutdown"""
+    if not settings.NOTIFICATION_OUTBOX_ENABLED:
+        get_notification_dispatcher().start()
+    get_event_broker().start()
+    if settings.CONSUL_ENABLED and settings.CONSUL_CONFIG_ENABLED:
+        get_consul_client().watch_config(settings, settings.CONSUL_CONFIG_PREFIX, STATIC_SETTINGS)
+    register = settings.CONSUL_ENABLED and settings.CONSUL_REGISTER_ON_STARTUP
+    if register:
+        get_consul_client().register_service(
+            name=settings.APP_NAME,
+            port=settings.SERVICE_PORT,
+            tags=["api", "todoapp"]
+        )
+    yield
+    if register:
+        get_consul_client().deregister_service()
+    if get_rate_limiter.cache_info().currsize:
+        await get_rate_limiter().close()
+    close_clients()
+    shutdown_hash_pool()
+
 
-# Include routers
-app.include_router(auth_router)
-app.include_router(user_router)
-app.include_router(task_router)
+async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusy):
+    """Shed load instead of queueing unbounded bcrypt work"""
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Server is busy, please retry"},
+        headers={"Retry-After": "1"},
+    )
 
-# Create Consul client
-consul_client = None
-if settings.CONSUL_ENABLED:
-    consul_client = ConsulClient()
 
-@app.get("/")
 def root():
     """Root endpoint"""
     return {
@@ -47,45 +70,64 @@ def root():
             "/tasks - Task management",
             "/auth - Authentication",
             "/users - User management",
-            "/health - Health check"
+            "/health - Health check",
+            "/metrics - Prometheus metrics"
         ]
     }
 
-@app.on_event("startup")
-async def startup_event():
-    """Startup event handler - register with Consul if enabled"""
-    if settings.CONSUL_ENABLED and consul_client:
-        consul_client.register_service(
-            name=settings.APP_NAME,
-            port=settings.SERVICE_PORT,
-            tags=["api", "todoapp"]
-        )
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    """Shutdown event handler - deregister from Consul if enabled"""
-    if settings.CONSUL_ENABLED and consul_client:
-        consul_client.deregister_service()
 
-@app.get("/health")
 def health():
     """Health check endpoint for Consul"""
     return {"status": "healthy"}
 
-# Signal handler for graceful shutdown
-def signal_handler(sig, frame):
-    print("Shutting down...")
-    if settings.CONSUL_ENABLED and consul_client:
-        consul_client.deregister_service()
-    sys.exit(0)
 
-signal.signal(signal.SIGINT, signal_handler)
-signal.signal(signal.SIGTERM, signal_handler)
+def create_app() -> FastAPI:
+    """Build the application; clients are created lazily, on first use"""
+    app = FastAPI(title=settings.APP_NAME, version=settings.APP_VERSION, lifespan=lifespan)
+
+    # Innermost, so only queries made by routing and the endpoint count
+    app.add_middleware(QueryBudgetMiddleware)
+
+    # Limits run inside CORS, so rejections still carry CORS headers; load
+    # is shed before per-client limits are checked
+    app.add_middleware(RateLimitMiddleware, get_limiter=get_rate_limiter)
+    app.add_middleware(LoadSheddingMiddleware, get_shedder=get_load_shedder)
+
+    # Allow CORS
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=["X-Next-Cursor", "ETag", "Last-Modified", "Retry-After"],
+    )
+
+    # Outermost, so rejected and preflight requests are observed too
+    app.add_middleware(MetricsMiddleware)
+
+    # Include routers
+    app.include_router(auth_router)
+    app.include_router(user_router)
+    # Before task_router, whose /tasks/{task_id} would otherwise match /tasks/stream
+    app.include_router(task_events_router)
+    app.include_router(task_router)
+
+    app.add_exception_handler(PasswordHasherBusy, password_hasher_busy_handler)
+    app.add_api_route("/", root, methods=["GET"])
+    app.add_api_route("/health", health, methods=["GET"])
+    app.add_api_route("/metrics", metrics, methods=["GET"], include_in_schema=False)
+    return app
+
+
+app = create_app()
 
+# A single development process; production runs `gunicorn -c gunicorn.conf.py app.main:app`.
+# uvicorn handles SIGINT/SIGTERM itself, draining requests before lifespan shutdown.
 if __name__ == "__main__":
     uvicorn.run(
         "app.main:app",
         host=settings.SERVICE_HOST,
         port=settings.SERVICE_PORT,
-        reload=True
-    )
\ No newline at end of file
+        reload=settings.SERVICE_RELOAD
+    )
@@ -1,2 +1,5 @@
 from app.models.user import User
-from app.models.task import Task
\ No newline at end of file
+from app.models.task import Task
+from app.models.outbox import NotificationOutbox
+from app.models.tombstone import TaskTombstone
+from app.models.task_stats import TaskDayStats
@@ -0,0 +1,26 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Index, Integer, String
+from app.database.base import Base
+
+class NotificationOutbox(Base):
+    """Notifications committed together with the change that caused them.
+
+    Rows are drained by the outbox relay worker (app.workers.outbox_relay),
+    which gives at-least-once delivery without network I/O in requests.
+    """
+    __tablename__ = "notification_outbox"
+    __table_args__ = (
+        # Pending rows are read in id order:
+        # WHERE delivered_at IS NULL AND failed_at IS NULL ORDER BY id
+        Index("ix_notification_outbox_pending", "delivered_at", "failed_at", "id"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, nullable=False)
+    message = Column(String, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    delivered_at = Column(DateTime, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    # Set once attempts reaches OUTBOX_MAX_ATTEMPTS; the relay skips the row
+    failed_at = Column(DateTime, nullable=True)
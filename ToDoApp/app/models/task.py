@@ -1,14 +1,39 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Date
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Date, DateTime, Index
 from sqlalchemy.orm import relationship
+from app.database import search
 from app.database.base import Base
 
 class Task(Base):
     __tablename__ = "tasks"
+    __table_args__ = (
+        # Backs keyset pagination of a user's tasks ordered by (day, id)
+        Index("ix_tasks_owner_day_id", "owner_id", "day", "id"),
+        # Backs delta sync: changes after a (change_seq, id) position
+        Index("ix_tasks_owner_change_seq_id", "owner_id", "change_seq", "id"),
+        # Never hand a deleted task's id to a new one: delta sync reports
+        # deletions by id. Postgres sequences already behave this way
+        {"sqlite_autoincrement": True},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
     day = Column(Date, nullable=False)
     is_completed = Column(Boolean, default=False)
 
+    # ORM updates run as UPDATE ... WHERE version = <loaded version>, so a
+    # concurrent change raises StaleDataError instead of being overwritten
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # The owner's tasks_version as of this task's last write
+    change_seq = Column(Integer, nullable=False, default=0, server_default="0")
+
     owner_id = Column(Integer, ForeignKey("users.id"))
-    owner = relationship("User", back_populates="tasks")
\ No newline at end of file
+    owner = relationship("User", back_populates="tasks")
+
+    __mapper_args__ = {"version_id_col": version}
+
+
+# Full-text index over titles, created and dropped with the table
+search.install(Task.__table__)
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Date, Integer
+from app.database.base import Base
+
+class TaskDayStats(Base):
+    """How many of an owner's tasks fall on a day, and how many are completed.
+
+    Maintained by the task write paths in crud_task, in the same transaction
+    as the change; app.workers.task_stats rebuilds it from tasks.
+    """
+    __tablename__ = "task_day_stats"
+
+    owner_id = Column(Integer, primary_key=True)
+    day = Column(Date, primary_key=True)
+    total = Column(Integer, nullable=False, default=0)
+    completed = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,21 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Index, Integer
+from app.database.base import Base
+
+class TaskTombstone(Base):
+    """A deleted task, kept so delta sync (GET /tasks/changes) can report it.
+
+    Old rows are removed by app.workers.tombstone_compaction.
+    """
+    __tablename__ = "task_tombstones"
+    __table_args__ = (
+        Index("ix_task_tombstones_owner_seq_task", "owner_id", "change_seq", "task_id"),
+        Index("ix_task_tombstones_deleted_at", "deleted_at"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    owner_id = Column(Integer, nullable=False)
+    task_id = Column(Integer, nullable=False)
+    change_seq = Column(Integer, nullable=False)
+    deleted_at = Column(DateTime, nullable=False, default=datetime.utcnow)
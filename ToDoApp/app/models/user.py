@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, DateTime, Integer, String
 from sqlalchemy.orm import relationship
 from app.database.base import Base
 
@@ -9,4 +9,11 @@ class User(Base):
     email = Column(String, unique=True, index=True, nullable=False)
     hashed_password = Column(String, nullable=False)
 
-    tasks = relationship("Task", back_populates="owner")
\ No newline at end of file
+    # Bumped by every write to this user's tasks; the task list ETag is built from it
+    tasks_version = Column(Integer, nullable=False, default=0, server_default="0")
+    tasks_updated_at = Column(DateTime, nullable=True)
+    # Highest change sequence whose tombstones were compacted away; delta sync
+    # cursors older than this can no longer be served
+    tombstones_purged_seq = Column(Integer, nullable=False, default=0, server_default="0")
+
+    tasks = relationship("Task", back_populates="owner")
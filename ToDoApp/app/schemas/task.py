@@ -1,6 +1,8 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, conlist
 from datetime import date
-from typing import Optional
+from typing import List, Optional
+
+from app.core.config import settings
 
 class TaskBase(BaseModel):
     title: str
@@ -19,4 +21,42 @@ class TaskOut(TaskBase):
     is_completed: bool
 
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+
+class TaskBulkCreate(BaseModel):
+    tasks: conlist(TaskCreate, min_items=1, max_items=settings.TASKS_BULK_MAX_ITEMS)
+
+class TaskBulkUpdateItem(TaskUpdate):
+    id: int
+
+class TaskBulkUpdate(BaseModel):
+    tasks: conlist(TaskBulkUpdateItem, min_items=1, max_items=settings.TASKS_BULK_MAX_ITEMS)
+
+class TaskBulkIds(BaseModel):
+    ids: conlist(int, min_items=1, max_items=settings.TASKS_BULK_MAX_ITEMS)
+
+class TaskBulkComplete(TaskBulkIds):
+    is_completed: bool = True
+
+class TaskBulkResult(BaseModel):
+    count: int
+
+class TaskChanges(BaseModel):
+    """One page of a delta sync: upserts, deletions and where to resume"""
+    changes: List[TaskOut]
+    deleted: List[int]
+    cursor: str
+    has_more: bool
+
+class TaskStatsDay(BaseModel):
+    day: date
+    total: int
+    completed: int
+
+class TaskStats(BaseModel):
+    """Task counts over a day range; overdue counts open tasks before today"""
+    total: int
+    completed: int
+    overdue: int
+    completion_rate: float
+    days: List[TaskStatsDay]
@@ -0,0 +1,74 @@
+# ToDoApp/app/utils/conditional.py
+"""ETag / Last-Modified helpers for conditional GETs and If-Match updates"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from starlette.requests import Request
+
+
+def task_etag(version: int) -> str:
+    return f'"{version}"'
+
+
+def collection_etag(version: int, request: Request) -> str:
+    """Tag a listing by collection version and the query that shaped it"""
+    query = "&".join(sorted(f"{k}={v}" for k, v in request.query_params.multi_items()))
+    digest = hashlib.sha1(query.encode("utf-8")).hexdigest()[:16]
+    return f'"{version}-{digest}"'
+
+
+def http_date(value: datetime) -> str:
+    """Format a naive UTC datetime as an HTTP-date"""
+    return format_datetime(value.replace(tzinfo=timezone.utc, microsecond=0), usegmt=True)
+
+
+def _etags(header: str) -> list[str]:
+    return [tag.strip() for tag in header.split(",") if tag.strip()]
+
+
+def _opaque(tag: str) -> str:
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    """RFC 7232 section 6: If-None-Match wins over If-Modified-Since"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = _etags(if_none_match)
+        # Weak comparison
+        return "*" in tags or _opaque(etag) in {_opaque(tag) for tag in tags}
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is not None and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return last_modified.replace(tzinfo=timezone.utc, microsecond=0) <= since
+    return False
+
+
+def is_precondition_failed(request: Request, etag: str) -> bool:
+    """True if an If-Match header is present and does not match etag"""
+    if_match = request.headers.get("if-match")
+    if if_match is None:
+        return False
+    tags = _etags(if_match)
+    # Strong comparison: weak tags never match
+    return "*" not in tags and etag not in tags
+
+
+def is_conditional(request: Request) -> bool:
+    return "if-none-match" in request.headers or "if-modified-since" in request.headers
+
+
+def validator_headers(etag: str, last_modified: Optional[datetime]) -> dict:
+    # private, no-cache: clients may store the response but must revalidate it
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
@@ -1,7 +1,16 @@
 # ToDoApp/app/utils/notification_client.py
 import requests
 import os
+import time
+from typing import Dict, List
+from requests.adapters import HTTPAdapter
+from app.core.config import settings
 from app.core.consul_client import ConsulClient
+from app.core.metrics import NOTIFICATION_SEND_SECONDS
+
+
+class NotificationRejected(Exception):
+    """The notification service refused the request itself (a 4xx); retrying it will not help"""
 
 
 class NotificationClient:
@@ -17,6 +26,15 @@ class NotificationClient:
         )
         self.ca_cert = os.path.join(self.cert_path, "ca.crt")
 
+        # Keep-alive session, so the mTLS handshake is paid once per connection
+        # instead of once per notification
+        self.session = requests.Session()
+        self.session.cert = self.client_cert
+        self.session.verify = self.ca_cert
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=settings.NOTIFICATION_HTTP_POOL_SIZE)
+        self.session.mount("https://", adapter)
+        self.timeout = settings.NOTIFICATION_TIMEOUT_SECONDS
+
     def get_service_url(self):
         """Get the URL of the notification service"""
         # Use the sidecar address instead of direct service
@@ -30,18 +48,47 @@ class NotificationClient:
 
     def send_notification(self, user_id: int, message: str):
         """Send a notification to a user using mTLS"""
+        started = time.perf_counter()
         try:
             url = f"{self.get_service_url()}/api/notifications"
 
             # Use mTLS with client certificate and CA certificate
-            response = requests.post(
+            response = self.session.post(
                 url,
                 json={"user_id": user_id, "message": message},
-                cert=self.client_cert,
-                verify=self.ca_cert
+                timeout=self.timeout
             )
 
-            return response.json()
+            result = response.json()
         except Exception as e:
             print(f"Failed to send notification: {e}")
-            return None
\ No newline at end of file
+            NOTIFICATION_SEND_SECONDS.labels("single", "error").observe(time.perf_counter() - started)
+            return None
+        NOTIFICATION_SEND_SECONDS.labels("single", "ok").observe(time.perf_counter() - started)
+        return result
+
+    def send_batch(self, notifications: List[Dict]):
+        """Send several notifications in one mTLS request, raising on failure.
+
+        Raises NotificationRejected when the service refuses the batch, and
+        requests' exceptions when it cannot be reached or fails (5xx).
+        """
+        started = time.perf_counter()
+        result = "error"
+        try:
+            url = f"{self.get_service_url()}/api/notifications/batch"
+            response = self.session.post(
+                url,
+                json={"notifications": notifications},
+                timeout=self.timeout
+            )
+            if 400 <= response.status_code < 500:
+                raise NotificationRejected(f"{response.status_code} {response.text[:200]}")
+            response.raise_for_status()
+            result = "ok"
+            return response.json()
+        finally:
+            NOTIFICATION_SEND_SECONDS.labels("batch", result).observe(time.perf_counter() - started)
+
+    def close(self):
+        self.session.close()
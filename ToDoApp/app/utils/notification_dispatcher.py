@@ -0,0 +1,135 @@
+# ToDoApp/app/utils/notification_dispatcher.py
+import queue
+import threading
+import time
+from typing import Optional
+
+from app.core.config import settings
+from app.core.metrics import (
+    NOTIFICATION_DELIVERY_LAG,
+    NOTIFICATION_QUEUE_DEPTH,
+    NOTIFICATIONS_DROPPED,
+)
+
+
+class NotificationDispatcher:
+    """Delivers notifications from a bounded in-process queue in batches.
+
+    Request handlers only enqueue, which never blocks; a background thread
+    groups queued notifications into batches and sends them through the
+    NotificationClient, retrying failed batches with exponential backoff.
+    When the queue is full new notifications are dropped and counted.
+    """
+
+    def __init__(
+        self,
+        client,
+        max_queue: int = None,
+        batch_size: int = None,
+        linger_seconds: float = None,
+        max_retries: int = None,
+        backoff_seconds: float = None,
+    ):
+        self.client = client
+        self.queue = queue.Queue(maxsize=max_queue or settings.NOTIFICATION_QUEUE_SIZE)
+        self.batch_size = batch_size or settings.NOTIFICATION_BATCH_SIZE
+        self.linger_seconds = (
+            settings.NOTIFICATION_BATCH_LINGER_SECONDS if linger_seconds is None else linger_seconds
+        )
+        self.max_retries = settings.NOTIFICATION_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff_seconds = (
+            settings.NOTIFICATION_RETRY_BACKOFF_SECONDS if backoff_seconds is None else backoff_seconds
+        )
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def start(self):
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopped.clear()
+                self._thread = threading.Thread(
+                    target=self._run, name="notification-dispatcher", daemon=True
+                )
+                self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the worker after it flushes what is already queued, waiting up to timeout.
+
+        If a send fails while stopping, the rest of the queue is dropped
+        rather than retried.
+        """
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def enqueue(self, user_id: int, message: str) -> bool:
+        """Queue a notification without blocking; returns False if it was dropped"""
+        try:
+            self.queue.put_nowait((time.time(), {"user_id": user_id, "message": message}))
+        except queue.Full:
+            NOTIFICATIONS_DROPPED.labels("queue_full").inc()
+            return False
+        NOTIFICATION_QUEUE_DEPTH.set(self.queue.qsize())
+        return True
+
+    def _next_batch(self) -> list:
+        try:
+            batch = [self.queue.get(timeout=0.5)]
+        except queue.Empty:
+            return []
+        # Linger briefly so bursts share one request
+        deadline = time.monotonic() + self.linger_seconds
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self.queue.get(timeout=remaining) if remaining > 0 else self.queue.get_nowait())
+            except queue.Empty:
+                break
+        NOTIFICATION_QUEUE_DEPTH.set(self.queue.qsize())
+        return batch
+
+    def _run(self):
+        while not (self._stopped.is_set() and self.queue.empty()):
+            batch = self._next_batch()
+            if batch and not self._deliver(batch) and self._stopped.is_set():
+                self._drop_queued()
+
+    def _deliver(self, batch: list) -> bool:
+        """Send a batch, retrying with backoff; returns False if it was dropped.
+
+        Once stop() is called the backoff is cut short for one final attempt.
+        """
+        notifications = [notification for _, notification in batch]
+        attempt, final = 0, False
+        while True:
+            try:
+                self.client.send_batch(notifications)
+            except Exception as e:
+                print(f"Failed to send {len(batch)} notifications (attempt {attempt + 1}): {e}")
+            else:
+                delivered_at = time.time()
+                for enqueued_at, _ in batch:
+                    NOTIFICATION_DELIVERY_LAG.observe(delivered_at - enqueued_at)
+                return True
+            if attempt >= self.max_retries or final:
+                break
+            # True as soon as stop() is called, making the next try the last
+            final = self._stopped.wait(self.backoff_seconds * 2 ** attempt)
+            attempt += 1
+        NOTIFICATIONS_DROPPED.labels("send_failed").inc(len(batch))
+        return False
+
+    def _drop_queued(self):
+        """Shutting down with the service failing: give up on the rest of the queue"""
+        dropped = 0
+        while True:
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                break
+            dropped += 1
+        if dropped:
+            print(f"Dropped {dropped} queued notifications on shutdown")
+            NOTIFICATIONS_DROPPED.labels("shutdown").inc(dropped)
+        NOTIFICATION_QUEUE_DEPTH.set(0)
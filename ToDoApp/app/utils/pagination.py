@@ -0,0 +1,66 @@
+# ToDoApp/app/utils/pagination.py
+import base64
+from datetime import date
+from typing import Tuple
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(day: date, task_id: int) -> str:
+    """Encode a (day, id) keyset position as an opaque cursor"""
+    raw = f"{day.isoformat()}:{task_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[date, int]:
+    """Decode a cursor produced by encode_cursor back into (day, id)"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8")
+        day, task_id = raw.split(":", 1)
+        return date.fromisoformat(day), int(task_id)
+    except (ValueError, UnicodeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor}") from e
+
+
+def encode_change_cursor(change_seq: int, task_id: int) -> str:
+    """Encode a (change_seq, id) delta sync position as an opaque cursor"""
+    raw = f"c{change_seq}:{task_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_change_cursor(cursor: str) -> Tuple[int, int]:
+    """Decode a cursor produced by encode_change_cursor back into (change_seq, id)"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8")
+        if not raw.startswith("c"):
+            raise ValueError(raw)
+        change_seq, task_id = raw[1:].split(":", 1)
+        return int(change_seq), int(task_id)
+    except (ValueError, UnicodeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor}") from e
+
+
+def encode_search_cursor(max_id: int, offset: int) -> str:
+    """Encode a search results position (snapshot id, offset) as an opaque cursor"""
+    raw = f"s{max_id}:{offset}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_search_cursor(cursor: str) -> Tuple[int, int]:
+    """Decode a cursor produced by encode_search_cursor back into (max_id, offset)"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8")
+        if not raw.startswith("s"):
+            raise ValueError(raw)
+        max_id, offset = raw[1:].split(":", 1)
+        max_id, offset = int(max_id), int(offset)
+        if offset < 0:
+            raise ValueError(raw)
+        return max_id, offset
+    except (ValueError, UnicodeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor}") from e
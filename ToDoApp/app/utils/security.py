@@ -1,9 +1,32 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
 from passlib.context import CryptContext
 from jose import jwt
 from datetime import datetime, timedelta
 from app.core.config import settings
+from app.core.metrics import PASSWORD_HASH_QUEUE_DEPTH, PASSWORD_HASH_SECONDS
+
+# Pinning the rounds makes needs_update() flag hashes made with any other cost
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS,
+)
+
+_hash_pool: Optional[ProcessPoolExecutor] = None
+_hash_pool_lock = threading.Lock()
+_hash_jobs = 0
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing pool already has PASSWORD_HASH_MAX_QUEUE jobs"""
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
@@ -11,6 +34,54 @@ def get_password_hash(password: str) -> str:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Whether a stored hash was made with settings other than the current ones"""
+    return pwd_context.needs_update(hashed_password)
+
+def _get_hash_pool() -> ProcessPoolExecutor:
+    global _hash_pool
+    with _hash_pool_lock:
+        if _hash_pool is None:
+            # spawn avoids forking a process that already runs the event loop
+            # and database driver threads
+            _hash_pool = ProcessPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_WORKERS or os.cpu_count(),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _hash_pool
+
+async def _run_in_hash_pool(operation: str, fn, *args):
+    global _hash_jobs
+    with _hash_pool_lock:
+        if _hash_jobs >= settings.PASSWORD_HASH_MAX_QUEUE:
+            raise PasswordHasherBusy()
+        _hash_jobs += 1
+    PASSWORD_HASH_QUEUE_DEPTH.inc()
+    started = time.perf_counter()
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_hash_pool(), fn, *args)
+    finally:
+        with _hash_pool_lock:
+            _hash_jobs -= 1
+        PASSWORD_HASH_QUEUE_DEPTH.dec()
+        PASSWORD_HASH_SECONDS.labels(operation).observe(time.perf_counter() - started)
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password in the process pool, keeping bcrypt off the event loop"""
+    return await _run_in_hash_pool("hash", get_password_hash, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password in the process pool, keeping bcrypt off the event loop"""
+    return await _run_in_hash_pool("verify", verify_password, plain_password, hashed_password)
+
+def shutdown_hash_pool():
+    global _hash_pool
+    with _hash_pool_lock:
+        if _hash_pool is not None:
+            _hash_pool.shutdown(wait=False, cancel_futures=True)
+            _hash_pool = None
+
 def create_access_token(data: dict, expires_delta: int = None):
     to_encode = data.copy()
     if expires_delta:
@@ -23,4 +94,4 @@ def create_access_token(data: dict, expires_delta: int = None):
         settings.SECRET_KEY,
         algorithm=settings.ALGORITHM
     )
-    return encoded_jwt
\ No newline at end of file
+    return encoded_jwt
@@ -0,0 +1,129 @@
+# ToDoApp/app/workers/outbox_relay.py
+"""Relay worker that drains the notification outbox.
+
+Run it next to the API (one or more instances):
+
+    python -m app.workers.outbox_relay
+"""
+import signal
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.consul_client import ConsulClient
+from app.crud import crud_outbox
+from app.database.session import SessionLocal
+from app.utils.notification_client import NotificationClient, NotificationRejected
+
+
+def _payload(row) -> dict:
+    return {"user_id": row.user_id, "message": row.message}
+
+
+def relay_batch(db: Session, client, batch_size: int) -> int:
+    """Send one batch of pending notifications and mark it delivered.
+
+    Returns the number of rows delivered. If the service rejects the batch
+    its rows are retried one at a time, so a single bad row cannot hold back
+    the rows behind it; see _relay_rows. Only a rejection counts as a failed
+    attempt: when the service is unreachable or erroring, the rows are left
+    as they were and the error is re-raised for the caller to back off.
+    """
+    rows = crud_outbox.get_pending(db, batch_size)
+    if not rows:
+        db.rollback()
+        return 0
+    try:
+        client.send_batch([_payload(row) for row in rows])
+    except NotificationRejected as e:
+        if len(rows) > 1:
+            return _relay_rows(db, client, rows)
+        print(f"Notification {rows[0].id} rejected: {e}")
+        db.rollback()
+        crud_outbox.mark_failed(db, [rows[0].id], settings.OUTBOX_MAX_ATTEMPTS)
+        return 0
+    except Exception:
+        db.rollback()
+        raise
+    crud_outbox.mark_delivered(db, [row.id for row in rows])
+    return len(rows)
+
+
+def _relay_rows(db: Session, client, rows) -> int:
+    """Send rows one by one, bumping attempts on each row that is rejected.
+
+    Any other error means the service is down rather than the row being bad,
+    so the remaining rows are left untouched and the error is re-raised.
+    """
+    delivered, rejected = [], []
+    error = None
+    for row in rows:
+        try:
+            client.send_batch([_payload(row)])
+        except NotificationRejected as e:
+            print(f"Notification {row.id} rejected: {e}")
+            rejected.append(row.id)
+            continue
+        except Exception as e:
+            error = e
+            break
+        delivered.append(row.id)
+
+    if delivered:
+        crud_outbox.mark_delivered(db, delivered)
+    else:
+        db.rollback()
+    if rejected:
+        crud_outbox.mark_failed(db, rejected, settings.OUTBOX_MAX_ATTEMPTS)
+    if error is not None:
+        raise error
+    return len(delivered)
+
+
+def run(client, stop: threading.Event, session_factory=SessionLocal):
+    """Relay until stop is set, backing off while delivery keeps failing"""
+    failures = 0
+    next_purge = 0.0
+    while not stop.is_set():
+        delivered = 0
+        with session_factory() as db:
+            try:
+                delivered = relay_batch(db, client, settings.OUTBOX_BATCH_SIZE)
+                failures = 0
+            except Exception as e:
+                failures += 1
+                print(f"Outbox relay failed to deliver a batch: {e}")
+
+            if time.monotonic() >= next_purge:
+                cutoff = datetime.utcnow() - timedelta(hours=settings.OUTBOX_RETENTION_HOURS)
+                crud_outbox.purge_delivered(db, cutoff)
+                next_purge = time.monotonic() + 60
+
+        if failures:
+            stop.wait(min(settings.NOTIFICATION_RETRY_BACKOFF_SECONDS * 2 ** failures, 60))
+        elif delivered < settings.OUTBOX_BATCH_SIZE:
+            # Drained; poll again shortly. Full batches loop immediately.
+            stop.wait(settings.OUTBOX_POLL_INTERVAL_SECONDS)
+
+
+def main():
+    stop = threading.Event()
+    signal.signal(signal.SIGINT, lambda sig, frame: stop.set())
+    signal.signal(signal.SIGTERM, lambda sig, frame: stop.set())
+
+    consul_client = ConsulClient()
+    client = NotificationClient(consul_client)
+    print("Outbox relay started")
+    try:
+        run(client, stop)
+    finally:
+        client.close()
+        consul_client.close()
+    print("Outbox relay stopped")
+
+
+if __name__ == "__main__":
+    main()
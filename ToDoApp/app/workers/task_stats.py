@@ -0,0 +1,30 @@
+# ToDoApp/app/workers/task_stats.py
+"""Rebuild the per-day task counts behind GET /tasks/stats from the tasks table.
+
+The counts are kept up to date by every task write; run this to repair
+drift, e.g. after tasks were changed outside the application.
+
+    python -m app.workers.task_stats                # every owner
+    python -m app.workers.task_stats --owner-id 42  # one owner
+"""
+import argparse
+
+from app.crud import crud_task_stats
+from app.database.session import SessionLocal
+
+
+def rebuild(owner_id: int = None, session_factory=SessionLocal) -> int:
+    """Recompute the counts; returns the number of (owner, day) rows written"""
+    with session_factory() as db:
+        return crud_task_stats.rebuild(db, owner_id)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--owner-id", type=int, help="only rebuild this owner's counts")
+    args = parser.parse_args()
+    print(f"Rebuilt {rebuild(args.owner_id)} task stats rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+# ToDoApp/app/workers/tombstone_compaction.py
+"""Compaction worker that removes old task tombstones.
+
+Tombstones let GET /tasks/changes report deletions; once one is older than
+TOMBSTONE_RETENTION_DAYS, delta sync cursors from before it get 410 Gone.
+
+    python -m app.workers.tombstone_compaction          # run periodically
+    python -m app.workers.tombstone_compaction --once   # e.g. from cron
+"""
+import argparse
+import signal
+import threading
+from datetime import datetime, timedelta
+
+from app.core.config import settings
+from app.crud import crud_task
+from app.database.session import SessionLocal
+
+
+def compact(session_factory=SessionLocal) -> int:
+    """Purge tombstones past the retention window; returns rows removed"""
+    cutoff = datetime.utcnow() - timedelta(days=settings.TOMBSTONE_RETENTION_DAYS)
+    with session_factory() as db:
+        return crud_task.purge_tombstones(db, cutoff)
+
+
+def run(stop: threading.Event, session_factory=SessionLocal):
+    """Compact every TOMBSTONE_COMPACTION_INTERVAL_SECONDS until stop is set"""
+    while not stop.is_set():
+        try:
+            removed = compact(session_factory)
+            if removed:
+                print(f"Removed {removed} task tombstones")
+        except Exception as e:
+            print(f"Tombstone compaction failed: {e}")
+        stop.wait(settings.TOMBSTONE_COMPACTION_INTERVAL_SECONDS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--once", action="store_true", help="compact once and exit")
+    args = parser.parse_args()
+
+    if args.once:
+        print(f"Removed {compact()} task tombstones")
+        return
+
+    stop = threading.Event()
+    signal.signal(signal.SIGINT, lambda sig, frame: stop.set())
+    signal.signal(signal.SIGTERM, lambda sig, frame: stop.set())
+    print("Tombstone compaction started")
+    run(stop)
+    print("Tombstone compaction stopped")
+
+
+if __name__ == "__main__":
+    main()
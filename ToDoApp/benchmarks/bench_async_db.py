@@ -0,0 +1,124 @@
+# ToDoApp/benchmarks/bench_async_db.py
+"""Compare throughput and tail latency of the sync and async database paths.
+
+Both paths serve the same task listing query against a local SQLite file,
+the sync one from a threadpool-bound ``def`` handler using SessionLocal-style
+sessions, the async one from an ``async def`` handler on aiosqlite.
+
+Run from the ToDoApp directory:
+
+    PYTHONPATH=. python benchmarks/bench_async_db.py --requests 2000 --concurrency 64
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("DATABASE_URL", "sqlite:///./benchmark.db")
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.crud import crud_task, crud_task_async
+from app.database.base import Base
+from app.models.task import Task
+from app.models.user import User
+
+
+def build_app(path: str):
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    SyncSession = sessionmaker(bind=engine, autoflush=False)
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    AsyncSessionMaker = sessionmaker(
+        bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+    )
+
+    def get_sync_db():
+        db = SyncSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def get_async_db():
+        async with AsyncSessionMaker() as db:
+            yield db
+
+    app = FastAPI()
+
+    @app.get("/sync/tasks")
+    def list_sync(db: Session = Depends(get_sync_db)):
+        return [t.id for t in crud_task.get_tasks_by_owner(db, 1, limit=50)]
+
+    @app.get("/async/tasks")
+    async def list_async(db: AsyncSession = Depends(get_async_db)):
+        return [t.id for t in await crud_task_async.get_tasks_by_owner(db, 1, limit=50)]
+
+    return app, engine
+
+
+def seed(engine, tasks: int):
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as db:
+        db.add(User(id=1, email="bench@example.com", hashed_password="x"))
+        start = date(2025, 1, 1)
+        db.bulk_save_objects(
+            Task(title=f"Task {i}", day=start + timedelta(days=i % 365), owner_id=1)
+            for i in range(tasks)
+        )
+        db.commit()
+
+
+async def run(app: FastAPI, url: str, requests: int, concurrency: int):
+    latencies = []
+    remaining = iter(range(requests))
+
+    async with httpx.AsyncClient(app=app, base_url="http://bench") as client:
+        async def worker():
+            for _ in remaining:
+                started = time.perf_counter()
+                response = await client.get(url)
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "rps": requests / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--tasks", type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app, engine = build_app(os.path.join(tmp, "bench.db"))
+        seed(engine, args.tasks)
+
+        for name, url in (("sync", "/sync/tasks"), ("async", "/async/tasks")):
+            # Warm up pools and caches before measuring
+            asyncio.run(run(app, url, 100, args.concurrency))
+            result = asyncio.run(run(app, url, args.requests, args.concurrency))
+            print(
+                f"{name:>5}: {result['rps']:8.1f} req/s  "
+                f"p50 {result['p50_ms']:7.2f} ms  p99 {result['p99_ms']:7.2f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# ToDoApp/benchmarks/bench_auth_queries.py
+"""Count SQL statements per GET /tasks request for each authentication mode.
+
+    uncached       - principal cache disabled, one user lookup per request
+    cached         - principal cache enabled (the default)
+    trust-claims   - AUTH_TRUST_TOKEN_CLAIMS on, no user lookup at all
+
+Run from the ToDoApp directory:
+
+    PYTHONPATH=. python benchmarks/bench_auth_queries.py --requests 500
+"""
+import argparse
+import os
+import tempfile
+import time
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("DATABASE_URL", "sqlite:///./benchmark.db")
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.auth_cache import principal_cache
+from app.core.config import settings
+from app.database.base import Base
+from app.dependencies import get_async_db
+from app.main import app
+from app.models.user import User
+from app.utils.security import create_access_token
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        sync_engine = create_engine(f"sqlite:///{path}")
+        Base.metadata.create_all(bind=sync_engine)
+        with Session(sync_engine) as db:
+            db.add(User(id=1, email="bench@example.com", hashed_password="x"))
+            db.commit()
+
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        SessionMaker = sessionmaker(
+            bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+        )
+
+        async def override_get_async_db():
+            async with SessionMaker() as db:
+                yield db
+
+        app.dependency_overrides[get_async_db] = override_get_async_db
+
+        statements = 0
+
+        @event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+        def count(conn, cursor, statement, parameters, context, executemany):
+            nonlocal statements
+            statements += 1
+
+        headers = {"Authorization": f"Bearer {create_access_token(data={'sub': '1'})}"}
+        modes = (
+            ("uncached", 0, False),
+            ("cached", settings.AUTH_CACHE_MAX_SIZE, False),
+            ("trust-claims", settings.AUTH_CACHE_MAX_SIZE, True),
+        )
+        with TestClient(app) as client:
+            for name, max_size, trust_claims in modes:
+                principal_cache.clear()
+                principal_cache.backend.max_size = max_size
+                settings.AUTH_TRUST_TOKEN_CLAIMS = trust_claims
+
+                statements = 0
+                started = time.perf_counter()
+                for _ in range(args.requests):
+                    client.get("/tasks/", headers=headers).raise_for_status()
+                elapsed = time.perf_counter() - started
+                print(
+                    f"{name:>12}: {statements / args.requests:.2f} queries/request  "
+                    f"{args.requests / elapsed:8.1f} req/s"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# ToDoApp/benchmarks/bench_bulk_import.py
+"""Compare importing N tasks one at a time with the bulk create path.
+
+The per-item path is what clients do today (one create_task, i.e. one
+commit + refresh + outbox row, per task); the bulk path is
+create_tasks_bulk. Both run against a temporary SQLite file, or
+--database-url for Postgres.
+
+Run from the ToDoApp directory:
+
+    PYTHONPATH=. python benchmarks/bench_bulk_import.py --items 10000
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("DATABASE_URL", "sqlite:///./benchmark.db")
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.crud import crud_task
+from app.database.base import Base
+from app.models.user import User
+from app.schemas.task import TaskCreate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=10000)
+    parser.add_argument("--database-url")
+    args = parser.parse_args()
+
+    start = date(2025, 1, 1)
+    tasks_in = [
+        TaskCreate(title=f"Imported {i}", day=start + timedelta(days=i % 365))
+        for i in range(args.items)
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(args.database_url or f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        SessionMaker = sessionmaker(bind=engine, autoflush=False)
+        with SessionMaker() as db:
+            db.add_all([User(email=f"bench{i}@example.com", hashed_password="x") for i in range(2)])
+            db.commit()
+            per_item_owner, bulk_owner = [user.id for user in db.query(User).order_by(User.id)][-2:]
+
+        with SessionMaker() as db:
+            started = time.perf_counter()
+            for task_in in tasks_in:
+                crud_task.create_task(db, task_in, per_item_owner)
+            per_item = time.perf_counter() - started
+
+        with SessionMaker() as db:
+            started = time.perf_counter()
+            crud_task.create_tasks_bulk(db, tasks_in, bulk_owner)
+            bulk = time.perf_counter() - started
+
+    print(f"per-item: {per_item:8.2f} s  ({args.items / per_item:10.1f} tasks/s)")
+    print(f"    bulk: {bulk:8.2f} s  ({args.items / bulk:10.1f} tasks/s)")
+    print(f" speedup: {per_item / bulk:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+# ToDoApp/benchmarks/bench_idle_connections.py
+"""How many idle /tasks/stream (SSE) connections one API worker can hold.
+
+Starts a single uvicorn worker on a fresh SQLite database, opens N SSE
+connections for one user, then reports the worker's resident memory per
+connection and how long one task change takes to reach all of them.
+
+Run from the ToDoApp directory (raise `ulimit -n` for large N):
+
+    PYTHONPATH=. python benchmarks/bench_idle_connections.py --connections 2000
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def rss_kib(pid: int) -> int:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+
+async def open_stream(port: int, token: str):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(
+        f"GET /tasks/stream HTTP/1.1\r\nHost: bench\r\nAuthorization: Bearer {token}\r\n"
+        "Accept: text/event-stream\r\n\r\n".encode()
+    )
+    await writer.drain()
+    # Headers, then the ": connected" comment
+    await reader.readuntil(b"\r\n\r\n")
+    await reader.readuntil(b"connected")
+    return reader, writer
+
+
+async def wait_for_event(reader) -> float:
+    await reader.readuntil(b"event: created")
+    return time.perf_counter()
+
+
+async def run(port: int, token: str, connections: int, batch: int):
+    streams = []
+    for start in range(0, connections, batch):
+        streams.extend(await asyncio.gather(
+            *(open_stream(port, token) for _ in range(min(batch, connections - start)))
+        ))
+    return streams
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--connections", type=int, default=1000)
+    parser.add_argument("--batch", type=int, default=100, help="connections opened concurrently")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        port = free_port()
+        env = dict(
+            os.environ,
+            SECRET_KEY=os.environ.get("SECRET_KEY", "benchmark"),
+            DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+            CONSUL_ENABLED="false",
+            BCRYPT_ROUNDS="4",
+            EVENTS_HEARTBEAT_SECONDS="60",
+            PYTHONPATH=os.getcwd(),
+        )
+        subprocess.run([sys.executable, "-m", "alembic", "upgrade", "head"], env=env, check=True, capture_output=True)
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+            env=env,
+        )
+        try:
+            base_url = f"http://127.0.0.1:{port}"
+            for _ in range(100):
+                try:
+                    httpx.get(f"{base_url}/health").raise_for_status()
+                    break
+                except httpx.TransportError:
+                    time.sleep(0.1)
+            credentials = {"email": "bench@example.com", "password": "password123"}
+            httpx.post(f"{base_url}/auth/signup", json=credentials).raise_for_status()
+            token = httpx.post(
+                f"{base_url}/auth/login", data={"username": credentials["email"], "password": credentials["password"]}
+            ).json()["access_token"]
+
+            baseline = rss_kib(server.pid)
+
+            async def scenario():
+                streams = await run(port, token, args.connections, args.batch)
+                held = rss_kib(server.pid)
+                waiters = [asyncio.ensure_future(wait_for_event(reader)) for reader, _ in streams]
+                started = time.perf_counter()
+                async with httpx.AsyncClient(base_url=base_url) as client:
+                    response = await client.post(
+                        "/tasks/",
+                        json={"title": "Fan out", "day": "2025-01-01"},
+                        headers={"Authorization": f"Bearer {token}"},
+                    )
+                    response.raise_for_status()
+                arrivals = await asyncio.gather(*waiters)
+                for _, writer in streams:
+                    writer.close()
+                return held, max(arrivals) - started
+
+            held, fan_out = asyncio.run(scenario())
+            print(f"connections: {args.connections}")
+            print(f"worker RSS: {baseline / 1024:.1f} MiB idle, {held / 1024:.1f} MiB holding streams")
+            print(f"per connection: {(held - baseline) / args.connections:.1f} KiB")
+            print(f"fan-out of one change to all streams: {fan_out * 1000:.1f} ms")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,367 @@
+# ToDoApp/benchmarks/bench_load.py
+"""Load-test the full request path with a scripted mix of operations.
+
+Seeds users and tasks into a fresh SQLite database, then runs a closed-loop
+mix of login, list, create, patch and delete requests either against the
+ASGI app in-process or through uvicorn with N workers, and reports
+throughput, latency percentiles and SQL queries per request as JSON.
+
+Consul and the notification service are never contacted: in-process runs
+replace their clients with local stubs, and uvicorn runs start with
+CONSUL_ENABLED=false and the notification outbox, whose relay is not started.
+
+Run from the ToDoApp directory:
+
+    PYTHONPATH=. python benchmarks/bench_load.py --users 1000 --tasks 1000
+    PYTHONPATH=. python benchmarks/bench_load.py --mode uvicorn --workers 4
+    PYTHONPATH=. python benchmarks/bench_load.py --baseline benchmarks/baselines/load-asgi.json
+
+A run fails (exit code 1) when a baseline is given and throughput, p99
+latency or queries per request regress by more than --max-regression.
+Save a baseline for the machine that will compare against it with
+--save-baseline.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("DATABASE_URL", "sqlite:///./benchmark.db")
+os.environ.setdefault("CONSUL_ENABLED", "false")
+
+import httpx
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core import clients
+from app.core.config import settings
+from app.core.query_budget import capture_requests
+from app.database.base import Base
+from app.dependencies import get_async_db
+from app.models.task import Task
+from app.models.user import User
+from app.utils.security import create_access_token, get_password_hash
+
+PASSWORD = "password123"
+OPERATIONS = ("login", "list", "create", "patch", "delete")
+DEFAULT_MIX = "list=50,create=15,patch=20,delete=10,login=5"
+SEED_CHUNK_SIZE = 10000
+
+
+class StubConsulClient:
+    def register_service(self, name: str, port: int, tags: list = None):
+        pass
+
+    def deregister_service(self):
+        pass
+
+    def get_service_address(self, service_name: str):
+        return "127.0.0.1:1"
+
+    def close(self):
+        pass
+
+
+class StubNotificationClient:
+    """Accepts every notification without any network round trip"""
+
+    def __init__(self):
+        self.sent = 0
+
+    def send_notification(self, user_id: int, message: str):
+        self.sent += 1
+        return {"status": "success"}
+
+    def send_batch(self, notifications):
+        self.sent += len(notifications)
+        return {"status": "success", "count": len(notifications)}
+
+    def close(self):
+        pass
+
+
+def parse_mix(mix: str) -> dict:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        if name not in OPERATIONS:
+            raise SystemExit(f"unknown operation {name!r}, expected one of {OPERATIONS}")
+        weights[name] = float(weight)
+    return weights
+
+
+def seed(path: str, users: int, tasks_per_user: int):
+    """Users 1..N, each owning task ids ((u - 1) * T, u * T]"""
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    hashed_password = get_password_hash(PASSWORD)
+    start = date(2025, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(User.__table__.insert(), [
+            {"id": u, "email": f"load{u}@example.com", "hashed_password": hashed_password}
+            for u in range(1, users + 1)
+        ])
+        rows = (
+            {
+                "id": (u - 1) * tasks_per_user + i + 1,
+                "title": f"Task {i}",
+                "day": start + timedelta(days=i % 365),
+                "owner_id": u,
+            }
+            for u in range(1, users + 1)
+            for i in range(tasks_per_user)
+        )
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) == SEED_CHUNK_SIZE:
+                conn.execute(Task.__table__.insert(), chunk)
+                chunk = []
+        if chunk:
+            conn.execute(Task.__table__.insert(), chunk)
+    engine.dispose()
+
+
+def percentile(samples, fraction):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))] if samples else None
+
+
+def summarize(latencies, elapsed) -> dict:
+    return {
+        "count": len(latencies),
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2) if latencies else None,
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2) if latencies else None,
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2) if latencies else None,
+    }
+
+
+async def run_load(client: httpx.AsyncClient, args, weights: dict) -> dict:
+    tokens = {}
+    created = defaultdict(list)
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    names, weight_values = list(weights), list(weights.values())
+    measuring = False
+
+    def headers(user_id):
+        if user_id not in tokens:
+            tokens[user_id] = {"Authorization": f"Bearer {create_access_token(data={'sub': str(user_id)})}"}
+        return tokens[user_id]
+
+    async def request(rng, operation):
+        user_id = rng.randint(1, args.users)
+        if operation == "delete" and not created[user_id]:
+            operation = "create"
+        if operation == "login":
+            send = client.post("/auth/login", data={"username": f"load{user_id}@example.com", "password": PASSWORD})
+        elif operation == "list":
+            send = client.get("/tasks/?limit=100", headers=headers(user_id))
+        elif operation == "create":
+            send = client.post("/tasks/", json={"title": "Load", "day": "2025-06-01"}, headers=headers(user_id))
+        elif operation == "patch":
+            task_id = (user_id - 1) * args.tasks + rng.randint(1, args.tasks)
+            send = client.patch(f"/tasks/{task_id}", json={"title": f"Load {rng.random()}"}, headers=headers(user_id))
+        else:
+            send = client.delete(f"/tasks/{created[user_id].pop()}", headers=headers(user_id))
+
+        started = time.perf_counter()
+        response = await send
+        elapsed = time.perf_counter() - started
+        if operation == "create" and response.status_code == 200:
+            created[user_id].append(response.json()["id"])
+        if measuring:
+            latencies[operation].append(elapsed)
+            if response.status_code >= 400:
+                errors[operation] += 1
+
+    async def worker(index, deadline):
+        rng = random.Random(args.seed + index)
+        while time.perf_counter() < deadline:
+            operation = rng.choices(names, weight_values)[0]
+            await request(rng, operation)
+
+    await asyncio.gather(*(worker(i, time.perf_counter() + args.warmup) for i in range(args.concurrency)))
+    measuring = True
+    started = time.perf_counter()
+    deadline = started + args.duration
+    await asyncio.gather(*(worker(args.concurrency + i, deadline) for i in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+
+    everything = [latency for samples in latencies.values() for latency in samples]
+    return {
+        **summarize(everything, elapsed),
+        "errors": sum(errors.values()),
+        "operations": {
+            name: {**summarize(latencies[name], elapsed), "errors": errors[name]}
+            for name in OPERATIONS if latencies[name]
+        },
+    }
+
+
+def run_asgi(path: str, args, weights: dict) -> dict:
+    from app.main import app
+
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    SessionMaker = sessionmaker(bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with SessionMaker() as db:
+            yield db
+
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    clients.get_consul_client = StubConsulClient
+    clients.get_notification_client = StubNotificationClient
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://load") as client:
+            with capture_requests() as requests:
+                report = await run_load(client, args, weights)
+        # Warmup requests are in here too; per-request averages are unaffected
+        queries = defaultdict(list)
+        for route, recorder in requests:
+            queries[route].append(recorder.count)
+        report["queries_per_request"] = round(
+            sum(map(sum, queries.values())) / max(1, sum(map(len, queries.values()))), 2
+        )
+        report["queries_by_route"] = {route: round(sum(c) / len(c), 2) for route, c in sorted(queries.items())}
+        return report
+
+    return asyncio.run(main())
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def run_uvicorn(path: str, args, weights: dict) -> dict:
+    port = free_port()
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{path}",
+        CONSUL_ENABLED="false",
+        NOTIFICATION_OUTBOX_ENABLED="true",
+        RATE_LIMIT_ENABLED=os.environ.get("RATE_LIMIT_ENABLED", "false"),
+        PYTHONPATH=os.getcwd(),
+    )
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--host", "127.0.0.1", "--port", str(port),
+            "--workers", str(args.workers), "--log-level", "warning", "--no-access-log",
+        ],
+        env=env,
+    )
+    try:
+        base_url = f"http://127.0.0.1:{port}"
+        for _ in range(300):
+            try:
+                httpx.get(f"{base_url}/health").raise_for_status()
+                break
+            except httpx.HTTPError:
+                time.sleep(0.1)
+        else:
+            raise SystemExit("uvicorn did not become healthy")
+
+        async def main():
+            limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+            async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+                return await run_load(client, args, weights)
+
+        # Each worker process counts its own queries, so none are reported here
+        return {**asyncio.run(main()), "queries_per_request": None}
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def regressions(report: dict, baseline: dict, threshold: float) -> list:
+    found = []
+    if report["rps"] < baseline["rps"] * (1 - threshold):
+        found.append(f"throughput {report['rps']} rps < baseline {baseline['rps']} rps")
+    if report["p99_ms"] > baseline["p99_ms"] * (1 + threshold):
+        found.append(f"p99 {report['p99_ms']} ms > baseline {baseline['p99_ms']} ms")
+    if report.get("queries_per_request") and baseline.get("queries_per_request"):
+        if report["queries_per_request"] > baseline["queries_per_request"] * (1 + threshold):
+            found.append(
+                f"{report['queries_per_request']} queries/request > "
+                f"baseline {baseline['queries_per_request']}"
+            )
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mode", choices=("asgi", "uvicorn"), default="asgi")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--tasks", type=int, default=100, help="tasks per user")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="operation=weight, comma separated")
+    parser.add_argument("--concurrency", type=int, default=20, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=10.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=2.0, help="unmeasured seconds first")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="also write the JSON report here")
+    parser.add_argument("--baseline", help="JSON report to compare against")
+    parser.add_argument("--save-baseline", help="write this run's report as the new baseline")
+    parser.add_argument("--max-regression", type=float, default=0.2,
+                        help="allowed relative regression against the baseline")
+    args = parser.parse_args()
+    weights = parse_mix(args.mix)
+
+    # Measure the app, not the in-app limits meant for real clients
+    settings.RATE_LIMIT_ENABLED = os.environ.get("RATE_LIMIT_ENABLED", "false").lower() == "true"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "load.db")
+        started = time.perf_counter()
+        seed(path, args.users, args.tasks)
+        seed_seconds = time.perf_counter() - started
+        results = (run_asgi if args.mode == "asgi" else run_uvicorn)(path, args, weights)
+
+    report = {
+        "mode": args.mode,
+        "workers": args.workers if args.mode == "uvicorn" else 1,
+        "users": args.users,
+        "tasks_per_user": args.tasks,
+        "mix": weights,
+        "concurrency": args.concurrency,
+        "duration_seconds": args.duration,
+        "seed_seconds": round(seed_seconds, 2),
+        **results,
+    }
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            f.write(output + "\n")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        found = regressions(report, baseline, args.max_regression)
+        for regression in found:
+            print(f"regression: {regression}", file=sys.stderr)
+        if found:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
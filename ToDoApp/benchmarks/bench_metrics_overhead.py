@@ -0,0 +1,79 @@
+# ToDoApp/benchmarks/bench_metrics_overhead.py
+"""Measure the per-request cost of MetricsMiddleware.
+
+Drives a trivial ASGI endpoint directly, with and without the middleware
+in front of it, so the difference is the middleware alone.
+
+Run from the ToDoApp directory:
+
+    PYTHONPATH=. python benchmarks/bench_metrics_overhead.py --max-overhead-us 50
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("DATABASE_URL", "sqlite:///./benchmark.db")
+
+from app.core.request_metrics import MetricsMiddleware
+from app.main import app, health
+
+START = {"type": "http.response.start", "status": 200, "headers": []}
+BODY = {"type": "http.response.body", "body": b"{}"}
+
+
+async def endpoint(scope, receive, send):
+    # What routing leaves behind for the middleware to label with
+    scope["endpoint"] = health
+    await send(START)
+    await send(BODY)
+
+
+async def receive():
+    return {"type": "http.request", "body": b""}
+
+
+async def send(message):
+    pass
+
+
+async def per_request_seconds(asgi_app, requests: int) -> float:
+    started = time.perf_counter()
+    for _ in range(requests):
+        scope = {"type": "http", "method": "GET", "path": "/health", "app": app}
+        await asgi_app(scope, receive, send)
+    return (time.perf_counter() - started) / requests
+
+
+async def measure(requests: int, rounds: int):
+    instrumented = MetricsMiddleware(endpoint)
+    await per_request_seconds(instrumented, 1000)  # warm the route and metric caches
+    # Best of several rounds, to keep scheduler noise out of a microbenchmark
+    bare = min([await per_request_seconds(endpoint, requests) for _ in range(rounds)])
+    metered = min([await per_request_seconds(instrumented, requests) for _ in range(rounds)])
+    return bare, metered
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=100000)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--max-overhead-us", type=float, default=None,
+                        help="exit non-zero if the middleware adds more than this per request")
+    args = parser.parse_args()
+
+    bare, metered = asyncio.run(measure(args.requests, args.rounds))
+    overhead_us = (metered - bare) * 1e6
+    print(f"    bare: {bare * 1e6:6.2f} us/request")
+    print(f" metered: {metered * 1e6:6.2f} us/request")
+    print(f"overhead: {overhead_us:6.2f} us/request")
+
+    if args.max_overhead_us is not None and overhead_us > args.max_overhead_us:
+        print(f"middleware overhead exceeds {args.max_overhead_us}us", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# ToDoApp/benchmarks/bench_outbox_relay.py
+"""Measure outbox relay throughput (rows delivered per second) per batch size.
+
+Delivery goes to an in-process stub, so the numbers isolate the database
+side: selecting pending rows and marking them delivered. Pass
+--database-url to run against Postgres instead of a temporary SQLite file.
+
+Run from the ToDoApp directory:
+
+    PYTHONPATH=. python benchmarks/bench_outbox_relay.py --rows 50000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("DATABASE_URL", "sqlite:///./benchmark.db")
+
+from sqlalchemy import create_engine, delete, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.database.base import Base
+from app.models.outbox import NotificationOutbox
+from app.workers.outbox_relay import relay_batch
+
+
+class StubNotificationClient:
+    def __init__(self):
+        self.sent = 0
+
+    def send_batch(self, notifications):
+        self.sent += len(notifications)
+
+
+def bench(url: str, rows: int, batch_size: int) -> float:
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    SessionMaker = sessionmaker(bind=engine, autoflush=False)
+
+    with engine.begin() as conn:
+        conn.execute(delete(NotificationOutbox))
+        conn.execute(
+            insert(NotificationOutbox),
+            [{"user_id": i % 1000, "message": f"Notification {i}"} for i in range(rows)],
+        )
+
+    client = StubNotificationClient()
+    started = time.perf_counter()
+    with SessionMaker() as db:
+        while relay_batch(db, client, batch_size):
+            pass
+    elapsed = time.perf_counter() - started
+    assert client.sent == rows
+    engine.dispose()
+    return rows / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--batch-sizes", default="1,50,500,2000")
+    parser.add_argument("--database-url")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.database_url or f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        for batch_size in (int(size) for size in args.batch_sizes.split(",")):
+            rate = bench(url, args.rows, batch_size)
+            print(f"batch {batch_size:>5}: {rate:10.1f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+# ToDoApp/benchmarks/bench_rate_limit.py
+"""Measure latency for well-behaved users while one user floods the API.
+
+Runs the app in-process over ASGI, once with the in-app limits disabled and
+once with them enabled, and reports latency percentiles for the polite users
+and what happened to the abusive user's requests.
+
+Run from the ToDoApp directory:
+
+    PYTHONPATH=. python benchmarks/bench_rate_limit.py --seconds 5
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from collections import Counter
+from datetime import date, timedelta
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("DATABASE_URL", "sqlite:///./benchmark.db")
+
+import httpx
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.clients import get_load_shedder, get_rate_limiter, get_task_cache
+from app.core.config import settings
+from app.database.base import Base
+from app.dependencies import get_async_db
+from app.main import app
+from app.models.task import Task
+from app.models.user import User
+from app.utils.security import create_access_token
+
+
+def percentile(samples, fraction):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+async def run(args, headers):
+    latencies = []
+    abuser_statuses = Counter()
+    deadline = time.perf_counter() + args.seconds
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def polite(user_headers):
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                response = await client.get("/tasks/?limit=100", headers=user_headers)
+                latencies.append(time.perf_counter() - started)
+                response.raise_for_status()
+                await asyncio.sleep(1 / args.polite_rate)
+
+        async def abusive_request():
+            response = await client.get("/tasks/?limit=1000", headers=headers[0])
+            abuser_statuses[response.status_code] += 1
+
+        async def abusive():
+            # Open loop: a fixed offered rate, however slowly the server answers
+            requests = []
+            while time.perf_counter() < deadline:
+                requests.append(asyncio.create_task(abusive_request()))
+                await asyncio.sleep(1 / args.abuser_rate)
+            await asyncio.gather(*requests)
+
+        await asyncio.gather(abusive(), *(polite(h) for h in headers[1:]))
+    return latencies, abuser_statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--users", type=int, default=10, help="well-behaved users")
+    parser.add_argument("--polite-rate", type=float, default=5.0, help="requests/second per polite user")
+    parser.add_argument("--abuser-rate", type=float, default=200.0, help="requests/second from the abuser")
+    parser.add_argument("--tasks", type=int, default=1000, help="tasks per user")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        sync_engine = create_engine(f"sqlite:///{path}")
+        Base.metadata.create_all(bind=sync_engine)
+        start = date(2025, 1, 1)
+        with Session(sync_engine) as db:
+            for user_id in range(1, args.users + 2):
+                db.add(User(id=user_id, email=f"bench{user_id}@example.com", hashed_password="x"))
+                db.add_all(
+                    Task(title=f"Task {i}", day=start + timedelta(days=i % 365), owner_id=user_id)
+                    for i in range(args.tasks)
+                )
+            db.commit()
+
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        SessionMaker = sessionmaker(
+            bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+        )
+
+        async def override_get_async_db():
+            async with SessionMaker() as db:
+                yield db
+
+        app.dependency_overrides[get_async_db] = override_get_async_db
+
+        # User 1 is the abuser; measure every response from the database
+        headers = [
+            {"Authorization": f"Bearer {create_access_token(data={'sub': str(user_id)})}"}
+            for user_id in range(1, args.users + 2)
+        ]
+        settings.AUTH_TRUST_TOKEN_CLAIMS = True
+        settings.TASK_CACHE_BACKEND = "none"
+        get_task_cache.cache_clear()
+
+        for enabled in (False, True):
+            settings.RATE_LIMIT_ENABLED = enabled
+            get_rate_limiter.cache_clear()
+            get_load_shedder.cache_clear()
+            latencies, abuser_statuses = asyncio.run(run(args, headers))
+            print(
+                f"limits {'on ' if enabled else 'off'}: polite p50 {percentile(latencies, 0.5) * 1000:7.1f} ms  "
+                f"p99 {percentile(latencies, 0.99) * 1000:7.1f} ms  ({len(latencies)} requests)  "
+                f"abuser {dict(sorted(abuser_statuses.items()))}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# ToDoApp/benchmarks/bench_sqlite_writes.py
+"""Concurrent write throughput on a file-backed SQLite database.
+
+"before" is the previous engine setup (default pooling, rollback journal,
+synchronous=FULL); "after" uses get_engine_options/configure_engine from
+app.database.session (WAL, synchronous=NORMAL, mmap, busy timeout, pooled
+connections). Each writer thread creates tasks one commit at a time while
+a reader thread keeps listing them.
+
+Run from the ToDoApp directory:
+
+    PYTHONPATH=. python benchmarks/bench_sqlite_writes.py --writers 8 --writes 300
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+from datetime import date
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("DATABASE_URL", "sqlite:///./benchmark.db")
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.crud import crud_task
+from app.database.base import Base
+from app.database.session import configure_engine, get_engine_options
+from app.models.user import User
+from app.schemas.task import TaskCreate
+
+
+def build_engine(url: str, tuned: bool):
+    if not tuned:
+        return create_engine(url, connect_args={"check_same_thread": False})
+    engine = create_engine(url, **get_engine_options(url))
+    configure_engine(engine, "bench")
+    return engine
+
+
+def bench(url: str, tuned: bool, writers: int, writes: int):
+    engine = build_engine(url, tuned)
+    Base.metadata.create_all(bind=engine)
+    SessionMaker = sessionmaker(bind=engine, autoflush=False)
+    with SessionMaker() as db:
+        user = User(email="bench@example.com", hashed_password="x")
+        db.add(user)
+        db.commit()
+        owner_id = user.id
+
+    errors = 0
+    lock = threading.Lock()
+    done = threading.Event()
+
+    def writer():
+        nonlocal errors
+        for i in range(writes):
+            with SessionMaker() as db:
+                try:
+                    crud_task.create_task(db, TaskCreate(title=f"Task {i}", day=date(2025, 1, 1)), owner_id)
+                except OperationalError:
+                    with lock:
+                        errors += 1
+
+    def reader():
+        while not done.is_set():
+            with SessionMaker() as db:
+                crud_task.get_tasks_by_owner(db, owner_id, limit=50)
+
+    reader_thread = threading.Thread(target=reader)
+    reader_thread.start()
+    threads = [threading.Thread(target=writer) for _ in range(writers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    done.set()
+    reader_thread.join()
+    engine.dispose()
+
+    committed = writers * writes - errors
+    return committed / elapsed, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--writes", type=int, default=300)
+    args = parser.parse_args()
+
+    for name, tuned in (("before", False), ("after", True)):
+        with tempfile.TemporaryDirectory() as tmp:
+            url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+            rate, errors = bench(url, tuned, args.writers, args.writes)
+        print(f"{name:>6}: {rate:8.1f} commits/s  {errors} failed with 'database is locked'")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# ToDoApp/benchmarks/bench_startup.py
+"""Measure cold import and startup time of the API for N concurrent workers.
+
+Each worker is a fresh interpreter that imports ``app.main`` and runs the
+lifespan startup/shutdown, the way a uvicorn or gunicorn worker boots.
+The database is migrated once beforehand, as `alembic upgrade head` would.
+
+Run from the ToDoApp directory:
+
+    PYTHONPATH=. python benchmarks/bench_startup.py --workers 4 --max-import-seconds 3
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+WORKER = """
+import json, time
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(app.main.app):
+    ready = time.perf_counter()
+print(json.dumps({"import": imported - started, "startup": ready - started}))
+"""
+
+
+def boot(env):
+    output = subprocess.run(
+        [sys.executable, "-c", WORKER], env=env, check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--max-import-seconds", type=float, default=None,
+                        help="exit non-zero if the slowest worker import exceeds this")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(
+            os.environ,
+            SECRET_KEY=os.environ.get("SECRET_KEY", "benchmark"),
+            DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+            CONSUL_ENABLED="false",
+            PYTHONPATH=os.getcwd(),
+        )
+        subprocess.run(
+            [sys.executable, "-m", "alembic", "upgrade", "head"],
+            env=env, check=True, capture_output=True,
+        )
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            results = list(pool.map(boot, [env] * args.workers))
+
+    slowest_import = max(r["import"] for r in results)
+    slowest_startup = max(r["startup"] for r in results)
+    print(f"workers: {args.workers}")
+    print(f" import: max {slowest_import * 1000:8.1f} ms")
+    print(f"startup: max {slowest_startup * 1000:8.1f} ms")
+
+    if args.max_import_seconds is not None and slowest_import > args.max_import_seconds:
+        print(f"import time exceeds {args.max_import_seconds}s", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
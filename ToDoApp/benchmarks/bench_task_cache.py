@@ -0,0 +1,89 @@
+# ToDoApp/benchmarks/bench_task_cache.py
+"""Compare task read throughput and SQL statements with and without the task cache.
+
+Run from the ToDoApp directory:
+
+    PYTHONPATH=. python benchmarks/bench_task_cache.py --requests 1000
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("DATABASE_URL", "sqlite:///./benchmark.db")
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.clients import get_task_cache
+from app.core.config import settings
+from app.database.base import Base
+from app.dependencies import get_async_db
+from app.main import app
+from app.models.task import Task
+from app.models.user import User
+from app.utils.security import create_access_token
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--tasks", type=int, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        sync_engine = create_engine(f"sqlite:///{path}")
+        Base.metadata.create_all(bind=sync_engine)
+        with Session(sync_engine) as db:
+            db.add(User(id=1, email="bench@example.com", hashed_password="x"))
+            start = date(2025, 1, 1)
+            db.add_all(
+                Task(id=i + 1, title=f"Task {i}", day=start + timedelta(days=i % 365), owner_id=1)
+                for i in range(args.tasks)
+            )
+            db.commit()
+
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        SessionMaker = sessionmaker(
+            bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+        )
+
+        async def override_get_async_db():
+            async with SessionMaker() as db:
+                yield db
+
+        app.dependency_overrides[get_async_db] = override_get_async_db
+
+        statements = 0
+
+        @event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+        def count(conn, cursor, statement, parameters, context, executemany):
+            nonlocal statements
+            statements += 1
+
+        headers = {"Authorization": f"Bearer {create_access_token(data={'sub': '1'})}"}
+        settings.AUTH_TRUST_TOKEN_CLAIMS = True
+        with TestClient(app) as client:
+            for backend in ("none", "memory"):
+                settings.TASK_CACHE_BACKEND = backend
+                get_task_cache.cache_clear()
+                for name, url in (("task", "/tasks/1"), ("list", "/tasks/?limit=100")):
+                    client.get(url, headers=headers).raise_for_status()
+                    statements = 0
+                    started = time.perf_counter()
+                    for _ in range(args.requests):
+                        client.get(url, headers=headers).raise_for_status()
+                    elapsed = time.perf_counter() - started
+                    print(
+                        f"{backend:>6} {name:>4}: {statements / args.requests:.2f} queries/request  "
+                        f"{args.requests / elapsed:8.1f} req/s"
+                    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+# ToDoApp/benchmarks/bench_task_search.py
+"""Compare task title search through the full-text index with a LIKE scan.
+
+Seeds users owning random-word titles into a fresh SQLite database (the
+index is filled by its triggers as the rows are inserted), then times the
+first page of /tasks/search's query for random one- and two-word prefixes
+against the equivalent ``title LIKE '%word%'`` query over the owner's tasks.
+
+Run from the ToDoApp directory:
+
+    PYTHONPATH=. python benchmarks/bench_task_search.py --tasks 1000000 --users 10
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("DATABASE_URL", "sqlite:///./benchmark.db")
+
+from sqlalchemy import and_, create_engine, select
+
+from app.crud import crud_task
+from app.database.base import Base
+from app.models.task import Task
+from app.models.user import User
+
+SEED_CHUNK_SIZE = 10000
+
+
+def vocabulary(size: int, rng: random.Random) -> list:
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(letters) for _ in range(rng.randint(4, 9))))
+    return sorted(words)
+
+
+def seed(engine, users: int, tasks: int, words: list, rng: random.Random):
+    Base.metadata.create_all(bind=engine)
+    start = date(2025, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(User.__table__.insert(), [
+            {"id": u, "email": f"search{u}@example.com", "hashed_password": "x"}
+            for u in range(1, users + 1)
+        ])
+        chunk = []
+        for i in range(tasks):
+            chunk.append({
+                "id": i + 1,
+                "title": " ".join(rng.choices(words, k=rng.randint(2, 6))).capitalize(),
+                "day": start + timedelta(days=i % 365),
+                "owner_id": i % users + 1,
+            })
+            if len(chunk) == SEED_CHUNK_SIZE:
+                conn.execute(Task.__table__.insert(), chunk)
+                chunk = []
+        if chunk:
+            conn.execute(Task.__table__.insert(), chunk)
+
+
+def like_statement(owner_id: int, terms: list):
+    condition = and_(*(Task.title.ilike(f"%{term}%") for term in terms))
+    return (
+        select(*crud_task.TASK_OUT_COLUMNS)
+        .where(Task.owner_id == owner_id, condition)
+        .order_by(Task.day, Task.id)
+    )
+
+
+def time_queries(engine, make_statement, queries, limit: int) -> dict:
+    latencies = []
+    rows = 0
+    with engine.connect() as conn:
+        for owner_id, terms in queries:
+            started = time.perf_counter()
+            rows += len(conn.execute(make_statement(owner_id, terms).limit(limit)).all())
+            latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    return {
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+        "rows_per_query": rows / len(queries),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=100000)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--words", type=int, default=20000, help="vocabulary size")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+    words = vocabulary(args.words, rng)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'search.db')}")
+        started = time.perf_counter()
+        seed(engine, args.users, args.tasks, words, rng)
+        print(f"seeded {args.tasks} tasks in {time.perf_counter() - started:.1f} s")
+
+        # Prefixes of real words, so most queries have matches
+        queries = [
+            (rng.randint(1, args.users), [word[:rng.randint(3, len(word))] for word in rng.sample(words, k)])
+            for k in (1, 2)
+            for _ in range(args.queries // 2)
+        ]
+
+        def fts_statement(owner_id, terms):
+            return crud_task.search_statement(engine.dialect.name, owner_id, terms)
+
+        for name, make_statement in (("fts", fts_statement), ("like", like_statement)):
+            result = time_queries(engine, make_statement, queries, args.limit)
+            print(
+                f"{name:>4}: p50 {result['p50_ms']:8.2f} ms  p99 {result['p99_ms']:8.2f} ms  "
+                f"{result['rows_per_query']:.1f} rows/query"
+            )
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# ToDoApp/benchmarks/bench_task_stats.py
+"""Compare reading task stats from the per-day summary with aggregating tasks.
+
+Seeds one owner with many tasks spread over a number of days, then times
+the summary read behind GET /tasks/stats against computing the same
+per-day counts from the owner's task rows.
+
+Run from the ToDoApp directory:
+
+    PYTHONPATH=. python benchmarks/bench_task_stats.py --tasks 1000000 --days 365
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("DATABASE_URL", "sqlite:///./benchmark.db")
+
+from sqlalchemy import case, create_engine, func, select
+from sqlalchemy.orm import Session
+
+from app.crud import crud_task_stats
+from app.database.base import Base
+from app.models.task import Task
+from app.models.user import User
+
+SEED_CHUNK_SIZE = 10000
+
+
+def seed(engine, tasks: int, days: int):
+    Base.metadata.create_all(bind=engine)
+    start = date(2025, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(User.__table__.insert(), [{"id": 1, "email": "stats@example.com", "hashed_password": "x"}])
+        chunk = []
+        for i in range(tasks):
+            chunk.append({
+                "id": i + 1,
+                "title": f"Task {i}",
+                "day": start + timedelta(days=i % days),
+                "is_completed": i % 3 == 0,
+                "owner_id": 1,
+            })
+            if len(chunk) == SEED_CHUNK_SIZE:
+                conn.execute(Task.__table__.insert(), chunk)
+                chunk = []
+        if chunk:
+            conn.execute(Task.__table__.insert(), chunk)
+    with Session(engine) as db:
+        crud_task_stats.rebuild(db)
+
+
+def scan_statement(owner_id: int):
+    return (
+        select(Task.day, func.count(), func.sum(case((Task.is_completed == True, 1), else_=0)))  # noqa: E712
+        .where(Task.owner_id == owner_id)
+        .group_by(Task.day)
+        .order_by(Task.day)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=100000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--reads", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'stats.db')}")
+        seed(engine, args.tasks, args.days)
+        results = {}
+        with engine.connect() as conn:
+            for name, stmt in (
+                ("summary", crud_task_stats.day_stats_statement(1)),
+                ("scan", scan_statement(1)),
+            ):
+                started = time.perf_counter()
+                for _ in range(args.reads):
+                    rows = conn.execute(stmt).all()
+                elapsed = (time.perf_counter() - started) / args.reads
+                results[name] = rows
+                print(f"{name:>7}: {elapsed * 1000:8.2f} ms per read, {len(rows)} days")
+        assert [tuple(r) for r in results["summary"]] == [tuple(r) for r in results["scan"]]
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
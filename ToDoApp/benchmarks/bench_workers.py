@@ -0,0 +1,115 @@
+# ToDoApp/benchmarks/bench_workers.py
+"""Measure startup time and throughput as gunicorn workers scale from 1 to N.
+
+Starts the production launcher (gunicorn.conf.py) against a seeded SQLite
+database once per worker count, times how long it takes to answer /health,
+then drives the same closed-loop request mix as bench_load.py.
+
+Run from the ToDoApp directory:
+
+    PYTHONPATH=. python benchmarks/bench_workers.py --max-workers 4
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from bench_load import DEFAULT_MIX, free_port, parse_mix, run_load, seed
+
+
+def start(path: str, workers: int, port: int) -> subprocess.Popen:
+    env = dict(
+        os.environ,
+        SECRET_KEY=os.environ.get("SECRET_KEY", "benchmark"),
+        DATABASE_URL=f"sqlite:///{path}",
+        CONSUL_ENABLED="false",
+        RATE_LIMIT_ENABLED="false",
+        SERVICE_HOST="127.0.0.1",
+        SERVICE_PORT=str(port),
+        SERVICE_WORKERS=str(workers),
+        PYTHONPATH=os.getcwd(),
+    )
+    env.pop("PROMETHEUS_MULTIPROC_DIR", None)
+    return subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app.main:app"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+
+def wait_healthy(base_url: str, timeout: float = 60.0) -> float:
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        try:
+            httpx.get(f"{base_url}/health").raise_for_status()
+            return time.perf_counter() - started
+        except httpx.HTTPError:
+            time.sleep(0.02)
+    raise SystemExit("gunicorn did not become healthy")
+
+
+def measure(path: str, workers: int, args, weights: dict) -> dict:
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    server = start(path, workers, port)
+    try:
+        startup = wait_healthy(base_url)
+
+        async def main():
+            limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+            async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+                return await run_load(client, args, weights)
+
+        report = asyncio.run(main())
+    finally:
+        server.terminate()
+        server.wait(timeout=60)
+    return {
+        "workers": workers,
+        "startup_seconds": round(startup, 3),
+        "total_seconds": round(time.perf_counter() - started, 3),
+        "rps": report["rps"],
+        "p50_ms": report["p50_ms"],
+        "p99_ms": report["p99_ms"],
+        "errors": report["errors"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--tasks", type=int, default=100, help="tasks per user")
+    parser.add_argument("--mix", default="list=70,create=10,patch=20",
+                        help=f"operation=weight, comma separated (bench_load default: {DEFAULT_MIX})")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    weights = parse_mix(args.mix)
+
+    counts = sorted({1, *(2 ** i for i in range(1, args.max_workers.bit_length())), args.max_workers})
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "workers.db")
+        seed(path, args.users, args.tasks)
+        for workers in counts:
+            results.append(measure(path, workers, args, weights))
+            r = results[-1]
+            print(
+                f"workers {workers:>2}: startup {r['startup_seconds'] * 1000:7.1f} ms  "
+                f"{r['rps']:8.1f} req/s  p50 {r['p50_ms']:7.1f} ms  p99 {r['p99_ms']:7.1f} ms",
+                file=sys.stderr,
+            )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# ToDoApp/gunicorn.conf.py
+"""Production launcher: a gunicorn master supervising uvicorn workers.
+
+    gunicorn -c gunicorn.conf.py app.main:app
+
+The master imports the app once (preload_app) and forks SERVICE_WORKERS
+workers from it, so they share the imported code. The master registers
+this instance with Consul once, under its own id, instead of every worker
+registering. On SIGTERM it stops accepting connections, lets workers
+finish in-flight requests for up to SERVICE_GRACEFUL_TIMEOUT_SECONDS, and
+only then deregisters.
+"""
+import os
+import tempfile
+
+# Must be decided before the app (and prometheus_client) is imported:
+# workers leave Consul registration to the master, and write metrics
+# where the master can aggregate them across workers.
+os.environ["CONSUL_REGISTER_ON_STARTUP"] = "false"
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", tempfile.mkdtemp(prefix="todoapp-metrics-"))
+
+from app.core.config import settings  # noqa: E402
+from app.core.consul_client import ConsulClient  # noqa: E402
+
+bind = f"{settings.SERVICE_HOST}:{settings.SERVICE_PORT}"
+workers = settings.SERVICE_WORKERS or os.cpu_count() or 1
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+graceful_timeout = settings.SERVICE_GRACEFUL_TIMEOUT_SECONDS
+keepalive = 5
+accesslog = None
+
+# Backends that keep their state inside one worker process
+PER_PROCESS_BACKENDS = (
+    ("TASK_CACHE_BACKEND", "memory", "task reads can be stale until TASK_CACHE_TTL_SECONDS"),
+    ("EVENTS_BROKER", "local", "task event streams miss changes made in other workers"),
+    ("RATE_LIMIT_BACKEND", "memory", "each worker applies the rate limits separately"),
+)
+
+_consul_client = None
+
+
+def when_ready(server):
+    global _consul_client
+    if server.cfg.workers > 1:
+        for name, value, consequence in PER_PROCESS_BACKENDS:
+            if getattr(settings, name) == value:
+                print(f"Warning: {name}={value} with {server.cfg.workers} workers; {consequence}")
+        if settings.AUTH_CACHE_MAX_SIZE:
+            print(
+                f"Warning: the principal cache is per worker with {server.cfg.workers} workers; "
+                "profile changes reach other workers after AUTH_CACHE_TTL_SECONDS"
+            )
+    if settings.CONSUL_ENABLED:
+        _consul_client = ConsulClient()
+        _consul_client.register_service(
+            name=settings.APP_NAME,
+            port=settings.SERVICE_PORT,
+            tags=["api", "todoapp"],
+        )
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
+
+
+def on_exit(server):
+    # Workers have drained (or been killed after graceful_timeout) by now
+    if _consul_client is not None:
+        _consul_client.deregister_service()
+        _consul_client.close()
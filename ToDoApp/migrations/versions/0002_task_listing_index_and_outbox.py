@@ -0,0 +1,41 @@
+"""Task listing index and notification outbox
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2025-01-02 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Backs keyset pagination of a user's tasks ordered by (day, id)
+    op.create_index("ix_tasks_owner_day_id", "tasks", ["owner_id", "day", "id"])
+
+    op.create_table(
+        "notification_outbox",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("message", sa.String(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("delivered_at", sa.DateTime(), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_notification_outbox_delivered_at_id",
+        "notification_outbox",
+        ["delivered_at", "id"],
+    )
+
+
+def downgrade():
+    op.drop_index("ix_notification_outbox_delivered_at_id", table_name="notification_outbox")
+    op.drop_table("notification_outbox")
+    op.drop_index("ix_tasks_owner_day_id", table_name="tasks")
@@ -0,0 +1,37 @@
+"""Task versions and per-user task collection version
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2025-01-03 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("users") as batch_op:
+        batch_op.add_column(sa.Column("tasks_version", sa.Integer(), nullable=False, server_default="0"))
+        batch_op.add_column(sa.Column("tasks_updated_at", sa.DateTime(), nullable=True))
+
+    with op.batch_alter_table("tasks") as batch_op:
+        batch_op.add_column(sa.Column("version", sa.Integer(), nullable=False, server_default="1"))
+        batch_op.add_column(sa.Column("updated_at", sa.DateTime(), nullable=True))
+    op.execute("UPDATE tasks SET updated_at = CURRENT_TIMESTAMP")
+    with op.batch_alter_table("tasks") as batch_op:
+        batch_op.alter_column("updated_at", existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade():
+    with op.batch_alter_table("tasks") as batch_op:
+        batch_op.drop_column("updated_at")
+        batch_op.drop_column("version")
+
+    with op.batch_alter_table("users") as batch_op:
+        batch_op.drop_column("tasks_updated_at")
+        batch_op.drop_column("tasks_version")
@@ -0,0 +1,54 @@
+"""Task change sequence and tombstones for delta sync
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2025-01-04 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("users") as batch_op:
+        batch_op.add_column(
+            sa.Column("tombstones_purged_seq", sa.Integer(), nullable=False, server_default="0")
+        )
+
+    with op.batch_alter_table("tasks") as batch_op:
+        batch_op.add_column(sa.Column("change_seq", sa.Integer(), nullable=False, server_default="0"))
+    op.create_index("ix_tasks_owner_change_seq_id", "tasks", ["owner_id", "change_seq", "id"])
+
+    op.create_table(
+        "task_tombstones",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("owner_id", sa.Integer(), nullable=False),
+        sa.Column("task_id", sa.Integer(), nullable=False),
+        sa.Column("change_seq", sa.Integer(), nullable=False),
+        sa.Column("deleted_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_task_tombstones_owner_seq_task",
+        "task_tombstones",
+        ["owner_id", "change_seq", "task_id"],
+    )
+    op.create_index("ix_task_tombstones_deleted_at", "task_tombstones", ["deleted_at"])
+
+
+def downgrade():
+    op.drop_index("ix_task_tombstones_deleted_at", table_name="task_tombstones")
+    op.drop_index("ix_task_tombstones_owner_seq_task", table_name="task_tombstones")
+    op.drop_table("task_tombstones")
+
+    op.drop_index("ix_tasks_owner_change_seq_id", table_name="tasks")
+    with op.batch_alter_table("tasks") as batch_op:
+        batch_op.drop_column("change_seq")
+
+    with op.batch_alter_table("users") as batch_op:
+        batch_op.drop_column("tombstones_purged_seq")
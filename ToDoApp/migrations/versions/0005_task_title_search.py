@@ -0,0 +1,59 @@
+"""Full-text search index over task titles
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2025-01-05 00:00:00
+"""
+from alembic import op
+
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute(
+            "ALTER TABLE tasks ADD COLUMN title_tsv tsvector "
+            "GENERATED ALWAYS AS (to_tsvector('simple', title)) STORED"
+        )
+        op.execute("CREATE INDEX ix_tasks_title_tsv ON tasks USING gin (title_tsv)")
+        return
+
+    op.execute(
+        "CREATE VIRTUAL TABLE tasks_fts USING fts5("
+        "title, owner_tag, tokenize = 'unicode61 remove_diacritics 2')"
+    )
+    op.execute(
+        "CREATE TRIGGER tasks_fts_insert AFTER INSERT ON tasks BEGIN "
+        "INSERT INTO tasks_fts (rowid, title, owner_tag) VALUES (new.id, new.title, 'u' || new.owner_id); "
+        "END"
+    )
+    op.execute(
+        "CREATE TRIGGER tasks_fts_delete AFTER DELETE ON tasks BEGIN "
+        "DELETE FROM tasks_fts WHERE rowid = old.id; "
+        "END"
+    )
+    op.execute(
+        "CREATE TRIGGER tasks_fts_update AFTER UPDATE OF title, owner_id ON tasks BEGIN "
+        "UPDATE tasks_fts SET title = new.title, owner_tag = 'u' || new.owner_id WHERE rowid = new.id; "
+        "END"
+    )
+    op.execute(
+        "INSERT INTO tasks_fts (rowid, title, owner_tag) "
+        "SELECT id, title, 'u' || owner_id FROM tasks"
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("DROP INDEX ix_tasks_title_tsv")
+        op.execute("ALTER TABLE tasks DROP COLUMN title_tsv")
+        return
+
+    op.execute("DROP TRIGGER tasks_fts_update")
+    op.execute("DROP TRIGGER tasks_fts_delete")
+    op.execute("DROP TRIGGER tasks_fts_insert")
+    op.execute("DROP TABLE tasks_fts")
@@ -0,0 +1,34 @@
+"""Per-owner, per-day task counts
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2025-01-06 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "task_day_stats",
+        sa.Column("owner_id", sa.Integer(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("total", sa.Integer(), nullable=False),
+        sa.Column("completed", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("owner_id", "day"),
+    )
+    op.execute(
+        "INSERT INTO task_day_stats (owner_id, day, total, completed) "
+        "SELECT owner_id, day, COUNT(*), SUM(CASE WHEN is_completed THEN 1 ELSE 0 END) "
+        "FROM tasks WHERE owner_id IS NOT NULL GROUP BY owner_id, day"
+    )
+
+
+def downgrade():
+    op.drop_table("task_day_stats")
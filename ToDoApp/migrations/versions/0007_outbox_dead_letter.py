@@ -0,0 +1,35 @@
+"""Dead-letter column for the notification outbox
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2025-01-07 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("notification_outbox", sa.Column("failed_at", sa.DateTime(), nullable=True))
+    op.drop_index("ix_notification_outbox_delivered_at_id", table_name="notification_outbox")
+    op.create_index(
+        "ix_notification_outbox_pending",
+        "notification_outbox",
+        ["delivered_at", "failed_at", "id"],
+    )
+
+
+def downgrade():
+    op.drop_index("ix_notification_outbox_pending", table_name="notification_outbox")
+    op.create_index(
+        "ix_notification_outbox_delivered_at_id",
+        "notification_outbox",
+        ["delivered_at", "id"],
+    )
+    with op.batch_alter_table("notification_outbox") as batch_op:
+        batch_op.drop_column("failed_at")
@@ -0,0 +1,58 @@
+"""Never reuse task ids on SQLite
+
+Without AUTOINCREMENT SQLite hands the id of a deleted max-id task to the
+next insert, so a delta sync page could report the same id as deleted and
+as created. Postgres sequences never reuse ids; nothing to do there.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2025-01-08 00:00:00
+"""
+from alembic import op
+
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+# Dropped with the old table by the rebuild, recreated as in 0005
+FTS_TRIGGERS = (
+    "CREATE TRIGGER tasks_fts_insert AFTER INSERT ON tasks BEGIN "
+    "INSERT INTO tasks_fts (rowid, title, owner_tag) VALUES (new.id, new.title, 'u' || new.owner_id); "
+    "END",
+    "CREATE TRIGGER tasks_fts_delete AFTER DELETE ON tasks BEGIN "
+    "DELETE FROM tasks_fts WHERE rowid = old.id; "
+    "END",
+    "CREATE TRIGGER tasks_fts_update AFTER UPDATE OF title, owner_id ON tasks BEGIN "
+    "UPDATE tasks_fts SET title = new.title, owner_tag = 'u' || new.owner_id WHERE rowid = new.id; "
+    "END",
+)
+
+
+def _rebuild_tasks(autoincrement):
+    with op.batch_alter_table(
+        "tasks", recreate="always", table_kwargs={"sqlite_autoincrement": autoincrement}
+    ):
+        pass
+    for statement in FTS_TRIGGERS:
+        op.execute(statement)
+
+
+def upgrade():
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    _rebuild_tasks(True)
+    # Deleted tasks above the current max id still have tombstones; start past them
+    op.execute("DELETE FROM sqlite_sequence WHERE name = 'tasks'")
+    op.execute(
+        "INSERT INTO sqlite_sequence (name, seq) SELECT 'tasks', max("
+        "(SELECT coalesce(max(id), 0) FROM tasks), "
+        "(SELECT coalesce(max(task_id), 0) FROM task_tombstones))"
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    _rebuild_tasks(False)
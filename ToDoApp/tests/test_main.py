@@ -1,19 +1,39 @@
 from fastapi.testclient import TestClient
+import json
+import threading
+import time
 import pytest
+from passlib.context import CryptContext
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
+from app.core.auth_cache import principal_cache
+from app.core.config import settings
+from app.core.consul_client import ConsulClient
+from app.core.query_budget import capture_requests
 from app.database.base import Base
-from app.dependencies import get_db
+from app.database.session import configure_engine
+from app.dependencies import get_async_db, get_db
 from app.main import app
-from app.utils.security import create_access_token
+from app.utils.notification_client import NotificationRejected
+from app.utils.notification_dispatcher import NotificationDispatcher
+from app.utils.security import create_access_token, password_needs_rehash, verify_password
 from app.models.user import User
 from app.models.task import Task
+from app.models.outbox import NotificationOutbox
+from app.models.task_stats import TaskDayStats
+from app.workers import outbox_relay, task_stats
+from app.crud import crud_outbox
 
 # Create test database
 SQLALCHEMY_TEST_DATABASE_URL = "sqlite:///./test_db.db"
 engine = create_engine(SQLALCHEMY_TEST_DATABASE_URL, connect_args={"check_same_thread": False})
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+async_engine = create_async_engine("sqlite+aiosqlite:///./test_db.db")
+TestingAsyncSessionLocal = sessionmaker(
+    bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
 
 # Set up the database once for all tests
 @pytest.fixture(scope="session", autouse=True)
@@ -24,6 +44,12 @@ def setup_db():
     # Drop tables after all tests
     Base.metadata.drop_all(bind=engine)
 
+# Queries made by each request finished during a test, as (route, QueryRecorder)
+@pytest.fixture
+def query_counts():
+    with capture_requests() as requests:
+        yield requests
+
 # Create a new session for each test
 @pytest.fixture(scope="function")
 def test_db():
@@ -41,7 +67,17 @@ def override_get_db():
     finally:
         db.close()
 
+async def override_get_async_db():
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_async_db] = override_get_async_db
+
+# Most tests sign up many users from one address; limits are tested on their own
+settings.RATE_LIMIT_ENABLED = False
+# Any request over its query budget, or repeating a statement, fails its test
+settings.QUERY_BUDGET_MODE = "raise"
 
 # Create test client
 client = TestClient(app)
@@ -118,3 +154,1089 @@ def test_create_task(test_db):
     assert data["title"] == "Test Task"
     assert data["day"] == "2025-05-01"
     assert data["is_completed"] == False
+
+def test_list_tasks_keyset_pagination(test_db):
+    user_response = client.post("/auth/signup", json={
+        "email": "page_test@example.com",
+        "password": "password123"
+    })
+    token = create_access_token(data={"sub": str(user_response.json()["id"])})
+    headers = {"Authorization": f"Bearer {token}"}
+
+    for day in ["2025-05-03", "2025-05-01", "2025-05-02"]:
+        client.post("/tasks/", json={"title": f"Task {day}", "day": day}, headers=headers)
+
+    response = client.get("/tasks/?limit=2", headers=headers)
+    assert response.status_code == 200
+    assert [t["day"] for t in response.json()] == ["2025-05-01", "2025-05-02"]
+    cursor = response.headers["X-Next-Cursor"]
+
+    response = client.get(f"/tasks/?limit=2&cursor={cursor}", headers=headers)
+    assert [t["day"] for t in response.json()] == ["2025-05-03"]
+    assert "X-Next-Cursor" not in response.headers
+
+    response = client.get("/tasks/?day_from=2025-05-02&is_completed=false", headers=headers)
+    assert [t["day"] for t in response.json()] == ["2025-05-02", "2025-05-03"]
+
+    response = client.get("/tasks/?cursor=not-a-cursor", headers=headers)
+    assert response.status_code == 400
+
+def test_list_tasks_ndjson_stream(test_db):
+    user_response = client.post("/auth/signup", json={
+        "email": "stream_test@example.com",
+        "password": "password123"
+    })
+    token = create_access_token(data={"sub": str(user_response.json()["id"])})
+    headers = {"Authorization": f"Bearer {token}"}
+
+    for day in ["2025-06-02", "2025-06-01"]:
+        client.post("/tasks/", json={"title": f"Task {day}", "day": day}, headers=headers)
+
+    response = client.get("/tasks/?stream=true", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [t["day"] for t in lines] == ["2025-06-01", "2025-06-02"]
+
+def test_search_tasks(test_db):
+    tokens = []
+    for email in ["search_test@example.com", "search_other@example.com"]:
+        user_response = client.post("/auth/signup", json={"email": email, "password": "password123"})
+        tokens.append(create_access_token(data={"sub": str(user_response.json()["id"])}))
+    headers, other_headers = ({"Authorization": f"Bearer {token}"} for token in tokens)
+
+    ids = {}
+    for title, day in [
+        ("Buy milk", "2025-07-01"),
+        ("Milk the cows, then milk the goats", "2025-07-02"),
+        ("Call the plumber", "2025-07-03"),
+        ("Buy bread and milk", "2025-07-04"),
+    ]:
+        ids[title] = client.post("/tasks/", json={"title": title, "day": day}, headers=headers).json()["id"]
+    client.post("/tasks/", json={"title": "Buy milk", "day": "2025-07-01"}, headers=other_headers)
+
+    # Every word matches as a prefix, case-insensitively; only the caller's tasks
+    response = client.get("/tasks/search?q=MIL", headers=headers)
+    assert response.status_code == 200
+    titles = [t["title"] for t in response.json()]
+    assert sorted(titles) == ["Buy bread and milk", "Buy milk", "Milk the cows, then milk the goats"]
+    # Shorter titles rank above longer ones with the same matches
+    assert titles.index("Buy milk") < titles.index("Buy bread and milk")
+    response = client.get("/tasks/search?q=buy+mil", headers=headers)
+    assert sorted(t["title"] for t in response.json()) == ["Buy bread and milk", "Buy milk"]
+    response = client.get("/tasks/search?q=milk&day_from=2025-07-02&day_to=2025-07-03", headers=headers)
+    assert [t["title"] for t in response.json()] == ["Milk the cows, then milk the goats"]
+
+    # Paging visits every match once, in rank order; tasks created (by anyone)
+    # after the first page stay out of the later ones
+    seen = []
+    cursor = None
+    while True:
+        url = "/tasks/search?q=milk&limit=1" + (f"&cursor={cursor}" if cursor else "")
+        response = client.get(url, headers=headers)
+        seen += [t["title"] for t in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+        if len(seen) == 1:
+            client.post("/tasks/", json={"title": "Milk", "day": "2025-07-05"}, headers=headers)
+            client.post("/tasks/", json={"title": "Milk", "day": "2025-07-05"}, headers=other_headers)
+    assert seen == titles
+    assert client.get("/tasks/search?q=milk&limit=1", headers=headers).json()[0]["title"] == "Milk"
+
+    # Edits and deletes reach the index
+    client.patch(f"/tasks/{ids['Call the plumber']}", json={"title": "Call the milkman"}, headers=headers)
+    client.delete(f"/tasks/{ids['Buy milk']}", headers=headers)
+    response = client.get("/tasks/search?q=milk", headers=headers)
+    assert sorted(t["title"] for t in response.json()) == [
+        "Buy bread and milk", "Call the milkman", "Milk", "Milk the cows, then milk the goats"
+    ]
+    assert client.get("/tasks/search?q=plumber", headers=headers).json() == []
+
+    assert client.get("/tasks/search?q=%21%21", headers=headers).status_code == 400
+    assert client.get("/tasks/search?q=milk&cursor=bad", headers=headers).status_code == 400
+
+def test_task_crud_async_path(test_db):
+    user_response = client.post("/auth/signup", json={
+        "email": "async_test@example.com",
+        "password": "password123"
+    })
+    token = create_access_token(data={"sub": str(user_response.json()["id"])})
+    headers = {"Authorization": f"Bearer {token}"}
+
+    task_id = client.post(
+        "/tasks/", json={"title": "Async Task", "day": "2025-07-01"}, headers=headers
+    ).json()["id"]
+
+    response = client.patch(f"/tasks/{task_id}", json={"is_completed": True}, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["is_completed"] == True
+
+    response = client.get(f"/tasks/{task_id}", headers=headers)
+    assert response.json()["title"] == "Async Task"
+
+    assert client.delete(f"/tasks/{task_id}", headers=headers).status_code == 204
+    assert client.get(f"/tasks/{task_id}", headers=headers).status_code == 404
+
+def test_login_rehashes_outdated_password_hash(test_db):
+    legacy_context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4)
+    user = User(email="rehash_test@example.com", hashed_password=legacy_context.hash("password123"))
+    test_db.add(user)
+    test_db.commit()
+
+    response = client.post("/auth/login", data={
+        "username": "rehash_test@example.com",
+        "password": "password123"
+    })
+    assert response.status_code == 200
+
+    test_db.refresh(user)
+    assert not password_needs_rehash(user.hashed_password)
+    assert verify_password("password123", user.hashed_password)
+
+def test_principal_cache_invalidated_on_profile_update(test_db):
+    client.post("/auth/signup", json={
+        "email": "cache_test@example.com",
+        "password": "password123"
+    })
+    login_response = client.post("/auth/login", data={
+        "username": "cache_test@example.com",
+        "password": "password123"
+    })
+    headers = {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+
+    response = client.get("/users/me", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["email"] == "cache_test@example.com"
+    assert principal_cache.get(response.json()["id"]) is not None
+
+    client.patch("/users/me", json={"email": "cache_test_new@example.com"}, headers=headers)
+    response = client.get("/users/me", headers=headers)
+    assert response.json()["email"] == "cache_test_new@example.com"
+
+class FakeKV:
+    """In-process stand-in for the Consul KV API, sharing FakeConsul's index"""
+
+    def __init__(self, consul):
+        self.consul = consul
+        self.values = {}
+
+    def put(self, key, value):
+        with self.consul.changed:
+            self.values[key] = value.encode("utf-8")
+            self.consul.index += 1
+            self.consul.changed.notify_all()
+
+    def delete(self, key):
+        with self.consul.changed:
+            self.values.pop(key, None)
+            self.consul.index += 1
+            self.consul.changed.notify_all()
+
+    def get(self, key, index=None, recurse=False, wait=None, **kwargs):
+        if not self.consul.available:
+            raise ConnectionError("Consul is down")
+        with self.consul.changed:
+            if index is not None:
+                self.consul.changed.wait_for(lambda: self.consul.index != index, timeout=0.2)
+            entries = [
+                {"Key": k, "Value": v} for k, v in sorted(self.values.items())
+                if (k.startswith(key) if recurse else k == key)
+            ]
+            return str(self.consul.index), entries or None
+
+class FakeConsul:
+    """In-process stand-in for the Consul health API with blocking queries"""
+
+    def __init__(self):
+        self.health = self
+        self.kv = FakeKV(self)
+        self.index = 1
+        self.instances = {}
+        self.available = True
+        self.changed = threading.Condition()
+
+    def set_instances(self, name, addresses):
+        with self.changed:
+            self.instances[name] = addresses
+            self.index += 1
+            self.changed.notify_all()
+
+    def service(self, name, index=None, wait=None, passing=None, **kwargs):
+        if not self.available:
+            raise ConnectionError("Consul is down")
+        with self.changed:
+            if index is not None:
+                self.changed.wait_for(lambda: self.index != index, timeout=0.2)
+            entries = [
+                {"Node": {"Address": "10.0.0.1"}, "Service": {"Address": host, "Port": port}}
+                for host, port in self.instances.get(name, [])
+            ]
+            return str(self.index), entries
+
+def test_consul_service_cache_round_robin_and_watch():
+    fake = FakeConsul()
+    fake.set_instances("notification-service", [("a", 8081), ("b", 8081)])
+    consul_client = ConsulClient(consul_api=fake)
+    try:
+        addresses = {consul_client.get_service_address("notification-service") for _ in range(4)}
+        assert addresses == {"a:8081", "b:8081"}
+
+        fake.set_instances("notification-service", [("c", 8081)])
+        deadline = time.monotonic() + 2
+        while consul_client.get_service_address("notification-service") != "c:8081":
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+
+        # Stale instances keep being served while Consul is unreachable
+        fake.available = False
+        time.sleep(0.3)
+        assert consul_client.get_service_address("notification-service") == "c:8081"
+        assert consul_client.get_service_address("missing-service") is None
+    finally:
+        consul_client.close()
+
+def test_consul_kv_config_hot_reload():
+    from app.core.config import STATIC_SETTINGS, Settings
+
+    fake = FakeConsul()
+    prefix = "config/todoapp/"
+    fake.kv.put(prefix + "ACCESS_TOKEN_EXPIRE_MINUTES", "45")
+    fake.kv.put(prefix + "SECRET_KEY", "from-consul")
+    target = Settings(SECRET_KEY="local", DATABASE_URL="sqlite://")
+    consul_client = ConsulClient(consul_api=fake)
+
+    def wait_for_index():
+        deadline = time.monotonic() + 2
+        while watch.index != str(fake.index):
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+
+    try:
+        # Loaded before the first request; secrets are never taken from KV
+        watch = consul_client.watch_config(target, prefix, STATIC_SETTINGS)
+        assert target.ACCESS_TOKEN_EXPIRE_MINUTES == 45
+        assert target.SECRET_KEY == "local"
+
+        fake.kv.put(prefix + "RATE_LIMIT_EXEMPT_PATHS", '["/health"]')
+        fake.kv.put(prefix + "ACCESS_TOKEN_EXPIRE_MINUTES", "5")
+        wait_for_index()
+        assert (target.ACCESS_TOKEN_EXPIRE_MINUTES, target.RATE_LIMIT_EXEMPT_PATHS) == (5, ["/health"])
+
+        # An invalid value rejects the whole update
+        fake.kv.put(prefix + "BCRYPT_ROUNDS", "many")
+        wait_for_index()
+        assert target.ACCESS_TOKEN_EXPIRE_MINUTES == 5
+        assert target.BCRYPT_ROUNDS == 12
+
+        # Deleting a key reverts to the local value
+        fake.kv.delete(prefix + "BCRYPT_ROUNDS")
+        fake.kv.delete(prefix + "ACCESS_TOKEN_EXPIRE_MINUTES")
+        wait_for_index()
+        assert target.ACCESS_TOKEN_EXPIRE_MINUTES == 30
+        assert consul_client.get_config(prefix + "RATE_LIMIT_EXEMPT_PATHS") == '["/health"]'
+
+        # Consul going away keeps the last applied settings
+        fake.available = False
+        time.sleep(0.3)
+        assert target.RATE_LIMIT_EXEMPT_PATHS == ["/health"]
+    finally:
+        consul_client.close()
+
+class RecordingNotificationClient:
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.batches = []
+
+    def send_batch(self, notifications):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("notification service unavailable")
+        self.batches.append(notifications)
+
+def test_notification_dispatcher_batches_and_retries():
+    client_stub = RecordingNotificationClient(failures=1)
+    dispatcher = NotificationDispatcher(
+        client_stub, max_queue=3, batch_size=10, linger_seconds=0.05, backoff_seconds=0.01
+    )
+    # Not started yet, so the queue fills up and the fourth item is dropped
+    assert all(dispatcher.enqueue(1, f"message {i}") for i in range(3))
+    assert dispatcher.enqueue(1, "overflow") == False
+
+    dispatcher.start()
+    dispatcher.stop()
+
+    assert client_stub.batches == [[{"user_id": 1, "message": f"message {i}"} for i in range(3)]]
+
+def test_notification_dispatcher_stops_during_outage():
+    from prometheus_client import REGISTRY
+
+    def dropped(reason):
+        return REGISTRY.get_sample_value(
+            "todoapp_notifications_dropped_total", {"reason": reason}
+        ) or 0
+
+    client_stub = RecordingNotificationClient(failures=1000)
+    dispatcher = NotificationDispatcher(
+        client_stub, max_queue=10, batch_size=2, linger_seconds=0, max_retries=5, backoff_seconds=30
+    )
+    for i in range(5):
+        dispatcher.enqueue(1, f"message {i}")
+    before = dropped("send_failed"), dropped("shutdown")
+    dispatcher.start()
+    while client_stub.failures == 1000:
+        time.sleep(0.01)
+
+    # Stop cuts the backoff short: one more attempt, then the rest is dropped
+    started = time.monotonic()
+    dispatcher.stop(timeout=5)
+    assert time.monotonic() - started < 1
+    assert not dispatcher._thread.is_alive() and dispatcher.queue.empty()
+    assert client_stub.failures == 998
+    assert (dropped("send_failed"), dropped("shutdown")) == (before[0] + 2, before[1] + 3)
+
+def test_create_task_writes_outbox_and_relay_delivers(test_db):
+    user_response = client.post("/auth/signup", json={
+        "email": "outbox_test@example.com",
+        "password": "password123"
+    })
+    user_id = user_response.json()["id"]
+    token = create_access_token(data={"sub": str(user_id)})
+    client.post(
+        "/tasks/",
+        json={"title": "Outbox Task", "day": "2025-08-01"},
+        headers={"Authorization": f"Bearer {token}"}
+    )
+
+    pending = test_db.query(NotificationOutbox).filter(
+        NotificationOutbox.user_id == user_id,
+        NotificationOutbox.delivered_at.is_(None),
+    ).all()
+    assert [row.message for row in pending] == ["New task created: Outbox Task due on 2025-08-01"]
+
+    # An outage outlasting OUTBOX_MAX_ATTEMPTS relays keeps the rows pending
+    # without charging them attempts, so nothing is dead-lettered
+    failing_client = RecordingNotificationClient(failures=1000)
+    for _ in range(settings.OUTBOX_MAX_ATTEMPTS + 2):
+        with pytest.raises(ConnectionError):
+            outbox_relay.relay_batch(test_db, failing_client, batch_size=1000)
+    test_db.expire_all()
+    assert (pending[0].delivered_at, pending[0].attempts, pending[0].failed_at) == (None, 0, None)
+    assert test_db.query(NotificationOutbox).filter(NotificationOutbox.failed_at.isnot(None)).count() == 0
+
+    relay_client = RecordingNotificationClient()
+    while outbox_relay.relay_batch(test_db, relay_client, batch_size=1000):
+        pass
+    delivered = [n for batch in relay_client.batches for n in batch]
+    assert {"user_id": user_id, "message": pending[0].message} in delivered
+    test_db.expire_all()
+    assert pending[0].delivered_at is not None
+
+class RejectingNotificationClient(RecordingNotificationClient):
+    def send_batch(self, notifications):
+        if not self.failures and any(n["message"] == "poison" for n in notifications):
+            raise NotificationRejected("422 invalid notification")
+        super().send_batch(notifications)
+
+def test_outbox_relay_skips_failing_row(test_db, monkeypatch):
+    monkeypatch.setattr(settings, "OUTBOX_MAX_ATTEMPTS", 2)
+    relay_client = RejectingNotificationClient()
+    while outbox_relay.relay_batch(test_db, relay_client, batch_size=1000):
+        pass
+
+    bad = crud_outbox.add_notification(test_db, 7, "poison")
+    good = [crud_outbox.add_notification(test_db, 7, f"fine {i}") for i in range(2)]
+    test_db.commit()
+
+    # The rejected head row is retried alone and does not hold back newer rows
+    assert outbox_relay.relay_batch(test_db, relay_client, batch_size=1000) == 2
+    test_db.expire_all()
+    assert all(row.delivered_at is not None for row in good)
+    assert (bad.attempts, bad.delivered_at, bad.failed_at) == (1, None, None)
+
+    # An outage while rows are retried one by one charges nothing
+    relay_client.failures = 1000
+    with pytest.raises(ConnectionError):
+        outbox_relay.relay_batch(test_db, relay_client, batch_size=1000)
+    test_db.expire_all()
+    assert bad.attempts == 1
+    relay_client.failures = 0
+
+    # After OUTBOX_MAX_ATTEMPTS rejections it is dead-lettered and no longer picked up
+    assert outbox_relay.relay_batch(test_db, relay_client, batch_size=1000) == 0
+    test_db.expire_all()
+    assert bad.attempts == 2 and bad.failed_at is not None
+    assert outbox_relay.relay_batch(test_db, relay_client, batch_size=1000) == 0
+
+def test_bulk_task_endpoints(test_db):
+    user_response = client.post("/auth/signup", json={
+        "email": "bulk_test@example.com",
+        "password": "password123"
+    })
+    user_id = user_response.json()["id"]
+    token = create_access_token(data={"sub": str(user_id)})
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = client.post("/tasks/bulk", json={"tasks": [
+        {"title": f"Bulk {i}", "day": f"2025-09-0{i + 1}"} for i in range(3)
+    ]}, headers=headers)
+    assert response.status_code == 200
+    created = response.json()
+    assert [t["title"] for t in created] == ["Bulk 0", "Bulk 1", "Bulk 2"]
+    ids = [t["id"] for t in created]
+    assert test_db.query(NotificationOutbox).filter(
+        NotificationOutbox.message == "3 new tasks created",
+        NotificationOutbox.user_id == user_id,
+    ).count() == 1
+
+    response = client.patch("/tasks/bulk", json={"tasks": [
+        {"id": ids[0], "title": "Renamed"},
+        {"id": ids[1], "is_completed": True},
+    ]}, headers=headers)
+    assert response.status_code == 200
+    assert [(t["title"], t["is_completed"]) for t in response.json()] == [
+        ("Renamed", False), ("Bulk 1", True)
+    ]
+
+    response = client.post("/tasks/bulk/complete", json={"ids": ids}, headers=headers)
+    assert response.json() == {"count": 3}
+
+    # Any id owned by someone else rejects the whole batch
+    other_response = client.post("/auth/signup", json={
+        "email": "bulk_other@example.com",
+        "password": "password123"
+    })
+    other_token = create_access_token(data={"sub": str(other_response.json()["id"])})
+    other_task = client.post(
+        "/tasks/",
+        json={"title": "Not yours", "day": "2025-09-01"},
+        headers={"Authorization": f"Bearer {other_token}"}
+    ).json()
+    response = client.request("DELETE", "/tasks/bulk", json={"ids": ids + [other_task["id"]]}, headers=headers)
+    assert response.status_code == 404
+    assert client.get(f"/tasks/{ids[0]}", headers=headers).status_code == 200
+
+    response = client.request("DELETE", "/tasks/bulk", json={"ids": ids}, headers=headers)
+    assert response.status_code == 204
+    assert client.get(f"/tasks/{ids[0]}", headers=headers).status_code == 404
+
+def test_task_stats_maintained_incrementally(test_db):
+    user_response = client.post("/auth/signup", json={
+        "email": "stats_test@example.com",
+        "password": "password123"
+    })
+    user_id = user_response.json()["id"]
+    token = create_access_token(data={"sub": str(user_id)})
+    headers = {"Authorization": f"Bearer {token}"}
+
+    def stats(query=""):
+        response = client.get(f"/tasks/stats{query}", headers=headers)
+        assert response.status_code == 200
+        return response.json()
+
+    def days():
+        return [(d["day"], d["total"], d["completed"]) for d in stats()["days"]]
+
+    first = client.post("/tasks/", json={"title": "One", "day": "2020-01-01"}, headers=headers).json()
+    second = client.post("/tasks/", json={"title": "Two", "day": "2020-01-01"}, headers=headers).json()
+    created = client.post("/tasks/bulk", json={"tasks": [
+        {"title": "Three", "day": "2020-01-02"},
+        {"title": "Four", "day": "2999-01-01"},
+    ]}, headers=headers).json()
+    assert days() == [("2020-01-01", 2, 0), ("2020-01-02", 1, 0), ("2999-01-01", 1, 0)]
+
+    # Completion and day changes move the counts; title-only edits don't
+    client.patch(f"/tasks/{first['id']}", json={"is_completed": True}, headers=headers)
+    client.patch(f"/tasks/{second['id']}", json={"day": "2020-01-02", "title": "Moved"}, headers=headers)
+    client.patch(f"/tasks/{second['id']}", json={"title": "Renamed"}, headers=headers)
+    assert days() == [("2020-01-01", 1, 1), ("2020-01-02", 2, 0), ("2999-01-01", 1, 0)]
+
+    client.patch("/tasks/bulk", json={"tasks": [
+        {"id": created[0]["id"], "day": "2020-01-01", "is_completed": True},
+    ]}, headers=headers)
+    client.post("/tasks/bulk/complete", json={"ids": [first["id"], second["id"]]}, headers=headers)
+    assert days() == [("2020-01-01", 2, 2), ("2020-01-02", 1, 1), ("2999-01-01", 1, 0)]
+
+    client.delete(f"/tasks/{first['id']}", headers=headers)
+    client.request("DELETE", "/tasks/bulk", json={"ids": [second["id"]]}, headers=headers)
+    assert days() == [("2020-01-01", 1, 1), ("2999-01-01", 1, 0)]
+
+    result = stats()
+    assert (result["total"], result["completed"], result["overdue"]) == (2, 1, 0)
+    assert result["completion_rate"] == 0.5
+    result = stats("?day_from=2020-01-02")
+    assert (result["total"], result["completed"], result["days"]) == (1, 0, [
+        {"day": "2999-01-01", "total": 1, "completed": 0}
+    ])
+    client.post("/tasks/", json={"title": "Late", "day": "2020-01-03"}, headers=headers)
+    assert stats()["overdue"] == 1
+
+    # The rebuild command repairs drift from the tasks table
+    expected = days()
+    test_db.query(TaskDayStats).filter(TaskDayStats.owner_id == user_id).update({"total": 7})
+    test_db.commit()
+    assert days() != expected
+    assert task_stats.rebuild(user_id, session_factory=TestingSessionLocal) == 3
+    assert days() == expected
+
+def test_migrations_match_models(tmp_path):
+    from alembic import command
+    from alembic.autogenerate import compare_metadata
+    from alembic.config import Config
+    from alembic.migration import MigrationContext
+
+    from app.database.search import include_object
+
+    url = f"sqlite:///{tmp_path / 'migrated.db'}"
+    config = Config("alembic.ini")
+    config.set_main_option("sqlalchemy.url", url)
+    config.attributes["configure_logger"] = False
+    command.upgrade(config, "head")
+
+    migrated = create_engine(url)
+    with migrated.connect() as connection:
+        context = MigrationContext.configure(connection, opts={"include_object": include_object})
+        assert compare_metadata(context, Base.metadata) == []
+
+    command.downgrade(config, "base")
+    migrated.dispose()
+
+def test_engine_options_and_sqlite_pragmas(tmp_path, monkeypatch):
+    from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+    from app.database.session import get_async_database_url, get_engine_options
+
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 7)
+    monkeypatch.setattr(settings, "SQLITE_BUSY_TIMEOUT_MS", 4321)
+
+    # Server databases get a sized, recycled, pre-pinged pool
+    options = get_engine_options("postgresql://db/todo")
+    assert options["pool_size"] == 7 and options["pool_pre_ping"] == settings.DB_POOL_PRE_PING
+    assert options["pool_recycle"] == settings.DB_POOL_RECYCLE_SECONDS
+    assert get_async_database_url("postgresql://db/todo") == "postgresql+asyncpg://db/todo"
+
+    # SQLite files keep a pool of connections; in-memory databases keep the default
+    url = f"sqlite:///{tmp_path / 'pragmas.db'}"
+    assert get_engine_options(url)["poolclass"] is QueuePool
+    assert get_engine_options(get_async_database_url(url), is_async=True)["poolclass"] is AsyncAdaptedQueuePool
+    assert "poolclass" not in get_engine_options("sqlite://")
+
+    # Every new connection to a file gets WAL and the busy timeout
+    file_engine = create_engine(url, **get_engine_options(url))
+    configure_engine(file_engine, "pragmas")
+    with file_engine.connect() as connection:
+        assert connection.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        assert connection.exec_driver_sql("PRAGMA busy_timeout").scalar() == 4321
+    assert file_engine.pool.size() == 7
+    file_engine.dispose()
+
+def test_app_import_has_no_side_effects(tmp_path):
+    import os
+    import subprocess
+    import sys
+
+    # Importing the app must neither create tables nor build a Consul client
+    code = (
+        "import sqlalchemy, app.main, app.core.clients as clients\n"
+        "from app.database.session import engine\n"
+        "assert sqlalchemy.inspect(engine).get_table_names() == []\n"
+        "assert clients.get_consul_client.cache_info().currsize == 0\n"
+    )
+    env = dict(os.environ, SECRET_KEY="x", CONSUL_ENABLED="true", PYTHONPATH=os.getcwd())
+    env["DATABASE_URL"] = f"sqlite:///{tmp_path / 'import.db'}"
+    result = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+def test_conditional_task_reads_and_if_match(test_db):
+    response = client.post("/auth/signup", json={
+        "email": "etag@example.com",
+        "password": "password123"
+    })
+    token = create_access_token(data={"sub": str(response.json()["id"])})
+    headers = {"Authorization": f"Bearer {token}"}
+    task = client.post("/tasks/", json={"title": "Poll me", "day": "2025-10-01"}, headers=headers).json()
+
+    # Collection: 304 until any task of this user changes
+    response = client.get("/tasks/", headers=headers)
+    etag = response.headers["ETag"]
+    assert "Last-Modified" in response.headers
+    response = client.get("/tasks/", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    # A different query is a different representation
+    assert client.get("/tasks/?limit=1", headers={**headers, "If-None-Match": etag}).status_code == 200
+
+    # Single task: 304 while unchanged, If-Match guards updates
+    response = client.get(f"/tasks/{task['id']}", headers=headers)
+    task_tag = response.headers["ETag"]
+    assert client.get(f"/tasks/{task['id']}", headers={**headers, "If-None-Match": task_tag}).status_code == 304
+
+    response = client.patch(f"/tasks/{task['id']}", json={"title": "Edited"},
+                            headers={**headers, "If-Match": task_tag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != task_tag
+    response = client.patch(f"/tasks/{task['id']}", json={"title": "Lost update"},
+                            headers={**headers, "If-Match": task_tag})
+    assert response.status_code == 412
+    assert client.get(f"/tasks/{task['id']}", headers=headers).json()["title"] == "Edited"
+
+    assert client.get("/tasks/", headers={**headers, "If-None-Match": etag}).status_code == 200
+
+    # Bulk writes bump the collection version too
+    etag = client.get("/tasks/", headers=headers).headers["ETag"]
+    client.post("/tasks/bulk/complete", json={"ids": [task["id"]]}, headers=headers)
+    assert client.get("/tasks/", headers={**headers, "If-None-Match": etag}).status_code == 200
+    task_tag = client.get(f"/tasks/{task['id']}", headers=headers).headers["ETag"]
+    assert task_tag == '"3"'
+
+    assert client.delete(f"/tasks/{task['id']}", headers={**headers, "If-Match": '"1"'}).status_code == 412
+    assert client.delete(f"/tasks/{task['id']}", headers={**headers, "If-Match": task_tag}).status_code == 204
+
+def test_task_changes_delta_sync_and_compaction(test_db):
+    from datetime import datetime, timedelta
+    from app.models.tombstone import TaskTombstone
+    from app.workers import tombstone_compaction
+
+    response = client.post("/auth/signup", json={
+        "email": "delta@example.com",
+        "password": "password123"
+    })
+    token = create_access_token(data={"sub": str(response.json()["id"])})
+    headers = {"Authorization": f"Bearer {token}"}
+
+    ids = [t["id"] for t in client.post("/tasks/bulk", json={"tasks": [
+        {"title": f"Sync {i}", "day": "2025-11-01"} for i in range(3)
+    ]}, headers=headers).json()]
+
+    # Initial sync, paged through tasks that share one change sequence
+    response = client.get("/tasks/changes?limit=2", headers=headers)
+    body = response.json()
+    assert [t["id"] for t in body["changes"]] == ids[:2] and body["has_more"]
+    body = client.get(f"/tasks/changes?limit=2&since={body['cursor']}", headers=headers).json()
+    assert [t["id"] for t in body["changes"]] == ids[2:] and not body["has_more"]
+    cursor = body["cursor"]
+
+    # Nothing changed: an empty page that keeps the cursor
+    body = client.get(f"/tasks/changes?since={cursor}", headers=headers).json()
+    assert body == {"changes": [], "deleted": [], "cursor": cursor, "has_more": False}
+
+    client.patch(f"/tasks/{ids[0]}", json={"title": "Sync edited"}, headers=headers)
+    client.delete(f"/tasks/{ids[1]}", headers=headers)
+    body = client.get(f"/tasks/changes?since={cursor}", headers=headers).json()
+    assert [t["title"] for t in body["changes"]] == ["Sync edited"]
+    assert body["deleted"] == [ids[1]]
+
+    assert client.get("/tasks/changes?since=bogus", headers=headers).status_code == 400
+
+    # Deleting the newest task does not free its id for the next one, so a
+    # page never reports one id as both deleted and changed
+    since = body["cursor"]
+    client.delete(f"/tasks/{ids[2]}", headers=headers)
+    new_task = client.post("/tasks/", json={"title": "Sync new", "day": "2025-11-02"}, headers=headers).json()
+    assert new_task["id"] > ids[2]
+    body = client.get(f"/tasks/changes?since={since}", headers=headers).json()
+    assert body["deleted"] == [ids[2]]
+    assert [t["id"] for t in body["changes"]] == [new_task["id"]]
+
+    # Compaction drops old tombstones; cursors from before them are gone
+    test_db.query(TaskTombstone).filter(TaskTombstone.task_id == ids[1]).update(
+        {"deleted_at": datetime.utcnow() - timedelta(days=365)}
+    )
+    test_db.commit()
+    assert tombstone_compaction.compact(TestingSessionLocal) >= 1
+    assert client.get(f"/tasks/changes?since={cursor}", headers=headers).status_code == 410
+    assert client.get(f"/tasks/changes?since={body['cursor']}", headers=headers).status_code == 200
+    assert client.get("/tasks/changes", headers=headers).status_code == 200
+
+class FakeRedis:
+    """Stand-in for a Redis server's pub/sub, shared by every broker in the test"""
+
+    def __init__(self):
+        self.subscribers = []
+        self.values = {}
+        self.now = 1000.0
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, px=None):
+        self.values[key] = value
+
+    def delete(self, *keys):
+        for key in keys:
+            self.values.pop(key, None)
+
+    def publish(self, channel, message):
+        for pubsub in self.subscribers:
+            if channel in pubsub.channels:
+                pubsub.messages.put({"type": "message", "channel": channel, "data": message})
+
+    def register_script(self, script):
+        """Python version of the rate limiter's GCRA script"""
+        async def run(keys, args):
+            interval, burst = args
+            tat = max(self.values.get(keys[0], self.now), self.now)
+            wait = tat - self.now - (burst - 1) * interval
+            if wait > 0:
+                return str(wait)
+            self.values[keys[0]] = tat + interval
+            return "0"
+        return run
+
+    def pubsub(self, ignore_subscribe_messages=False):
+        pubsub = FakePubSub()
+        self.subscribers.append(pubsub)
+        return pubsub
+
+class FakePubSub:
+    def __init__(self):
+        import queue
+        self.channels = set()
+        self.messages = queue.Queue()
+
+    def subscribe(self, channel):
+        self.channels.add(channel)
+
+    def listen(self):
+        while True:
+            message = self.messages.get()
+            if message is None:
+                return
+            yield message
+
+    def close(self):
+        self.messages.put(None)
+
+def test_task_events_websocket(test_db):
+    from starlette.websockets import WebSocketDisconnect
+
+    response = client.post("/auth/signup", json={
+        "email": "events@example.com",
+        "password": "password123"
+    })
+    token = create_access_token(data={"sub": str(response.json()["id"])})
+    headers = {"Authorization": f"Bearer {token}"}
+
+    with client.websocket_connect(f"/tasks/stream?token={token}") as websocket:
+        task = client.post("/tasks/", json={"title": "Pushed", "day": "2025-12-01"}, headers=headers).json()
+        message = websocket.receive_json()
+        assert message["type"] == "created"
+        assert message["data"] == task
+
+        client.delete(f"/tasks/{task['id']}", headers=headers)
+        message = websocket.receive_json()
+        assert message["type"] == "deleted"
+        assert message["data"] == {"id": task["id"]}
+        # The event id is a delta sync cursor
+        assert client.get(f"/tasks/changes?since={message['id']}", headers=headers).json()["deleted"] == []
+
+    with pytest.raises(WebSocketDisconnect):
+        with client.websocket_connect("/tasks/stream?token=not-a-token") as websocket:
+            websocket.receive_json()
+
+def test_event_hub_backpressure_and_redis_fanout():
+    import asyncio
+    from app.api.endpoints.task_events import _sse_events
+    from app.core.events import OVERFLOW, Event, EventHub, RedisBroker, event_hub
+
+    async def scenario():
+        # A slow consumer is cut off once its buffer is full
+        hub = EventHub()
+        subscription = hub.subscribe(7, max_buffer=2)
+        for i in range(5):
+            hub.dispatch(7, Event("updated", str(i), "{}"))
+        await asyncio.sleep(0)
+        received = [await subscription.get(1) for _ in range(3)]
+        assert [e.id for e in received[:2]] == ["0", "1"] and received[2] is OVERFLOW
+        hub.unsubscribe(subscription)
+        assert hub.connection_count() == 0
+
+        # SSE framing over the process-wide hub
+        stream = _sse_events(9)
+        assert await stream.__anext__() == ": connected\n\n"
+        event_hub.dispatch(9, Event("updated", "x", "{}"))
+        assert await stream.__anext__() == "id: x\nevent: updated\ndata: {}\n\n"
+        await stream.aclose()
+        assert event_hub.connection_count() == 0
+
+        # Two "workers" sharing one Redis channel both see every event
+        redis = FakeRedis()
+        hubs = [EventHub(), EventHub()]
+        brokers = [RedisBroker(h, "redis://fake", "events", client=redis) for h in hubs]
+        for broker in brokers:
+            broker.start()
+        subscriptions = [h.subscribe(7, max_buffer=10) for h in hubs]
+        brokers[0].publish(7, Event("created", "abc", '{"id": 1}'))
+        events = [await s.get(1) for s in subscriptions]
+        for broker in brokers:
+            broker.close()
+        return events
+
+    events = asyncio.run(scenario())
+    assert [e.sse() for e in events] == ['id: abc\nevent: created\ndata: {"id": 1}\n\n'] * 2
+
+    # publish() only queues, so a slow or failing Redis never blocks or raises
+    class StuckRedis(FakeRedis):
+        def publish(self, channel, message):
+            time.sleep(0.2)
+            raise ConnectionError("redis unavailable")
+
+    broker = RedisBroker(EventHub(), "redis://fake", "events", client=StuckRedis())
+    broker.start()
+    started = time.monotonic()
+    for i in range(3):
+        broker.publish(7, Event("updated", str(i), "{}"))
+    assert time.monotonic() - started < 0.1
+    broker.close()
+
+def test_task_read_cache_invalidation_and_single_flight(test_db):
+    import asyncio
+    from prometheus_client import REGISTRY
+    from app.core.cache import MemoryCache, ReadThroughCache, RedisCache
+
+    def cache_hits():
+        return REGISTRY.get_sample_value(
+            "todoapp_cache_requests_total", {"cache": "tasks", "result": "hit"}
+        ) or 0
+
+    response = client.post("/auth/signup", json={
+        "email": "cache@example.com",
+        "password": "password123"
+    })
+    token = create_access_token(data={"sub": str(response.json()["id"])})
+    headers = {"Authorization": f"Bearer {token}"}
+    task = client.post("/tasks/", json={"title": "Cached", "day": "2025-12-02"}, headers=headers).json()
+
+    # Second read of the task and of the listing are served from the cache
+    hits = cache_hits()
+    for _ in range(2):
+        assert client.get(f"/tasks/{task['id']}", headers=headers).json() == task
+        assert client.get("/tasks/", headers=headers).json() == [task]
+    assert cache_hits() == hits + 2
+
+    # Writes bump the version in the keys, so even a cache that was never
+    # told about the write (another worker's) stops serving the old value
+    client.patch(f"/tasks/{task['id']}", json={"title": "Fresh"}, headers=headers)
+    assert client.get(f"/tasks/{task['id']}", headers=headers).json()["title"] == "Fresh"
+    assert client.get("/tasks/", headers=headers).json()[0]["title"] == "Fresh"
+    client.post("/tasks/bulk/complete", json={"ids": [task["id"]]}, headers=headers)
+    assert client.get(f"/tasks/{task['id']}", headers=headers).json()["is_completed"] is True
+    client.delete(f"/tasks/{task['id']}", headers=headers)
+    assert client.get(f"/tasks/{task['id']}", headers=headers).status_code == 404
+
+    # Concurrent misses on one key share a single load, for either backend
+    for backend in (MemoryCache(10, 60), RedisCache("redis://fake", 60, client=FakeRedis())):
+        cache = ReadThroughCache("test", backend)
+        loads = 0
+
+        async def load():
+            nonlocal loads
+            loads += 1
+            await asyncio.sleep(0.01)
+            return {"value": 1}
+
+        async def scenario():
+            return await asyncio.gather(*(cache.get_or_load("hot", load) for _ in range(20)))
+
+        assert asyncio.run(scenario()) == [{"value": 1}] * 20
+        assert asyncio.run(scenario()) == [{"value": 1}] * 20
+        assert loads == 1
+        cache.invalidate("hot")
+        assert backend.get("hot") is None
+
+    # An unreachable Redis degrades to misses and never fails a committed write
+    class DownRedis:
+        def __getattr__(self, name):
+            def unavailable(*args, **kwargs):
+                raise ConnectionError("redis unavailable")
+            return unavailable
+
+    backend = RedisCache("redis://fake", 60, client=DownRedis())
+    backend.set("hot", {"value": 1})
+    assert backend.get("hot") is None
+    backend.delete("hot")
+    backend.clear()
+
+def test_rate_limits_and_load_shedding(test_db, monkeypatch):
+    import asyncio
+    from app.core.clients import get_load_shedder, get_rate_limiter
+    from app.core.load_shedding import DecayingAverage, LoadShedder
+    from app.core.rate_limit import MemoryRateLimiter, RedisRateLimiter
+
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(settings, "RATE_LIMIT_USER_RATE", 0.01)
+    monkeypatch.setattr(settings, "RATE_LIMIT_USER_BURST", 5)
+    monkeypatch.setattr(settings, "RATE_LIMIT_ROUTES", {"GET /tasks/{task_id}": (0.01, 2)})
+    get_rate_limiter.cache_clear()
+
+    tokens = [create_access_token(data={"sub": str(user_id)}) for user_id in (9001, 9002)]
+    abuser, other = ({"Authorization": f"Bearer {t}"} for t in tokens)
+
+    # The abusive user gets 429s once their burst is spent; others are unaffected
+    statuses = [client.get("/tasks/", headers=abuser).status_code for _ in range(7)]
+    assert statuses == [401] * 5 + [429] * 2
+    response = client.get("/tasks/", headers=abuser)
+    assert int(response.headers["Retry-After"]) > 1
+    assert client.get("/tasks/", headers=other).status_code == 401
+    assert client.get("/health").status_code == 200
+
+    # Per-route buckets are tighter than the per-user one
+    statuses = [client.get("/tasks/1", headers=other).status_code for _ in range(3)]
+    assert statuses == [401, 401, 429]
+
+    # Behind a trusted proxy each client gets its own bucket; hops left of
+    # the first untrusted address are the client's own claims and ignored
+    from app.core.rate_limit import client_key
+    monkeypatch.setattr(settings, "RATE_LIMIT_TRUSTED_PROXIES", ["10.0.0.0/8"])
+    def via_proxy(forwarded, peer="10.0.0.2"):
+        headers = [(b"x-forwarded-for", forwarded.encode())] if forwarded else []
+        return {"client": (peer, 443), "headers": headers}
+    keys = [client_key(via_proxy(f)) for f in ("203.0.113.7", "198.51.100.1, 10.0.0.9", "1.1.1.1, 203.0.113.7")]
+    assert keys == ["ip:203.0.113.7", "ip:198.51.100.1", "ip:203.0.113.7"]
+    assert client_key(via_proxy(None)) == "ip:10.0.0.2"
+    assert client_key(via_proxy("1.1.1.1", peer="192.0.2.5")) == "ip:192.0.2.5"
+    limiter = MemoryRateLimiter(10)
+    async def burst(key):
+        return [await limiter.acquire(key, 0.01, 1) for _ in range(2)]
+    assert asyncio.run(burst(keys[0]))[1] > 0
+    assert asyncio.run(burst(keys[1]))[0] == 0
+
+    # Shed with 503 while over the in-flight limit
+    shedder = get_load_shedder()
+    monkeypatch.setattr(shedder, "max_in_flight", 1)
+    with shedder.track():
+        response = client.get("/", headers={"Authorization": "Bearer 3"})
+        assert response.status_code == 503 and response.headers["Retry-After"] == "1"
+        # Turning rate limits off keeps the overload protection
+        monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", False)
+        assert client.get("/").status_code == 503
+        assert client.get("/health").status_code == 200
+    assert shedder.in_flight == 0
+    assert client.get("/").status_code == 200
+    get_rate_limiter.cache_clear()
+
+    # Pool wait sheds too, and decays once requests stop arriving
+    now = [0.0]
+    waited = DecayingAverage(half_life_seconds=1.0, clock=lambda: now[0])
+    shedder = LoadShedder(max_in_flight=0, max_pool_wait_seconds=0.5, pool_wait=waited)
+    for _ in range(10):
+        waited.observe(2.0)
+    assert shedder.check() >= 1.0
+    now[0] += 3
+    assert shedder.check() == 0
+
+    # Both backends hand out the same burst, then the same wait
+    redis = FakeRedis()
+    for limiter in (MemoryRateLimiter(10, clock=lambda: redis.now), RedisRateLimiter("redis://fake", client=redis)):
+        async def scenario():
+            return [await limiter.acquire("user:1", 2.0, 3) for _ in range(4)]
+
+        assert asyncio.run(scenario()) == [0, 0, 0, 0.5]
+
+def test_metrics_endpoint_reports_requests_and_queries(test_db):
+    from prometheus_client import REGISTRY
+
+    labels = {"method": "GET", "route": "/tasks/{task_id}", "status": "200"}
+
+    def sample(name, labels):
+        return REGISTRY.get_sample_value(name, labels) or 0
+
+    response = client.post("/auth/signup", json={
+        "email": "metrics@example.com",
+        "password": "password123"
+    })
+    token = create_access_token(data={"sub": str(response.json()["id"])})
+    headers = {"Authorization": f"Bearer {token}"}
+    task = client.post("/tasks/", json={"title": "Observed", "day": "2025-12-03"}, headers=headers).json()
+
+    requests = sample("todoapp_http_request_seconds_count", labels)
+    client.get(f"/tasks/{task['id']}", headers=headers)
+    client.get("/no-such-route")
+    assert sample("todoapp_http_request_seconds_count", labels) == requests + 1
+    assert sample("todoapp_http_request_seconds_count", {**labels, "route": "unmatched", "status": "404"}) >= 1
+
+    # Engines set up by configure_engine count and time every statement
+    metered = create_engine("sqlite://")
+    configure_engine(metered, "metered")
+    with metered.connect() as conn:
+        conn.exec_driver_sql("SELECT 1")
+        conn.exec_driver_sql("  select 2")
+    assert sample("todoapp_db_queries_total", {"engine": "metered", "operation": "SELECT"}) == 2
+    assert sample("todoapp_db_query_seconds_count", {"engine": "metered"}) == 2
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'todoapp_http_request_seconds_bucket{le="0.001",method="GET",route="/tasks/{task_id}",status="200"}' in response.text
+    assert "todoapp_http_requests_in_flight" in response.text
+
+def test_query_counts_per_endpoint(test_db, query_counts, capsys, monkeypatch):
+    from app.core.query_budget import QueryBudgetExceeded, QueryRecorder, check_budget
+
+    response = client.post("/auth/signup", json={
+        "email": "queries@example.com",
+        "password": "password123"
+    })
+    token = create_access_token(data={"sub": str(response.json()["id"])})
+    headers = {"Authorization": f"Bearer {token}"}
+    task = client.post("/tasks/", json={"title": "Counted", "day": "2025-12-04"}, headers=headers).json()
+    client.get("/tasks/", headers=headers)
+    client.get(f"/tasks/{task['id']}", headers=headers)
+    client.get("/tasks/changes", headers=headers)
+    client.patch(f"/tasks/{task['id']}", json={"title": "Recounted"}, headers=headers)
+    client.delete(f"/tasks/{task['id']}", headers=headers)
+
+    assert [(route, recorder.count) for route, recorder in query_counts] == [
+        ("POST /auth/signup", 3),
+        ("POST /tasks/", 7),
+        ("GET /tasks/", 2),
+        ("GET /tasks/{task_id}", 2),
+        ("GET /tasks/changes", 2),
+        ("PATCH /tasks/{task_id}", 5),
+        ("DELETE /tasks/{task_id}", 6),
+    ]
+
+    # The same statement shape repeated in one request is reported as N+1
+    recorder = QueryRecorder()
+    for _ in range(3):
+        recorder.record("SELECT users.id FROM users WHERE users.id = ?")
+    with pytest.raises(QueryBudgetExceeded, match="possible N\\+1, 3x"):
+        check_budget("GET /users/me", recorder)
+    monkeypatch.setattr(settings, "QUERY_BUDGET_MODE", "log")
+    check_budget("GET /users/me", recorder)
+    assert "Query budget exceeded: GET /users/me: possible N+1" in capsys.readouterr().out
+
+def test_consul_registration_is_unique_per_instance(monkeypatch):
+    import app.main as main
+
+    registered = []
+
+    class FakeAgent:
+        def __init__(self):
+            self.agent = self
+            self.service = self
+
+        def register(self, **kwargs):
+            registered.append(kwargs["service_id"])
+
+        def deregister(self, service_id):
+            registered.remove(service_id)
+
+    # Two instances on one host and port no longer share (and remove) one id
+    instances = [ConsulClient(consul_api=FakeAgent()) for _ in range(2)]
+    for instance in instances:
+        instance.register_service("ToDoApp", 8080)
+    assert len(set(registered)) == 2
+    instances[0].deregister_service()
+    assert registered == [instances[1].service_id]
+
+    # Under gunicorn the master registers the instance; workers must not
+    def unexpected():
+        raise AssertionError("workers must not register with Consul")
+
+    monkeypatch.setattr(settings, "CONSUL_ENABLED", True)
+    monkeypatch.setattr(settings, "CONSUL_REGISTER_ON_STARTUP", False)
+    # Workers do follow Consul config; that is covered on its own
+    monkeypatch.setattr(settings, "CONSUL_CONFIG_ENABLED", False)
+    monkeypatch.setattr(main, "get_consul_client", unexpected)
+    with TestClient(app) as lifespan_client:
+        assert lifespan_client.get("/health").status_code == 200